@@ -1,10 +1,11 @@
 ﻿import { NextRequest, NextResponse } from 'next/server';
-import { pool } from '@/lib/database';
+import { pool, trackRoute } from '@/lib/database';
 import bcrypt from 'bcrypt';
 import jwt from 'jsonwebtoken';
 
 // POST /api/auth/login - Login user
 export async function POST(request: NextRequest) {
+  trackRoute('POST /api/auth/login');
   try {
     const body = await request.json();
     const { email, password } = body;
@@ -18,7 +19,7 @@ export async function POST(request: NextRequest) {
     
     // Find user
     const [users] = await pool.execute(
-      'SELECT * FROM users WHERE email = ?',
+      'SELECT user_id, username, email, full_name, password FROM users WHERE email = ?',
       [email]
     );
     
@@ -1,10 +1,11 @@
 ﻿import { NextRequest, NextResponse } from 'next/server';
-import { pool } from '@/lib/database';
+import { pool, trackRoute } from '@/lib/database';
 import bcrypt from 'bcrypt';
 import jwt from 'jsonwebtoken';
 
 // POST /api/auth/register - Register new user
 export async function POST(request: NextRequest) {
+  trackRoute('POST /api/auth/register');
   try {
     const body = await request.json();
     const { username, email, password, full_name } = body;
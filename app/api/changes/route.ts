@@ -0,0 +1,48 @@
+import { NextRequest, NextResponse } from 'next/server';
+import { authenticateToken } from '@/lib/auth';
+import { CHANGE_POLL_INTERVAL_MS, readChanges, sleep, startingChangeId } from '@/lib/changes';
+import { trackRoute } from '@/lib/database';
+
+export const dynamic = 'force-dynamic';
+
+// Longest a long-poll request may wait for new events
+const MAX_WAIT_SECONDS = 30;
+
+// GET /api/changes?since=<id>&wait=<seconds> - Long-poll the change feed
+export async function GET(request: NextRequest) {
+  trackRoute('GET /api/changes');
+  try {
+    // Anonymous callers see paket events; authenticated callers also get their favorites
+    let userId: number | null = null;
+    if (request.headers.get('authorization')) {
+      const authResult = authenticateToken(request);
+      if (authResult.error) return authResult.error;
+      userId = authResult.user.userId;
+    }
+
+    const { searchParams } = new URL(request.url);
+    const wait = Math.min(Math.max(parseInt(searchParams.get('wait') || '0') || 0, 0), MAX_WAIT_SECONDS);
+    const since = await startingChangeId(request);
+    const deadline = Date.now() + wait * 1000;
+
+    let events = await readChanges(since, userId);
+    while (events.length === 0 && Date.now() < deadline && !request.signal.aborted) {
+      await sleep(CHANGE_POLL_INTERVAL_MS);
+      events = await readChanges(since, userId);
+    }
+
+    return NextResponse.json({
+      success: true,
+      data: events,
+      last_event_id: events.length > 0 ? events[events.length - 1].id : since
+    }, {
+      headers: { 'Cache-Control': 'no-cache, no-store, must-revalidate' }
+    });
+  } catch (error) {
+    console.error('Error reading change feed:', error);
+    return NextResponse.json(
+      { success: false, error: 'Failed to read changes' },
+      { status: 500 }
+    );
+  }
+}
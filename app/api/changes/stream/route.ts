@@ -0,0 +1,82 @@
+import { NextRequest, NextResponse } from 'next/server';
+import { authenticateToken } from '@/lib/auth';
+import { CHANGE_POLL_INTERVAL_MS, readChanges, sleep, startingChangeId } from '@/lib/changes';
+import { trackRoute } from '@/lib/database';
+
+export const dynamic = 'force-dynamic';
+
+// Comment line sent when idle so proxies keep the connection open
+const HEARTBEAT_MS = 15000;
+// Streams are recycled periodically; EventSource clients reconnect with Last-Event-ID
+const MAX_STREAM_MS = 5 * 60 * 1000;
+
+// GET /api/changes/stream - Server-sent events for paket and the caller's favorites
+export async function GET(request: NextRequest) {
+  trackRoute('GET /api/changes/stream');
+  let userId: number | null = null;
+  if (request.headers.get('authorization')) {
+    const authResult = authenticateToken(request);
+    if (authResult.error) return authResult.error;
+    userId = authResult.user.userId;
+  }
+
+  let cursor: number;
+  try {
+    cursor = await startingChangeId(request);
+  } catch (error) {
+    console.error('Error opening change stream:', error);
+    return NextResponse.json(
+      { success: false, error: 'Failed to open change stream' },
+      { status: 500 }
+    );
+  }
+
+  const encoder = new TextEncoder();
+  const stream = new ReadableStream({
+    async start(controller) {
+      const openedAt = Date.now();
+      let lastWrite = Date.now();
+      // Announce the starting cursor so a client that reconnects before any event resumes from here
+      controller.enqueue(encoder.encode(`retry: ${CHANGE_POLL_INTERVAL_MS * 2}\nid: ${cursor}\n\n`));
+
+      try {
+        while (!request.signal.aborted && Date.now() - openedAt < MAX_STREAM_MS) {
+          const events = await readChanges(cursor, userId);
+
+          for (const event of events) {
+            controller.enqueue(encoder.encode(
+              `id: ${event.id}\nevent: ${event.type}\ndata: ${JSON.stringify(event)}\n\n`
+            ));
+            cursor = event.id;
+            lastWrite = Date.now();
+          }
+
+          if (events.length === 0) {
+            if (Date.now() - lastWrite >= HEARTBEAT_MS) {
+              controller.enqueue(encoder.encode(': heartbeat\n\n'));
+              lastWrite = Date.now();
+            }
+            await sleep(CHANGE_POLL_INTERVAL_MS);
+          }
+        }
+      } catch (error) {
+        console.error('Error streaming changes:', error);
+      }
+
+      try {
+        controller.close();
+      } catch {
+        // Client already went away
+      }
+    }
+  });
+
+  return new NextResponse(stream, {
+    headers: {
+      'Content-Type': 'text/event-stream; charset=utf-8',
+      'Cache-Control': 'no-cache, no-transform',
+      'Connection': 'keep-alive',
+      'X-Accel-Buffering': 'no'
+    }
+  });
+}
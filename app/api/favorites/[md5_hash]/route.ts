@@ -1,12 +1,14 @@
 ﻿import { NextRequest, NextResponse } from 'next/server';
-import { pool } from '@/lib/database';
+import { withTransaction, trackRoute } from '@/lib/database';
 import { authenticateToken } from '@/lib/auth';
+import { recordChanges } from '@/lib/changes';
 
 // DELETE /api/favorites/[md5_hash] - Remove paket from favorites
 export async function DELETE(
   request: NextRequest,
   { params }: { params: { md5_hash: string } }
 ) {
+  trackRoute('DELETE /api/favorites/[md5_hash]');
   try {
     const authResult = authenticateToken(request);
     if (authResult.error) return authResult.error;
@@ -21,12 +23,24 @@ export async function DELETE(
       );
     }
     
-    const [result] = await pool.execute(
-      'DELETE FROM user_favorites WHERE user_id = ? AND md5_hash = ?',
-      [userId, md5Hash]
-    );
+    const removed = await withTransaction(async (connection) => {
+      const [result] = await connection.execute(
+        'DELETE FROM user_favorites WHERE user_id = ? AND md5_hash = ?',
+        [userId, md5Hash]
+      );
+      if ((result as any).affectedRows === 0) return false;
+      
+      await recordChanges(connection, [{
+        entity: 'favorite',
+        action: 'deleted',
+        key: md5Hash,
+        userId,
+        data: { md5_hash: md5Hash }
+      }]);
+      return true;
+    });
     
-    if ((result as any).affectedRows === 0) {
+    if (!removed) {
       return NextResponse.json(
         { success: false, error: 'Favorite not found' },
         { status: 404 }
@@ -0,0 +1,148 @@
+import { NextRequest, NextResponse } from 'next/server';
+import { withTransaction, trackRoute } from '@/lib/database';
+import { authenticateToken } from '@/lib/auth';
+import { MAX_BATCH_SIZE } from '@/lib/paket';
+import { ChangeEvent, recordChanges } from '@/lib/changes';
+
+type ItemResult = {
+  index: number;
+  status: 'added' | 'removed' | 'updated' | 'unchanged' | 'not_found' | 'error';
+  md5_hash?: string;
+  error?: string;
+};
+
+// POST /api/favorites/batch - Apply favorite adds and removes in one transaction
+//   { items: [{ md5_hash, action: 'add' | 'remove', notes? }, ...] }
+// Items are idempotent: adding an existing favorite only updates its notes (when given)
+// and removing a missing one reports not_found, so a client can replay a batch safely.
+export async function POST(request: NextRequest) {
+  trackRoute('POST /api/favorites/batch');
+  try {
+    const authResult = authenticateToken(request);
+    if (authResult.error) return authResult.error;
+
+    const userId = authResult.user.userId;
+    const body = await request.json();
+    const list = body?.items;
+
+    if (!Array.isArray(list) || list.length === 0) {
+      return NextResponse.json(
+        { success: false, error: 'items must be a non-empty array' },
+        { status: 400 }
+      );
+    }
+
+    if (list.length > MAX_BATCH_SIZE) {
+      return NextResponse.json(
+        { success: false, error: `A batch may contain at most ${MAX_BATCH_SIZE} items` },
+        { status: 413 }
+      );
+    }
+
+    const results: ItemResult[] = [];
+    const accepted: { index: number; item: any }[] = [];
+    const seen = new Set<string>();
+
+    list.forEach((item: any, index: number) => {
+      if (!item || !item.md5_hash || (item.action !== 'add' && item.action !== 'remove')) {
+        results[index] = { index, status: 'error', error: 'md5_hash and an action of add or remove are required' };
+      } else if (seen.has(item.md5_hash)) {
+        results[index] = { index, status: 'error', md5_hash: item.md5_hash, error: 'Duplicate md5_hash in batch' };
+      } else {
+        seen.add(item.md5_hash);
+        accepted.push({ index, item });
+      }
+    });
+
+    if (accepted.length > 0) {
+      const hashes = accepted.map(({ item }) => item.md5_hash);
+
+      await withTransaction(async (connection) => {
+        // Locks this user's rows (and the gaps for missing ones) on idx_user_favorites_user_md5
+        const [favorites] = await connection.query(
+          'SELECT md5_hash, notes FROM user_favorites WHERE user_id = ? AND md5_hash IN (?) FOR UPDATE',
+          [userId, hashes]
+        );
+        const notesByHash = new Map((favorites as any[]).map(row => [row.md5_hash, row.notes]));
+
+        const addHashes = accepted.filter(({ item }) => item.action === 'add').map(({ item }) => item.md5_hash);
+        const [paket] = addHashes.length > 0
+          ? await connection.query('SELECT md5_hash FROM paket_pengadaan WHERE md5_hash IN (?)', [addHashes])
+          : [[]];
+        const paketHashes = new Set((paket as any[]).map(row => row.md5_hash));
+
+        const inserts: any[][] = [];
+        const removes: string[] = [];
+        const changes: ChangeEvent[] = [];
+
+        for (const { index, item } of accepted) {
+          const md5_hash = item.md5_hash;
+          const exists = notesByHash.has(md5_hash);
+
+          if (item.action === 'remove') {
+            if (exists) {
+              removes.push(md5_hash);
+              changes.push({ entity: 'favorite', action: 'deleted', key: md5_hash, userId, data: { md5_hash } });
+            }
+            results[index] = { index, status: exists ? 'removed' : 'not_found', md5_hash };
+          } else if (!paketHashes.has(md5_hash)) {
+            results[index] = { index, status: 'not_found', md5_hash, error: 'Paket not found' };
+          } else if (!exists) {
+            inserts.push([userId, md5_hash, item.notes ?? null]);
+            changes.push({
+              entity: 'favorite',
+              action: 'created',
+              key: md5_hash,
+              userId,
+              data: { md5_hash, notes: item.notes ?? null }
+            });
+            results[index] = { index, status: 'added', md5_hash };
+          } else if (item.notes !== undefined && item.notes !== notesByHash.get(md5_hash)) {
+            await connection.execute(
+              'UPDATE user_favorites SET notes = ? WHERE user_id = ? AND md5_hash = ?',
+              [item.notes, userId, md5_hash]
+            );
+            changes.push({
+              entity: 'favorite',
+              action: 'updated',
+              key: md5_hash,
+              userId,
+              data: { md5_hash, notes: item.notes }
+            });
+            results[index] = { index, status: 'updated', md5_hash };
+          } else {
+            results[index] = { index, status: 'unchanged', md5_hash };
+          }
+        }
+
+        if (removes.length > 0) {
+          await connection.query(
+            'DELETE FROM user_favorites WHERE user_id = ? AND md5_hash IN (?)',
+            [userId, removes]
+          );
+        }
+        if (inserts.length > 0) {
+          await connection.query(
+            'INSERT INTO user_favorites (user_id, md5_hash, notes) VALUES ?',
+            [inserts]
+          );
+        }
+        await recordChanges(connection, changes);
+      });
+    }
+
+    const summary: Record<string, number> = { added: 0, removed: 0, updated: 0, unchanged: 0, not_found: 0, error: 0 };
+    results.forEach(result => summary[result.status]++);
+
+    return NextResponse.json({
+      success: true,
+      data: { results, summary }
+    });
+  } catch (error) {
+    console.error('Error in favorites batch:', error);
+    return NextResponse.json(
+      { success: false, error: 'Failed to apply favorites batch' },
+      { status: 500 }
+    );
+  }
+}
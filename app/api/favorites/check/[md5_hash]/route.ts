@@ -1,5 +1,5 @@
 ﻿import { NextRequest, NextResponse } from 'next/server';
-import { pool } from '@/lib/database';
+import { pool, trackRoute } from '@/lib/database';
 import { authenticateToken } from '@/lib/auth';
 
 // GET /api/favorites/check/[md5_hash] - Check if paket is in favorites
@@ -7,6 +7,7 @@ export async function GET(
   request: NextRequest,
   { params }: { params: { md5_hash: string } }
 ) {
+  trackRoute('GET /api/favorites/check/[md5_hash]');
   try {
     const authResult = authenticateToken(request);
     if (authResult.error) return authResult.error;
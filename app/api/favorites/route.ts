@@ -1,24 +1,98 @@
 ﻿import { NextRequest, NextResponse } from 'next/server';
-import { pool } from '@/lib/database';
+import { pool, withTransaction, trackRoute } from '@/lib/database';
 import { authenticateToken } from '@/lib/auth';
+import { recordChanges } from '@/lib/changes';
 
-// GET /api/favorites - Get all user favorites
+// Paket columns a favorites listing can project with ?fields=
+const FAVORITE_PAKET_FIELDS = [
+  'id', 'md5_hash', 'nama_paket', 'kode_paket', 'nilai_pagu_paket', 'kl_pd_instansi', 'satuan_kerja',
+  'jenis_pengadaan', 'metode_pengadaan', 'lokasi_pekerjaan', 'peserta_non_tender', 'tanggal_pembuatan',
+  'created_at', 'updated_at'
+];
+const MAX_FAVORITES_PAGE = 1000;
+
+// Opaque keyset cursor: favorited_at (ms) and favorite id of the last row of a page
+function encodeCursor(row: any): string {
+  return Buffer.from(`${new Date(row.favorited_at).getTime()}:${row.favorite_id}`).toString('base64url');
+}
+
+function decodeCursor(cursor: string): [Date, number] | null {
+  const [ms, id] = Buffer.from(cursor, 'base64url').toString().split(':').map(Number);
+  return Number.isFinite(ms) && Number.isInteger(id) ? [new Date(ms), id] : null;
+}
+
+// GET /api/favorites - Get user favorites, newest first
+//   ?limit=N          page of at most N favorites, with pagination.next_cursor while more remain
+//   ?cursor=...       continue after a previous page
+//   ?fields=a,b,...   paket columns (and/or notes) to return; favorite_id and favorited_at are always included
+// Without limit or cursor every favorite is returned in one response.
 export async function GET(request: NextRequest) {
+  trackRoute('GET /api/favorites');
   try {
     const authResult = authenticateToken(request);
     if (authResult.error) return authResult.error;
     
     const userId = authResult.user.userId;
+    const { searchParams } = new URL(request.url);
+    
+    const fieldsParam = searchParams.get('fields');
+    const fields = fieldsParam ? fieldsParam.split(',').map(field => field.trim()).filter(Boolean) : null;
+    const unknown = fields ? fields.filter(field => field !== 'notes' && !FAVORITE_PAKET_FIELDS.includes(field)) : [];
+    if (unknown.length > 0) {
+      return NextResponse.json(
+        { success: false, error: `Unknown fields: ${unknown.join(', ')}` },
+        { status: 400 }
+      );
+    }
+    const columns = ['f.id as favorite_id', 'f.created_at as favorited_at'];
+    if (!fields || fields.includes('notes')) columns.push('f.notes');
+    columns.push(...FAVORITE_PAKET_FIELDS.filter(field => !fields || fields.includes(field)).map(field => `p.${field}`));
     
-    const [favorites] = await pool.execute(
-      'SELECT f.id as favorite_id, f.notes, f.created_at as favorited_at, p.id, p.md5_hash, p.nama_paket, p.kode_paket, p.nilai_pagu_paket, p.kl_pd_instansi, p.satuan_kerja, p.jenis_pengadaan, p.metode_pengadaan, p.lokasi_pekerjaan, p.peserta_non_tender, p.tanggal_pembuatan, p.created_at, p.updated_at FROM user_favorites f JOIN paket_pengadaan p ON f.md5_hash = p.md5_hash WHERE f.user_id = ? ORDER BY f.created_at DESC',
-      [userId]
+    const cursorParam = searchParams.get('cursor');
+    const limitParam = searchParams.get('limit');
+    const paginated = cursorParam !== null || limitParam !== null;
+    const limit = Math.min(Math.max(parseInt(limitParam || '100') || 100, 1), MAX_FAVORITES_PAGE);
+    const cursor = cursorParam ? decodeCursor(cursorParam) : null;
+    if (cursorParam && !cursor) {
+      return NextResponse.json(
+        { success: false, error: 'Invalid cursor' },
+        { status: 400 }
+      );
+    }
+    
+    // Keyset pagination over idx_user_favorites_user_created (user_id, created_at [, id])
+    let where = 'f.user_id = ?';
+    const params: any[] = [userId];
+    if (cursor) {
+      where += ' AND (f.created_at < ? OR (f.created_at = ? AND f.id < ?))';
+      params.push(cursor[0], cursor[0], cursor[1]);
+    }
+    const limitClause = paginated ? ` LIMIT ${limit + 1}` : '';
+    
+    const [rows] = await pool.execute(
+      `SELECT ${columns.join(', ')} FROM user_favorites f JOIN paket_pengadaan p ON f.md5_hash = p.md5_hash WHERE ${where} ORDER BY f.created_at DESC, f.id DESC${limitClause}`,
+      params
     );
     
+    const favorites = rows as any[];
+    if (!paginated) {
+      return NextResponse.json({
+        success: true,
+        data: favorites,
+        count: favorites.length
+      });
+    }
+    
+    const hasMore = favorites.length > limit;
+    const page = hasMore ? favorites.slice(0, limit) : favorites;
     return NextResponse.json({
       success: true,
-      data: favorites,
-      count: (favorites as any[]).length
+      data: page,
+      count: page.length,
+      pagination: {
+        limit,
+        next_cursor: hasMore ? encodeCursor(page[page.length - 1]) : null
+      }
     });
   } catch (error) {
     console.error('Error fetching favorites:', error);
@@ -31,6 +105,7 @@ export async function GET(request: NextRequest) {
 
 // POST /api/favorites - Add paket to favorites
 export async function POST(request: NextRequest) {
+  trackRoute('POST /api/favorites');
   try {
     const authResult = authenticateToken(request);
     if (authResult.error) return authResult.error;
@@ -73,10 +148,20 @@ export async function POST(request: NextRequest) {
     }
     
     // Add to favorites
-    const [result] = await pool.execute(
-      'INSERT INTO user_favorites (user_id, md5_hash, notes) VALUES (?, ?, ?)',
-      [userId, md5_hash, notes]
-    );
+    const result = await withTransaction(async (connection) => {
+      const [inserted] = await connection.execute(
+        'INSERT INTO user_favorites (user_id, md5_hash, notes) VALUES (?, ?, ?)',
+        [userId, md5_hash, notes]
+      );
+      await recordChanges(connection, [{
+        entity: 'favorite',
+        action: 'created',
+        key: md5_hash,
+        userId,
+        data: { md5_hash, notes: notes ?? null }
+      }]);
+      return inserted;
+    });
     
     // Get the paket details
     const [paketDetails] = await pool.execute(
@@ -104,20 +189,35 @@ export async function POST(request: NextRequest) {
 
 // DELETE /api/favorites - Clear all favorites
 export async function DELETE(request: NextRequest) {
+  trackRoute('DELETE /api/favorites');
   try {
     const authResult = authenticateToken(request);
     if (authResult.error) return authResult.error;
     
     const userId = authResult.user.userId;
     
-    const [result] = await pool.execute(
-      'DELETE FROM user_favorites WHERE user_id = ?',
-      [userId]
-    );
+    const cleared = await withTransaction(async (connection) => {
+      const [favorites] = await connection.execute(
+        'SELECT md5_hash FROM user_favorites WHERE user_id = ? FOR UPDATE',
+        [userId]
+      );
+      const [result] = await connection.execute(
+        'DELETE FROM user_favorites WHERE user_id = ?',
+        [userId]
+      );
+      await recordChanges(connection, (favorites as any[]).map(favorite => ({
+        entity: 'favorite' as const,
+        action: 'deleted' as const,
+        key: favorite.md5_hash,
+        userId,
+        data: { md5_hash: favorite.md5_hash }
+      })));
+      return (result as any).affectedRows;
+    });
     
     return NextResponse.json({
       success: true,
-      message: 'Cleared ' + (result as any).affectedRows + ' favorites successfully'
+      message: 'Cleared ' + cleared + ' favorites successfully'
     });
   } catch (error) {
     console.error('Error clearing favorites:', error);
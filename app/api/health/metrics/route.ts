@@ -0,0 +1,14 @@
+import { NextResponse } from 'next/server';
+import { getPoolMetrics } from '@/lib/database';
+import { resultCache } from '@/lib/cache';
+
+// GET /api/health/metrics - Pool state, acquire wait, per-route query times and result cache hit rate since startup
+export async function GET() {
+  return NextResponse.json({
+    success: true,
+    data: { ...getPoolMetrics(), cache: resultCache.metrics() },
+    timestamp: new Date().toISOString()
+  }, {
+    headers: { 'Cache-Control': 'no-store' }
+  });
+}
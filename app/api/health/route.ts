@@ -1,5 +1,5 @@
 import { NextResponse } from 'next/server';
-import { testConnection } from '@/lib/database';
+import { getPoolStatus, testConnection } from '@/lib/database';
 
 export async function GET() {
   try {
@@ -10,6 +10,7 @@ export async function GET() {
         success: true,
         message: 'API is healthy',
         database: 'connected',
+        pool: getPoolStatus(),
         timestamp: new Date().toISOString()
       });
     } else {
@@ -1,11 +1,13 @@
 import { NextRequest, NextResponse } from 'next/server'
-import { pool } from '@/lib/database'
+import { pool, trackRoute } from '@/lib/database'
+import { compressedResponse } from '@/lib/http'
 
 // GET /api/paket/[id]/download - Download HTML content
 export async function GET(
   request: NextRequest,
   { params }: { params: Promise<{ id: string }> }
 ) {
+  trackRoute('GET /api/paket/[id]/download')
   try {
     const { id } = await params
     const [rows] = await pool.execute(
@@ -33,10 +35,9 @@ export async function GET(
     const filename = `${paket.kode_paket}_${paket.nama_paket.replace(/[^a-zA-Z0-9]/g, '_')}.html`
     
     // Return HTML content as downloadable file
-    return new NextResponse(paket.html_content, {
-      status: 200,
+    return compressedResponse(request, paket.html_content, {
+      contentType: 'text/html; charset=utf-8',
       headers: {
-        'Content-Type': 'text/html; charset=utf-8',
         'Content-Disposition': `attachment; filename="${filename}"`,
         'Cache-Control': 'no-cache, no-store, must-revalidate',
         'Pragma': 'no-cache',
@@ -1,12 +1,28 @@
 import { NextRequest, NextResponse } from 'next/server';
-import { pool } from '@/lib/database';
+import { pool, withTransaction, trackRoute } from '@/lib/database';
+import { applyPaketStatsDelta, PAKET_STATS_COLUMNS } from '@/lib/stats';
+import { recordChanges } from '@/lib/changes';
+import { PAKET_COLUMNS } from '@/lib/paket';
+import { compressedJson, matchingEtag, notModified, paketEtag } from '@/lib/http';
 
 // GET /api/paket/[id] - Get paket by ID
 export async function GET(
   request: NextRequest,
   { params }: { params: { id: string } }
 ) {
+  trackRoute('GET /api/paket/[id]');
   try {
+    // Revalidation: check the version columns before reading html_content
+    if (request.headers.get('if-none-match')) {
+      const [versions] = await pool.execute(
+        'SELECT id, md5_hash, version FROM paket_pengadaan WHERE id = ?',
+        [params.id]
+      );
+      const version = (versions as any[])[0];
+      const knownTag = version ? matchingEtag(request, paketEtag(version)) : null;
+      if (knownTag) return notModified(knownTag);
+    }
+    
     const [rows] = await pool.execute(
       'SELECT * FROM paket_pengadaan WHERE id = ?',
       [params.id]
@@ -19,7 +35,8 @@ export async function GET(
       );
     }
     
-    return NextResponse.json({ success: true, data: (rows as any[])[0] });
+    const paket = (rows as any[])[0];
+    return compressedJson(request, { success: true, data: paket }, { etag: paketEtag(paket) });
   } catch (error) {
     console.error('Error fetching paket by ID:', error);
     return NextResponse.json(
@@ -34,6 +51,7 @@ export async function PUT(
   request: NextRequest,
   { params }: { params: { id: string } }
 ) {
+  trackRoute('PUT /api/paket/[id]');
   try {
     const body = await request.json();
     const {
@@ -133,12 +151,40 @@ export async function PUT(
     
     updateValues.push(params.id);
     
-    const [result] = await pool.execute(
-      `UPDATE paket_pengadaan SET ${updateFields.join(', ')} WHERE id = ?`,
-      updateValues
-    );
+    const updated = await withTransaction(async (connection) => {
+      // Lock the current row so the stats delta matches what gets overwritten
+      const [current] = await connection.execute(
+        `SELECT md5_hash, ${PAKET_STATS_COLUMNS} FROM paket_pengadaan WHERE id = ? FOR UPDATE`,
+        [params.id]
+      );
+      const before = (current as any[])[0];
+      if (!before) return false;
+      
+      // version feeds the ETag, updated_at is too coarse for it
+      await connection.execute(
+        `UPDATE paket_pengadaan SET ${updateFields.join(', ')}, version = version + 1 WHERE id = ?`,
+        updateValues
+      );
+      
+      const after = { ...before };
+      for (const column of Object.keys(before)) {
+        if (body[column] !== undefined) after[column] = body[column];
+      }
+      await applyPaketStatsDelta(connection, [before], [after]);
+      await recordChanges(connection, [{
+        entity: 'paket',
+        action: 'updated',
+        key: params.id,
+        data: {
+          id: Number(params.id),
+          md5_hash: after.md5_hash,
+          fields: PAKET_COLUMNS.filter(column => body[column] !== undefined)
+        }
+      }]);
+      return true;
+    });
     
-    if ((result as any).affectedRows === 0) {
+    if (!updated) {
       return NextResponse.json(
         { success: false, error: 'Not found' },
         { status: 404 }
@@ -160,13 +206,31 @@ export async function DELETE(
   request: NextRequest,
   { params }: { params: { id: string } }
 ) {
+  trackRoute('DELETE /api/paket/[id]');
   try {
-    const [result] = await pool.execute(
-      'DELETE FROM paket_pengadaan WHERE id = ?',
-      [params.id]
-    );
+    const deleted = await withTransaction(async (connection) => {
+      const [current] = await connection.execute(
+        `SELECT md5_hash, ${PAKET_STATS_COLUMNS} FROM paket_pengadaan WHERE id = ? FOR UPDATE`,
+        [params.id]
+      );
+      const before = (current as any[])[0];
+      if (!before) return false;
+      
+      await connection.execute(
+        'DELETE FROM paket_pengadaan WHERE id = ?',
+        [params.id]
+      );
+      await applyPaketStatsDelta(connection, [before], []);
+      await recordChanges(connection, [{
+        entity: 'paket',
+        action: 'deleted',
+        key: params.id,
+        data: { id: Number(params.id), md5_hash: before.md5_hash }
+      }]);
+      return true;
+    });
     
-    if ((result as any).affectedRows === 0) {
+    if (!deleted) {
       return NextResponse.json(
         { success: false, error: 'Not found' },
         { status: 404 }
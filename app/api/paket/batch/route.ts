@@ -0,0 +1,292 @@
+import { NextRequest, NextResponse } from 'next/server';
+import { withTransaction, trackRoute } from '@/lib/database';
+import { MAX_BATCH_SIZE, PAKET_COLUMNS } from '@/lib/paket';
+import { applyPaketStatsDelta, PAKET_STATS_COLUMNS } from '@/lib/stats';
+import { ChangeEvent, recordChanges } from '@/lib/changes';
+
+// Rows per multi-row INSERT statement, keeps html_content-heavy batches under max_allowed_packet
+const INSERT_CHUNK_SIZE = 500;
+
+type ItemResult = {
+  index: number;
+  status: 'created' | 'updated' | 'deleted' | 'not_found' | 'error';
+  id?: number;
+  md5_hash?: string;
+  error?: string;
+};
+
+// Parse and bound-check the array carried by a batch request body
+async function readBatch(
+  request: NextRequest,
+  key: 'items' | 'ids'
+): Promise<{ list: any[] } | { error: NextResponse }> {
+  const body = await request.json();
+  const list = body?.[key];
+
+  if (!Array.isArray(list) || list.length === 0) {
+    return {
+      error: NextResponse.json(
+        { success: false, error: `${key} must be a non-empty array` },
+        { status: 400 }
+      )
+    };
+  }
+
+  if (list.length > MAX_BATCH_SIZE) {
+    return {
+      error: NextResponse.json(
+        { success: false, error: `A batch may contain at most ${MAX_BATCH_SIZE} ${key}` },
+        { status: 413 }
+      )
+    };
+  }
+
+  return { list: list as any[] };
+}
+
+function summarize(results: ItemResult[]) {
+  const summary: Record<string, number> = { created: 0, updated: 0, deleted: 0, not_found: 0, error: 0 };
+  results.forEach(result => summary[result.status]++);
+  return summary;
+}
+
+function batchResponse(results: ItemResult[]) {
+  return NextResponse.json({
+    success: true,
+    data: { results, summary: summarize(results) }
+  });
+}
+
+// POST /api/paket/batch - Create or update paket in bulk, matched on md5_hash
+// An existing paket only gets the columns its item carries; omitted columns keep their values.
+export async function POST(request: NextRequest) {
+  trackRoute('POST /api/paket/batch');
+  try {
+    const batch = await readBatch(request, 'items');
+    if ('error' in batch) return batch.error;
+
+    const results: ItemResult[] = [];
+    const accepted: { index: number; item: any }[] = [];
+    const seen = new Set<string>();
+
+    batch.list.forEach((item, index) => {
+      if (!item || !item.md5_hash || !item.nama_paket || !item.kode_paket) {
+        results[index] = { index, status: 'error', error: 'md5_hash, nama_paket and kode_paket are required' };
+      } else if (seen.has(item.md5_hash)) {
+        results[index] = { index, status: 'error', md5_hash: item.md5_hash, error: 'Duplicate md5_hash in batch' };
+      } else {
+        seen.add(item.md5_hash);
+        accepted.push({ index, item });
+      }
+    });
+
+    if (accepted.length > 0) {
+      const hashes = accepted.map(({ item }) => item.md5_hash);
+
+      // Items carrying the same set of columns share one INSERT, whose update clause
+      // only touches those columns
+      const groups = new Map<string, { columns: string[]; items: any[] }>();
+      for (const { item } of accepted) {
+        const columns = PAKET_COLUMNS.filter(column => item[column] !== undefined);
+        const signature = columns.join(',');
+        const group = groups.get(signature) || { columns, items: [] };
+        group.items.push(item);
+        groups.set(signature, group);
+      }
+
+      const ids = await withTransaction(async (connection) => {
+        const [existing] = await connection.query(
+          `SELECT md5_hash, ${PAKET_STATS_COLUMNS} FROM paket_pengadaan WHERE md5_hash IN (?) FOR UPDATE`,
+          [hashes]
+        );
+        const existingByHash = new Map((existing as any[]).map(row => [row.md5_hash, row]));
+        const existingHashes = new Set(existingByHash.keys());
+
+        for (const { columns, items } of groups.values()) {
+          const updateClause = columns
+            .filter(column => column !== 'md5_hash')
+            .map(column => `${column} = VALUES(${column})`)
+            .concat('version = version + 1')
+            .join(', ');
+          const rows = items.map(item => columns.map(column => item[column]));
+          for (let start = 0; start < rows.length; start += INSERT_CHUNK_SIZE) {
+            await connection.query(
+              `INSERT INTO paket_pengadaan (${columns.join(', ')}) VALUES ? ON DUPLICATE KEY UPDATE ${updateClause}`,
+              [rows.slice(start, start + INSERT_CHUNK_SIZE)]
+            );
+          }
+        }
+
+        // An updated row keeps the stats columns its item left out
+        const added = accepted.map(({ item }) => {
+          const before = existingByHash.get(item.md5_hash);
+          if (!before) return item;
+          const after = { ...before };
+          for (const column of Object.keys(before)) {
+            if (item[column] !== undefined) after[column] = item[column];
+          }
+          return after;
+        });
+        await applyPaketStatsDelta(connection, existing as any[], added);
+
+        const [written] = await connection.query(
+          'SELECT id, md5_hash FROM paket_pengadaan WHERE md5_hash IN (?)',
+          [hashes]
+        );
+        const idByHash = new Map((written as any[]).map(row => [row.md5_hash, row.id]));
+
+        await recordChanges(connection, hashes.map((md5_hash): ChangeEvent => ({
+          entity: 'paket',
+          action: existingHashes.has(md5_hash) ? 'updated' : 'created',
+          key: idByHash.get(md5_hash),
+          data: { id: idByHash.get(md5_hash), md5_hash }
+        })));
+        return { idByHash, existingHashes };
+      });
+
+      for (const { index, item } of accepted) {
+        results[index] = {
+          index,
+          status: ids.existingHashes.has(item.md5_hash) ? 'updated' : 'created',
+          id: ids.idByHash.get(item.md5_hash),
+          md5_hash: item.md5_hash
+        };
+      }
+    }
+
+    return batchResponse(results);
+  } catch (error) {
+    console.error('Error in paket batch create:', error);
+    return NextResponse.json(
+      { success: false, error: 'Failed to create paket batch' },
+      { status: 500 }
+    );
+  }
+}
+
+// PUT /api/paket/batch - Update paket in bulk, each item is { id, ...fields }
+export async function PUT(request: NextRequest) {
+  trackRoute('PUT /api/paket/batch');
+  try {
+    const batch = await readBatch(request, 'items');
+    if ('error' in batch) return batch.error;
+
+    const results: ItemResult[] = [];
+    const accepted: { index: number; item: any; columns: string[] }[] = [];
+
+    batch.list.forEach((item, index) => {
+      const columns = PAKET_COLUMNS.filter(column => item?.[column] !== undefined);
+      if (!item || item.id === undefined) {
+        results[index] = { index, status: 'error', error: 'id is required' };
+      } else if (columns.length === 0) {
+        results[index] = { index, status: 'error', id: item.id, error: 'No fields provided for update' };
+      } else {
+        accepted.push({ index, item, columns });
+      }
+    });
+
+    if (accepted.length > 0) {
+      await withTransaction(async (connection) => {
+        const [current] = await connection.query(
+          `SELECT id, md5_hash, ${PAKET_STATS_COLUMNS} FROM paket_pengadaan WHERE id IN (?) FOR UPDATE`,
+          [accepted.map(({ item }) => item.id)]
+        );
+        const rowById = new Map((current as any[]).map(row => [String(row.id), row]));
+        const removed: any[] = [];
+        const added: any[] = [];
+        const changes: ChangeEvent[] = [];
+
+        for (const { index, item, columns } of accepted) {
+          const before = rowById.get(String(item.id));
+          if (!before) {
+            results[index] = { index, status: 'not_found', id: item.id };
+            continue;
+          }
+
+          await connection.execute(
+            `UPDATE paket_pengadaan SET ${columns.map(column => `${column} = ?`).join(', ')}, version = version + 1 WHERE id = ?`,
+            [...columns.map(column => item[column]), item.id]
+          );
+
+          // A later item for the same id sees this item's values
+          const after = { ...before };
+          for (const column of Object.keys(before)) {
+            if (item[column] !== undefined) after[column] = item[column];
+          }
+          removed.push(before);
+          added.push(after);
+          rowById.set(String(item.id), after);
+          results[index] = { index, status: 'updated', id: item.id };
+          changes.push({
+            entity: 'paket',
+            action: 'updated',
+            key: item.id,
+            data: { id: Number(item.id), md5_hash: after.md5_hash, fields: columns }
+          });
+        }
+
+        await applyPaketStatsDelta(connection, removed, added);
+        await recordChanges(connection, changes);
+      });
+    }
+
+    return batchResponse(results);
+  } catch (error) {
+    console.error('Error in paket batch update:', error);
+    return NextResponse.json(
+      { success: false, error: 'Failed to update paket batch' },
+      { status: 500 }
+    );
+  }
+}
+
+// DELETE /api/paket/batch - Delete paket in bulk, body is { ids: [...] }
+export async function DELETE(request: NextRequest) {
+  trackRoute('DELETE /api/paket/batch');
+  try {
+    const batch = await readBatch(request, 'ids');
+    if ('error' in batch) return batch.error;
+
+    const results: ItemResult[] = [];
+
+    await withTransaction(async (connection) => {
+      const [current] = await connection.query(
+        `SELECT id, md5_hash, ${PAKET_STATS_COLUMNS} FROM paket_pengadaan WHERE id IN (?) FOR UPDATE`,
+        [batch.list]
+      );
+      const rowById = new Map((current as any[]).map(row => [String(row.id), row]));
+
+      if (rowById.size > 0) {
+        await connection.query(
+          'DELETE FROM paket_pengadaan WHERE id IN (?)',
+          [[...rowById.values()].map(row => row.id)]
+        );
+        await applyPaketStatsDelta(connection, [...rowById.values()], []);
+        await recordChanges(connection, [...rowById.values()].map((row): ChangeEvent => ({
+          entity: 'paket',
+          action: 'deleted',
+          key: row.id,
+          data: { id: row.id, md5_hash: row.md5_hash }
+        })));
+      }
+
+      batch.list.forEach((id, index) => {
+        const key = String(id);
+        if (rowById.has(key)) {
+          results[index] = { index, status: 'deleted', id };
+          rowById.delete(key);
+        } else {
+          results[index] = { index, status: 'not_found', id };
+        }
+      });
+    });
+
+    return batchResponse(results);
+  } catch (error) {
+    console.error('Error in paket batch delete:', error);
+    return NextResponse.json(
+      { success: false, error: 'Failed to delete paket batch' },
+      { status: 500 }
+    );
+  }
+}
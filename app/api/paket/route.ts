@@ -1,8 +1,13 @@
 import { NextRequest, NextResponse } from 'next/server';
-import { pool } from '@/lib/database';
+import { pool, withTransaction, trackRoute } from '@/lib/database';
+import { applyPaketStatsDelta } from '@/lib/stats';
+import { recordChanges } from '@/lib/changes';
+import { compressedResponse, matchingEtag, notModified, paketListEtag } from '@/lib/http';
+import { resultCache } from '@/lib/cache';
 
 // GET /api/paket - Get all paket with search
 export async function GET(request: NextRequest) {
+  trackRoute('GET /api/paket');
   // Cache headers for 1 hour (3600 seconds)
   const cacheHeaders = {
     'Cache-Control': 'public, max-age=3600, s-maxage=3600, stale-while-revalidate=7200',
@@ -11,11 +16,8 @@ export async function GET(request: NextRequest) {
   }
 
   try {
-    const startTime = Date.now()
-    console.log('🔄 [CACHE MISS] Fetching fresh tender data from database...')
-    
     const { searchParams } = new URL(request.url);
-    const q = searchParams.get('q') || '';
+    const q = (searchParams.get('q') || '').trim();
     const page = parseInt(searchParams.get('page') || '1');
     const limit = parseInt(searchParams.get('limit') || '10');
     const offset = (page - 1) * limit;
@@ -27,43 +29,76 @@ export async function GET(request: NextRequest) {
       whereClause = `WHERE nama_paket LIKE ? OR kode_paket LIKE ?`;
       params = [`%${q}%`, `%${q}%`];
     }
-    
-    // Get total count
-    const [countResult] = await pool.execute(
-      `SELECT COUNT(*) as total FROM paket_pengadaan ${whereClause}`,
-      params
-    );
-    const total = (countResult as any)[0].total;
-    
-    // Get paginated data
-    const [rows] = await pool.execute(
-      `SELECT * FROM paket_pengadaan ${whereClause} ORDER BY id DESC LIMIT ? OFFSET ?`,
-      [...params, limit, offset]
-    );
-    
-    const endTime = Date.now()
-    const queryTime = endTime - startTime
-    
-    const response = { 
-      success: true, 
-      data: rows,
-      pagination: {
-        total,
-        page,
-        limit,
-        totalPages: Math.ceil(total / limit)
+
+    // Without the result cache, revalidate against the page's ids/versions before pulling full rows
+    if (!resultCache.enabled && request.headers.get('if-none-match')) {
+      const [countResult] = await pool.execute(
+        `SELECT COUNT(*) as total FROM paket_pengadaan ${whereClause}`,
+        params
+      );
+      const [versions] = await pool.execute(
+        `SELECT id, md5_hash, version FROM paket_pengadaan ${whereClause} ORDER BY id DESC LIMIT ? OFFSET ?`,
+        [...params, limit, offset]
+      );
+      const etagScope = `${q}|${page}|${limit}|${(countResult as any)[0].total}`;
+      const knownTag = matchingEtag(request, paketListEtag(versions as any[], etagScope));
+      if (knownTag) {
+        console.log(`✅ [CACHE] Paket page ${page} not modified`)
+        return notModified(knownTag, cacheHeaders);
       }
     }
+
+    const cacheKey = `paket:list:${JSON.stringify([q, page, limit])}`;
+    const { value, hit } = await resultCache.getOrLoad(cacheKey, async () => {
+      const startTime = Date.now()
+      console.log('🔄 [CACHE MISS] Fetching fresh tender data from database...')
+
+      // Get total count
+      const [countResult] = await pool.execute(
+        `SELECT COUNT(*) as total FROM paket_pengadaan ${whereClause}`,
+        params
+      );
+      const total = (countResult as any)[0].total;
+      
+      // Get paginated data
+      const [rows] = await pool.execute(
+        `SELECT * FROM paket_pengadaan ${whereClause} ORDER BY id DESC LIMIT ? OFFSET ?`,
+        [...params, limit, offset]
+      );
+      
+      const endTime = Date.now()
+      const queryTime = endTime - startTime
+      
+      const response = { 
+        success: true, 
+        data: rows,
+        pagination: {
+          total,
+          page,
+          limit,
+          totalPages: Math.ceil(total / limit)
+        }
+      }
+      
+      console.log('✅ [CACHE] Fresh tender data generated:', {
+        totalRecords: total,
+        returnedRecords: (rows as any[]).length,
+        query: q || 'all',
+        page
+      })
+      console.log(`⏱️ [PERFORMANCE] Database queries took: ${queryTime}ms`)
+
+      return {
+        body: JSON.stringify(response),
+        etag: paketListEtag(rows as any[], `${q}|${page}|${limit}|${total}`),
+        tags: ['paket:list', ...(q ? ['paket:search'] : []), ...(rows as any[]).map(row => `paket:${row.id}`)]
+      };
+    });
     
-    console.log('✅ [CACHE] Fresh tender data generated:', {
-      totalRecords: total,
-      returnedRecords: rows.length,
-      query: q || 'all',
-      page
-    })
-    console.log(`⏱️ [PERFORMANCE] Database queries took: ${queryTime}ms`)
-    
-    return NextResponse.json(response, { headers: cacheHeaders });
+    return compressedResponse(request, value.body, {
+      etag: value.etag,
+      headers: { ...cacheHeaders, 'X-Cache': hit ? 'HIT' : 'MISS' }
+    });
   } catch (error) {
     console.error('❌ [ERROR] Failed to fetch paket data:', error);
     // Don't cache error responses
@@ -81,6 +116,7 @@ export async function GET(request: NextRequest) {
 
 // POST /api/paket - Create new paket
 export async function POST(request: NextRequest) {
+  trackRoute('POST /api/paket');
   try {
     const body = await request.json();
     const {
@@ -102,10 +138,16 @@ export async function POST(request: NextRequest) {
       html_content
     } = body;
     
-    const [result] = await pool.execute(
-      'INSERT INTO paket_pengadaan (file_name, md5_hash, nama_paket, kode_paket, tanggal_pembuatan, tanggal_penutupan, kl_pd_instansi, satuan_kerja, jenis_pengadaan, metode_pengadaan, nilai_pagu_paket, nilai_hps_paket, lokasi_pekerjaan, syarat_kualifikasi, peserta_non_tender, html_content) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
-      [file_name, md5_hash, nama_paket, kode_paket, tanggal_pembuatan, tanggal_penutupan, kl_pd_instansi, satuan_kerja, jenis_pengadaan, metode_pengadaan, nilai_pagu_paket, nilai_hps_paket, lokasi_pekerjaan, syarat_kualifikasi, peserta_non_tender, html_content]
-    );
+    const result = await withTransaction(async (connection) => {
+      const [inserted] = await connection.execute(
+        'INSERT INTO paket_pengadaan (file_name, md5_hash, nama_paket, kode_paket, tanggal_pembuatan, tanggal_penutupan, kl_pd_instansi, satuan_kerja, jenis_pengadaan, metode_pengadaan, nilai_pagu_paket, nilai_hps_paket, lokasi_pekerjaan, syarat_kualifikasi, peserta_non_tender, html_content) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+        [file_name, md5_hash, nama_paket, kode_paket, tanggal_pembuatan, tanggal_penutupan, kl_pd_instansi, satuan_kerja, jenis_pengadaan, metode_pengadaan, nilai_pagu_paket, nilai_hps_paket, lokasi_pekerjaan, syarat_kualifikasi, peserta_non_tender, html_content]
+      );
+      await applyPaketStatsDelta(connection, [], [body]);
+      const id = (inserted as any).insertId;
+      await recordChanges(connection, [{ entity: 'paket', action: 'created', key: id, data: { id, md5_hash } }]);
+      return inserted;
+    });
     
     return NextResponse.json({
       success: true,
@@ -0,0 +1,32 @@
+import { NextResponse } from 'next/server'
+import { getPaketStatsSummary } from '@/lib/stats'
+import { trackRoute } from '@/lib/database'
+import { resultCache } from '@/lib/cache'
+
+// GET /api/stats/summary - Paket counts and pagu/HPS sums per month, instansi, jenis and metode
+export async function GET() {
+  trackRoute('GET /api/stats/summary')
+  const cacheHeaders = {
+    'Cache-Control': 'public, max-age=60, s-maxage=60, stale-while-revalidate=300'
+  }
+  try {
+    const { value, hit } = await resultCache.getOrLoad('stats:summary', async () => ({
+      body: JSON.stringify({ success: true, data: await getPaketStatsSummary() }),
+      tags: ['stats']
+    }))
+    return new NextResponse(value.body, {
+      headers: { ...cacheHeaders, 'Content-Type': 'application/json', 'X-Cache': hit ? 'HIT' : 'MISS' }
+    })
+  } catch (error) {
+    console.error('Error fetching stats summary:', error)
+    return NextResponse.json(
+      { success: false, error: 'Failed to fetch stats summary' },
+      {
+        status: 500,
+        headers: {
+          'Cache-Control': 'no-cache, no-store, must-revalidate'
+        }
+      }
+    )
+  }
+}
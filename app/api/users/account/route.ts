@@ -1,9 +1,10 @@
 ﻿import { NextRequest, NextResponse } from 'next/server';
-import { pool } from '@/lib/database';
+import { pool, trackRoute } from '@/lib/database';
 import { authenticateToken } from '@/lib/auth';
 
 // DELETE /api/users/account - Delete user account
 export async function DELETE(request: NextRequest) {
+  trackRoute('DELETE /api/users/account');
   try {
     const authResult = authenticateToken(request);
     if (authResult.error) return authResult.error;
@@ -1,10 +1,11 @@
 ﻿import { NextRequest, NextResponse } from 'next/server';
-import { pool } from '@/lib/database';
+import { pool, trackRoute } from '@/lib/database';
 import { authenticateToken } from '@/lib/auth';
 import bcrypt from 'bcrypt';
 
 // PUT /api/users/change-password - Change password
 export async function PUT(request: NextRequest) {
+  trackRoute('PUT /api/users/change-password');
   try {
     const authResult = authenticateToken(request);
     if (authResult.error) return authResult.error;
@@ -1,9 +1,10 @@
 ﻿import { NextRequest, NextResponse } from 'next/server';
-import { pool } from '@/lib/database';
+import { pool, trackRoute } from '@/lib/database';
 import { authenticateToken } from '@/lib/auth';
 
 // GET /api/users/profile - Get user profile
 export async function GET(request: NextRequest) {
+  trackRoute('GET /api/users/profile');
   try {
     const authResult = authenticateToken(request);
     if (authResult.error) return authResult.error;
@@ -37,6 +38,7 @@ export async function GET(request: NextRequest) {
 
 // PUT /api/users/profile - Update user profile
 export async function PUT(request: NextRequest) {
+  trackRoute('PUT /api/users/profile');
   try {
     const authResult = authenticateToken(request);
     if (authResult.error) return authResult.error;
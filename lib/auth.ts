@@ -1,12 +1,49 @@
 ﻿import jwt from 'jsonwebtoken';
 import { NextRequest, NextResponse } from 'next/server';
 
+/**
+ * Verified tokens, token -> decoded payload, in least-recently-used order.
+ *
+ * A hit skips the signature check. Entries are trusted until the token's own
+ * exp, but never longer than TOKEN_CACHE_TTL_MS, so a rotated JWT_SECRET takes
+ * effect within that window. Only tokens that verified are cached, so invalid
+ * tokens cannot fill the cache.
+ */
+const TOKEN_CACHE_SIZE = parseInt(process.env.AUTH_TOKEN_CACHE_SIZE || '10000');
+const TOKEN_CACHE_TTL_MS = 5 * 60 * 1000;
+const verifiedTokens = new Map<string, { user: any; expiresAt: number }>();
+
+function verifyToken(token: string): any {
+  const now = Date.now();
+  const cached = verifiedTokens.get(token);
+  if (cached) {
+    verifiedTokens.delete(token);
+    if (cached.expiresAt > now) {
+      verifiedTokens.set(token, cached);
+      return cached.user;
+    }
+  }
+
+  // Throws for a bad signature or an expired token
+  const user = jwt.verify(token, process.env.JWT_SECRET || 'your-secret-key') as any;
+
+  if (TOKEN_CACHE_SIZE > 0) {
+    const expiresAt = Math.min(user.exp ? user.exp * 1000 : Infinity, now + TOKEN_CACHE_TTL_MS);
+    verifiedTokens.set(token, { user, expiresAt });
+    if (verifiedTokens.size > TOKEN_CACHE_SIZE) {
+      verifiedTokens.delete(verifiedTokens.keys().next().value as string);
+    }
+  }
+  return user;
+}
+
 /**
  * Simple authentication middleware for Next.js API routes
  */
 export function authenticateToken(request: NextRequest) {
   const authHeader = request.headers.get('authorization');
-  const token = authHeader && authHeader.split(' ')[1]; // Bearer TOKEN
+  const separator = authHeader ? authHeader.indexOf(' ') : -1;
+  const token = separator >= 0 ? authHeader!.slice(separator + 1) : null; // Bearer TOKEN
 
   if (!token) {
     return {
@@ -18,8 +55,7 @@ export function authenticateToken(request: NextRequest) {
   }
 
   try {
-    const user = jwt.verify(token, process.env.JWT_SECRET || 'your-secret-key') as any;
-    return { user };
+    return { user: verifyToken(token) };
   } catch (err) {
     return {
       error: NextResponse.json({
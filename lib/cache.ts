@@ -0,0 +1,256 @@
+import type { ChangeEvent } from '@/lib/changes';
+import { pool } from '@/lib/database';
+import { PAKET_STATS_COLUMNS } from '@/lib/stats';
+
+/**
+ * In-process result cache for paket list and stats responses.
+ *
+ * Entries hold the serialized response body and are tagged with what they
+ * depend on: `paket:list` (every list page), `paket:search` (pages filtered
+ * with ?q=), `paket:<id>` (each row on a page) and `stats`. Paket writes
+ * invalidate exactly the affected tags after their transaction commits (see
+ * invalidateForChanges, driven by the same change events the writers record).
+ *
+ * A load that was in flight while one of its tags was invalidated is not
+ * stored, so a read racing a write cannot put the old result back. Nor is it
+ * shared: a request arriving after any invalidation starts its own load
+ * instead of joining one that may predate the write.
+ *
+ * Settings:
+ *   RESULT_CACHE_MAX_MB    memory budget, LRU eviction beyond it; 0 disables the cache (default 64)
+ *   RESULT_CACHE_TTL_MS    upper bound on entry age (default 300000)
+ *   RESULT_CACHE_SHARED=1  also invalidate on paket writes made by other server instances, by
+ *                          tailing change_events every second
+ */
+
+export interface CachedBody {
+  body: string;
+  etag?: string;
+  tags: string[];
+}
+
+interface Entry {
+  value: CachedBody;
+  bytes: number;
+  expiresAt: number;
+}
+
+interface Inflight {
+  promise: Promise<CachedBody>;
+  // Cache epoch when the load started
+  startedAt: number;
+}
+
+// Paket columns whose change can move a row in or out of a search result
+const SEARCH_COLUMNS = ['nama_paket', 'kode_paket'];
+const STATS_COLUMNS = PAKET_STATS_COLUMNS.split(', ');
+// Invalidated tags remembered for racing loads; beyond this the history is dropped wholesale
+const MAX_TAG_HISTORY = 10000;
+const SHARED_POLL_INTERVAL_MS = 1000;
+
+class ResultCache {
+  private entries = new Map<string, Entry>();
+  private keysByTag = new Map<string, Set<string>>();
+  private inflight = new Map<string, Inflight>();
+  private tagEpochs = new Map<string, number>();
+  private epoch = 0;
+  private floor = 0;
+  private bytes = 0;
+  private stats = { hits: 0, misses: 0, evictions: 0, invalidations: 0, rejected: 0 };
+  private byNamespace = new Map<string, { hits: number; misses: number }>();
+
+  constructor(readonly maxBytes: number, readonly ttlMs: number) {}
+
+  get enabled() {
+    return this.maxBytes > 0;
+  }
+
+  /**
+   * Cached body for key, or the result of load() (stored unless it raced an
+   * invalidation). Concurrent misses on the same key share one load, unless an
+   * invalidation happened since it started: its tags are not known until it
+   * finishes, so it may have read data that a committed write has changed.
+   */
+  async getOrLoad(key: string, load: () => Promise<CachedBody>): Promise<{ value: CachedBody; hit: boolean }> {
+    if (!this.enabled) return { value: await load(), hit: false };
+    const namespace = this.namespace(key);
+    const entry = this.entries.get(key);
+    if (entry && entry.expiresAt > Date.now()) {
+      this.entries.delete(key);
+      this.entries.set(key, entry);
+      this.count(namespace, 'hits');
+      return { value: entry.value, hit: true };
+    }
+    if (entry) this.remove(key);
+    this.count(namespace, 'misses');
+
+    let pending = this.inflight.get(key);
+    if (!pending || this.epoch > pending.startedAt) {
+      const startedAt = this.epoch;
+      const promise = load().then(value => {
+        this.store(key, value, startedAt);
+        return value;
+      });
+      const current = { promise, startedAt };
+      pending = current;
+      this.inflight.set(key, current);
+      // A newer load for the key may have replaced this one meanwhile
+      const done = () => {
+        if (this.inflight.get(key) === current) this.inflight.delete(key);
+      };
+      promise.then(done, done);
+    }
+    return { value: await pending.promise, hit: false };
+  }
+
+  invalidate(tags: string[]) {
+    if (tags.length === 0) return;
+    this.epoch++;
+    this.stats.invalidations++;
+    for (const tag of tags) {
+      this.tagEpochs.set(tag, this.epoch);
+      for (const key of this.keysByTag.get(tag) ?? []) this.remove(key);
+    }
+    if (this.tagEpochs.size > MAX_TAG_HISTORY) {
+      this.tagEpochs.clear();
+      this.floor = this.epoch;
+    }
+  }
+
+  metrics() {
+    const lookups = this.stats.hits + this.stats.misses;
+    const namespaces: Record<string, any> = {};
+    this.byNamespace.forEach(({ hits, misses }, name) => {
+      namespaces[name] = { hits, misses, hit_rate: hits + misses ? +(hits / (hits + misses)).toFixed(4) : 0 };
+    });
+    return {
+      enabled: this.enabled,
+      entries: this.entries.size,
+      bytes: this.bytes,
+      max_bytes: this.maxBytes,
+      ...this.stats,
+      hit_rate: lookups ? +(this.stats.hits / lookups).toFixed(4) : 0,
+      namespaces
+    };
+  }
+
+  private store(key: string, value: CachedBody, startedAt: number) {
+    const raced = startedAt < this.floor || value.tags.some(tag => (this.tagEpochs.get(tag) ?? -1) > startedAt);
+    // Strings are UTF-16 in memory; the key and tags are small next to the body
+    const bytes = value.body.length * 2 + key.length * 2 + 64;
+    if (raced || bytes > this.maxBytes / 4) {
+      this.stats.rejected++;
+      return;
+    }
+
+    this.remove(key);
+    this.entries.set(key, { value, bytes, expiresAt: Date.now() + this.ttlMs });
+    this.bytes += bytes;
+    for (const tag of value.tags) {
+      let keys = this.keysByTag.get(tag);
+      if (!keys) this.keysByTag.set(tag, keys = new Set());
+      keys.add(key);
+    }
+
+    while (this.bytes > this.maxBytes) {
+      const oldest = this.entries.keys().next().value as string;
+      this.remove(oldest);
+      this.stats.evictions++;
+    }
+  }
+
+  private remove(key: string) {
+    const entry = this.entries.get(key);
+    if (!entry) return;
+    this.entries.delete(key);
+    this.bytes -= entry.bytes;
+    for (const tag of entry.value.tags) {
+      const keys = this.keysByTag.get(tag);
+      keys?.delete(key);
+      if (keys && keys.size === 0) this.keysByTag.delete(tag);
+    }
+  }
+
+  private namespace(key: string) {
+    return key.split(':', 1)[0];
+  }
+
+  private count(namespace: string, field: 'hits' | 'misses') {
+    this.stats[field]++;
+    let counts = this.byNamespace.get(namespace);
+    if (!counts) this.byNamespace.set(namespace, counts = { hits: 0, misses: 0 });
+    counts[field]++;
+  }
+}
+
+// One cache per process, shared by every route bundle that imports this module
+const globalCache = globalThis as unknown as { __resultCache?: ResultCache };
+export const resultCache = globalCache.__resultCache ??= createCache();
+
+function createCache() {
+  const maxMb = parseFloat(process.env.RESULT_CACHE_MAX_MB ?? '64');
+  const cache = new ResultCache(
+    Math.max(isNaN(maxMb) ? 64 : maxMb, 0) * 1024 * 1024,
+    parseInt(process.env.RESULT_CACHE_TTL_MS || '300000')
+  );
+  if (cache.enabled && process.env.RESULT_CACHE_SHARED === '1') {
+    startSharedInvalidation(cache);
+  }
+  return cache;
+}
+
+// Cache tags a committed paket change invalidates
+export function tagsForChange(event: Pick<ChangeEvent, 'entity' | 'action' | 'key' | 'data'>): string[] {
+  if (event.entity !== 'paket') return [];
+  if (event.action !== 'updated') {
+    return ['paket:list', 'stats', `paket:${event.key}`];
+  }
+  const fields: string[] | undefined = event.data?.fields;
+  const tags = [`paket:${event.key}`];
+  if (!fields || fields.some(field => SEARCH_COLUMNS.includes(field))) tags.push('paket:search');
+  if (!fields || fields.some(field => STATS_COLUMNS.includes(field))) tags.push('stats');
+  return tags;
+}
+
+export function invalidateForChanges(events: Pick<ChangeEvent, 'entity' | 'action' | 'key' | 'data'>[]) {
+  resultCache.invalidate([...new Set(events.flatMap(tagsForChange))]);
+}
+
+// Follow paket events written by other instances (and this one, harmlessly) through change_events;
+// `id > lastId` misses nothing because recordChanges assigns ids in commit order
+function startSharedInvalidation(cache: ResultCache) {
+  let lastId: number | null = null;
+  let polling = false;
+
+  const poll = async () => {
+    if (polling) return;
+    polling = true;
+    try {
+      if (lastId === null) {
+        const [rows] = await pool.query('SELECT COALESCE(MAX(id), 0) AS id FROM change_events');
+        lastId = Number((rows as any[])[0].id) || 0;
+        return;
+      }
+      const [rows] = await pool.query(
+        "SELECT id, action, entity_key, payload FROM change_events WHERE id > ? AND entity = 'paket' ORDER BY id LIMIT 1000",
+        [lastId]
+      );
+      const events = (rows as any[]).map(row => ({
+        entity: 'paket' as const,
+        action: row.action,
+        key: row.entity_key,
+        data: typeof row.payload === 'string' ? JSON.parse(row.payload) : row.payload
+      }));
+      if (events.length > 0) {
+        lastId = Number((rows as any[])[events.length - 1].id);
+        cache.invalidate([...new Set(events.flatMap(tagsForChange))]);
+      }
+    } catch (error) {
+      console.error('Result cache invalidation poll failed:', error);
+    } finally {
+      polling = false;
+    }
+  };
+
+  setInterval(poll, SHARED_POLL_INTERVAL_MS).unref();
+}
@@ -0,0 +1,88 @@
+import { PoolConnection } from 'mysql2/promise';
+import { NextRequest } from 'next/server';
+import { afterCommit, pool } from '@/lib/database';
+import { invalidateForChanges } from '@/lib/cache';
+
+/**
+ * Change feed for paket and favorites (table: change_events).
+ *
+ * Writers call recordChanges inside their transaction, so an event exists if and
+ * only if the change was committed. Readers page through events by id. Once the
+ * transaction commits, the same events invalidate the result cache (lib/cache.ts).
+ *
+ * Ids are assigned in commit order: recordChanges locks the change_events_writer
+ * row (migration 006) before inserting, so no event can commit below an id a reader
+ * has already passed. Call it last in the transaction, after every other row lock,
+ * because the lock is held until commit.
+ */
+
+export interface ChangeEvent {
+  entity: 'paket' | 'favorite';
+  action: 'created' | 'updated' | 'deleted';
+  key: string | number;
+  userId?: number | null;
+  data?: Record<string, any>;
+}
+
+// Longest a stream or long-poll waits between database polls
+export const CHANGE_POLL_INTERVAL_MS = 1000;
+export const CHANGE_PAGE_SIZE = 500;
+
+export async function recordChanges(connection: PoolConnection, events: ChangeEvent[]) {
+  if (events.length === 0) return;
+
+  // Serializes writers from here to their commit, so ids follow commit order
+  await connection.query('SELECT id FROM change_events_writer WHERE id = 1 FOR UPDATE');
+  await connection.query(
+    'INSERT INTO change_events (entity, action, entity_key, user_id, payload) VALUES ?',
+    [events.map(event => [
+      event.entity,
+      event.action,
+      String(event.key),
+      event.userId ?? null,
+      JSON.stringify(event.data ?? {})
+    ])]
+  );
+  afterCommit(connection, () => invalidateForChanges(events));
+}
+
+// Id of the newest event, the starting point for subscribers that don't resume
+export async function latestChangeId(): Promise<number> {
+  const [rows] = await pool.query('SELECT COALESCE(MAX(id), 0) AS id FROM change_events');
+  return Number((rows as any[])[0].id) || 0;
+}
+
+/**
+ * Events after the given id that the caller may see: all paket events plus
+ * favorite events of userId (none when unauthenticated).
+ */
+export async function readChanges(afterId: number, userId: number | null, limit = CHANGE_PAGE_SIZE) {
+  const [rows] = userId === null
+    ? await pool.query(
+        'SELECT id, entity, action, entity_key, payload, created_at FROM change_events WHERE id > ? AND user_id IS NULL ORDER BY id LIMIT ?',
+        [afterId, limit]
+      )
+    : await pool.query(
+        'SELECT id, entity, action, entity_key, payload, created_at FROM change_events WHERE id > ? AND (user_id IS NULL OR user_id = ?) ORDER BY id LIMIT ?',
+        [afterId, userId, limit]
+      );
+
+  return (rows as any[]).map(row => ({
+    id: Number(row.id),
+    type: `${row.entity}.${row.action}`,
+    key: row.entity_key,
+    data: typeof row.payload === 'string' ? JSON.parse(row.payload) : row.payload,
+    created_at: row.created_at
+  }));
+}
+
+// Resume point: Last-Event-ID header, then ?since=, otherwise only new events
+export async function startingChangeId(request: NextRequest): Promise<number> {
+  const since = request.headers.get('last-event-id') ?? new URL(request.url).searchParams.get('since');
+  const parsed = since === null ? NaN : parseInt(since);
+  return Number.isNaN(parsed) ? latestChangeId() : parsed;
+}
+
+export function sleep(ms: number) {
+  return new Promise(resolve => setTimeout(resolve, ms));
+}
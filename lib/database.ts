@@ -1,4 +1,24 @@
-import mysql from 'mysql2/promise';
+import mysql, { PoolConnection } from 'mysql2/promise';
+import { AsyncLocalStorage } from 'async_hooks';
+
+function envInt(name: string, fallback: number): number {
+  const value = parseInt(process.env[name] || '');
+  return isNaN(value) ? fallback : value;
+}
+
+/**
+ * Pool sizing, all optional:
+ *   DB_POOL_SIZE             connections to start with (default 10)
+ *   DB_POOL_MAX              upper bound for adaptive sizing (default DB_POOL_SIZE, i.e. fixed size)
+ *   DB_QUEUE_LIMIT           requests allowed to wait for a connection, 0 = unbounded (default 0)
+ *   DB_POOL_MAX_IDLE         idle connections kept open (default DB_POOL_SIZE)
+ *   DB_POOL_IDLE_TIMEOUT_MS  idle time before a connection above DB_POOL_MAX_IDLE is closed (default 60000)
+ *   DB_POOL_TARGET_WAIT_MS   acquire wait that makes the adaptive pool grow (default 5)
+ */
+const POOL_SIZE = Math.max(envInt('DB_POOL_SIZE', 10), 1);
+const POOL_MAX = Math.max(envInt('DB_POOL_MAX', POOL_SIZE), POOL_SIZE);
+const TARGET_WAIT_MS = envInt('DB_POOL_TARGET_WAIT_MS', 5);
+const ADAPT_INTERVAL_MS = 5000;
 
 // Database configuration
 const dbConfig = {
@@ -8,13 +28,221 @@ const dbConfig = {
   database: process.env.DB_NAME || 'data_crud_v1',
   port: parseInt(process.env.DB_PORT || '3306'),
   waitForConnections: true,
-  connectionLimit: 10,
-  queueLimit: 0
+  connectionLimit: POOL_SIZE,
+  maxIdle: envInt('DB_POOL_MAX_IDLE', POOL_SIZE),
+  idleTimeout: envInt('DB_POOL_IDLE_TIMEOUT_MS', 60000),
+  queueLimit: envInt('DB_QUEUE_LIMIT', 0)
 };
 
 // Create connection pool
 const pool = mysql.createPool(dbConfig);
 
+// Upper bounds (ms) of the timing histogram buckets; the last bucket is open-ended
+const TIMING_BOUNDS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000];
+
+class TimingStats {
+  count = 0;
+  total = 0;
+  max = 0;
+  buckets = new Array<number>(TIMING_BOUNDS.length + 1).fill(0);
+
+  record(ms: number) {
+    this.count++;
+    this.total += ms;
+    if (ms > this.max) this.max = ms;
+    let index = 0;
+    while (index < TIMING_BOUNDS.length && ms > TIMING_BOUNDS[index]) index++;
+    this.buckets[index]++;
+  }
+
+  // Upper bound of the bucket holding the p-th percentile (the max for the open-ended bucket)
+  percentile(p: number): number {
+    const target = Math.max(1, Math.ceil(p / 100 * this.count));
+    let seen = 0;
+    for (let index = 0; index < this.buckets.length; index++) {
+      seen += this.buckets[index];
+      if (seen >= target) return Math.min(TIMING_BOUNDS[index] ?? this.max, this.max);
+    }
+    return this.max;
+  }
+
+  toJSON() {
+    return {
+      count: this.count,
+      avg_ms: this.count ? +(this.total / this.count).toFixed(2) : 0,
+      p95_ms: this.count ? +this.percentile(95).toFixed(2) : 0,
+      max_ms: +this.max.toFixed(2)
+    };
+  }
+}
+
+/**
+ * Pool and query metrics.
+ *
+ * Route handlers call trackRoute() first; queries and connection acquires
+ * made while handling the request are attributed to that route through
+ * AsyncLocalStorage. Query time is measured around pool/connection
+ * execute() and query(), so for pool-level calls it includes the wait for a
+ * connection; `acquire` shows how much of it was waiting.
+ */
+const routeContext = new AsyncLocalStorage<string>();
+const UNTRACKED_ROUTE = '(untracked)';
+
+interface RouteMetrics {
+  query: TimingStats;
+  acquire: TimingStats;
+  errors: number;
+}
+
+const startedAt = Date.now();
+const acquireStats = new TimingStats();
+const routeMetrics = new Map<string, RouteMetrics>();
+let acquireErrors = 0;
+let queueRejections = 0;
+let peakActive = 0;
+let peakQueued = 0;
+
+// Demand seen since the last adaptive sizing step
+const demand = { acquires: 0, waitMs: 0, peakActive: 0, peakQueued: 0 };
+
+// Label the current request for query metrics, e.g. trackRoute('GET /api/paket/[id]')
+export function trackRoute(route: string) {
+  routeContext.enterWith(route);
+}
+
+function metricsFor(route: string): RouteMetrics {
+  let metrics = routeMetrics.get(route);
+  if (!metrics) {
+    metrics = { query: new TimingStats(), acquire: new TimingStats(), errors: 0 };
+    routeMetrics.set(route, metrics);
+  }
+  return metrics;
+}
+
+// The callback pool underneath the promise wrapper; its queues are not part of the public API
+function corePool(): any {
+  return (pool as any).pool;
+}
+
+function poolCounts() {
+  const core = corePool();
+  const total = core?._allConnections?.length ?? 0;
+  const idle = core?._freeConnections?.length ?? 0;
+  return { total, idle, active: total - idle, queued: core?._connectionQueue?.length ?? 0 };
+}
+
+function instrumentAcquire() {
+  const core = corePool();
+  if (!core || typeof core.getConnection !== 'function') return;
+  const getConnection = core.getConnection.bind(core);
+
+  // Every acquire (pool.execute/query, pool.getConnection) goes through the core pool's getConnection
+  core.getConnection = (callback: (err: any, connection?: any) => void) => {
+    const route = routeContext.getStore() ?? UNTRACKED_ROUTE;
+    const started = performance.now();
+    getConnection((err: any, connection?: any) => {
+      const waited = performance.now() - started;
+      if (err) {
+        acquireErrors++;
+        if (String(err.message).includes('Queue limit')) queueRejections++;
+      } else {
+        acquireStats.record(waited);
+        metricsFor(route).acquire.record(waited);
+        const { active, queued } = poolCounts();
+        peakActive = Math.max(peakActive, active);
+        peakQueued = Math.max(peakQueued, queued);
+        demand.acquires++;
+        demand.waitMs += waited;
+        demand.peakActive = Math.max(demand.peakActive, active);
+        demand.peakQueued = Math.max(demand.peakQueued, queued);
+      }
+      callback(err, connection);
+    });
+  };
+}
+
+function instrumentQueries<T extends object>(target: T): T {
+  for (const method of ['execute', 'query']) {
+    const original = (target as any)[method].bind(target);
+    (target as any)[method] = async (...args: any[]) => {
+      const metrics = metricsFor(routeContext.getStore() ?? UNTRACKED_ROUTE);
+      const started = performance.now();
+      try {
+        return await original(...args);
+      } catch (error) {
+        metrics.errors++;
+        throw error;
+      } finally {
+        metrics.query.record(performance.now() - started);
+      }
+    };
+  }
+  return target;
+}
+
+/**
+ * Adaptive sizing between DB_POOL_SIZE and DB_POOL_MAX (off when they are equal).
+ *
+ * mysql2 reads connectionLimit on every acquire, so raising it lets the pool
+ * open more connections. The limit grows by half when requests had to queue or
+ * the average acquire wait exceeded DB_POOL_TARGET_WAIT_MS, and shrinks by one
+ * towards the observed peak when less than half the connections were in use.
+ * Surplus idle connections are closed by the pool's idle timeout.
+ */
+function adaptPoolSize() {
+  const core = corePool();
+  if (!core?.config) return;
+  const limit = core.config.connectionLimit;
+  const averageWait = demand.acquires ? demand.waitMs / demand.acquires : 0;
+
+  let next = limit;
+  if (demand.peakQueued > 0 || averageWait > TARGET_WAIT_MS) {
+    next = Math.min(POOL_MAX, limit + Math.ceil(limit / 2));
+  } else if (demand.peakActive < limit / 2) {
+    next = Math.max(POOL_SIZE, limit - 1, demand.peakActive);
+  }
+  if (next !== limit) {
+    core.config.connectionLimit = next;
+    console.log(`🔧 DB pool limit ${limit} -> ${next} (peak active ${demand.peakActive}, queued ${demand.peakQueued}, avg wait ${averageWait.toFixed(1)}ms)`);
+  }
+  Object.assign(demand, { acquires: 0, waitMs: 0, peakActive: 0, peakQueued: 0 });
+}
+
+instrumentAcquire();
+instrumentQueries(pool);
+if (POOL_MAX > POOL_SIZE) {
+  setInterval(adaptPoolSize, ADAPT_INTERVAL_MS).unref();
+}
+
+// Pool state right now
+export function getPoolStatus() {
+  const { total, idle, active, queued } = poolCounts();
+  return {
+    active,
+    idle,
+    queued,
+    total,
+    limit: corePool()?.config?.connectionLimit ?? dbConfig.connectionLimit,
+    min_limit: POOL_SIZE,
+    max_limit: POOL_MAX,
+    queue_limit: dbConfig.queueLimit
+  };
+}
+
+// Pool state plus acquire and per-route query timings since startup
+export function getPoolMetrics() {
+  const routes: Record<string, any> = {};
+  routeMetrics.forEach((metrics, route) => {
+    routes[route] = { query: metrics.query.toJSON(), acquire: metrics.acquire.toJSON(), errors: metrics.errors };
+  });
+  return {
+    uptime_s: Math.round((Date.now() - startedAt) / 1000),
+    pool: { ...getPoolStatus(), peak_active: peakActive, peak_queued: peakQueued },
+    acquire: { ...acquireStats.toJSON(), errors: acquireErrors, queue_rejections: queueRejections },
+    routes
+  };
+}
+
 // Test database connection
 export async function testConnection() {
   try {
@@ -28,6 +256,40 @@ export async function testConnection() {
   }
 }
 
+// Callbacks to run once the transaction on a connection has committed
+const commitHooks = new WeakMap<PoolConnection, (() => void)[]>();
+
+// Run hook after the surrounding withTransaction commits; dropped on rollback
+export function afterCommit(connection: PoolConnection, hook: () => void) {
+  const hooks = commitHooks.get(connection);
+  if (hooks) hooks.push(hook);
+  else commitHooks.set(connection, [hook]);
+}
+
+// Run a unit of work inside a transaction on a dedicated connection
+export async function withTransaction<T>(work: (connection: PoolConnection) => Promise<T>): Promise<T> {
+  const connection = instrumentQueries(await pool.getConnection());
+  try {
+    await connection.beginTransaction();
+    const result = await work(connection);
+    await connection.commit();
+    for (const hook of commitHooks.get(connection) ?? []) {
+      try {
+        hook();
+      } catch (error) {
+        console.error('After-commit hook failed:', error);
+      }
+    }
+    return result;
+  } catch (error) {
+    await connection.rollback();
+    throw error;
+  } finally {
+    commitHooks.delete(connection);
+    connection.release();
+  }
+}
+
 // Export pool as db for backward compatibility
 export const db = pool;
 export { pool };
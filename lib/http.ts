@@ -0,0 +1,123 @@
+import { createHash } from 'crypto';
+import { brotliCompressSync, constants as zlibConstants, gzipSync } from 'zlib';
+import { NextRequest, NextResponse } from 'next/server';
+
+/**
+ * Conditional requests and response compression for API routes.
+ *
+ * ETags are strong and identify the entity; the encoded representation gets a
+ * "-br"/"-gzip" suffix so each encoding has its own validator, and If-None-Match
+ * matches any encoding of the same entity.
+ *
+ * Paket tags come from the row's version counter (migration 007), which every
+ * write increments. updated_at is not used: it has one-second resolution, so two
+ * updates within a second would keep the tag and answer 304 for stale content.
+ */
+
+// Smaller bodies are sent as-is, compression would not pay for itself
+const MIN_COMPRESS_BYTES = 1024;
+
+type Encoding = 'br' | 'gzip' | 'identity';
+
+// Strong ETag for one paket, from its md5_hash and row version
+export function paketEtag(row: { id?: any; md5_hash?: any; version?: any }): string {
+  return `"${row.id ?? ''}-${row.md5_hash ?? ''}-v${row.version ?? 0}"`;
+}
+
+// Strong ETag for a page of paket; `scope` covers everything else in the body (filters, totals)
+export function paketListEtag(rows: any[], scope: string): string {
+  const hash = createHash('sha1');
+  hash.update(scope);
+  for (const row of rows) {
+    hash.update(`|${row.id}:${row.md5_hash ?? ''}:${row.version ?? 0}`);
+  }
+  return `"${hash.digest('base64url')}"`;
+}
+
+function baseTag(tag: string): string {
+  return tag.trim().replace(/^W\//, '').replace(/-(br|gzip)"$/, '"');
+}
+
+// The If-None-Match tag naming this entity (in any encoding), if the client sent one
+export function matchingEtag(request: NextRequest, etag: string): string | null {
+  const header = request.headers.get('if-none-match');
+  if (!header) return null;
+  if (header.trim() === '*') return etag;
+  const tag = header.split(',').find(candidate => baseTag(candidate) === etag);
+  return tag ? tag.trim() : null;
+}
+
+function negotiateEncoding(request: NextRequest): Encoding {
+  const accepted = (request.headers.get('accept-encoding') || '')
+    .split(',')
+    .map(part => part.trim().split(';'))
+    .filter(([, q]) => !q || parseFloat(q.split('=')[1]) > 0)
+    .map(([name]) => name.toLowerCase());
+
+  if (accepted.includes('br')) return 'br';
+  if (accepted.includes('gzip')) return 'gzip';
+  return 'identity';
+}
+
+function encodedTag(etag: string, encoding: Encoding): string {
+  return encoding === 'identity' ? etag : etag.replace(/"$/, `-${encoding}"`);
+}
+
+export function notModified(etag: string, headers: Record<string, string> = {}) {
+  return new NextResponse(null, {
+    status: 304,
+    headers: { ...headers, 'ETag': etag, 'Vary': 'Accept-Encoding' }
+  });
+}
+
+/**
+ * Send a body compressed with the best encoding the client accepts.
+ * With an etag, answers 304 when the client already holds that entity.
+ */
+export function compressedResponse(
+  request: NextRequest,
+  body: string,
+  options: { contentType?: string; etag?: string; status?: number; headers?: Record<string, string> } = {}
+) {
+  const { contentType = 'application/json', etag, status = 200, headers = {} } = options;
+
+  const knownTag = etag ? matchingEtag(request, etag) : null;
+  if (knownTag) {
+    return notModified(knownTag, headers);
+  }
+
+  const raw = Buffer.from(body, 'utf8');
+  const encoding = raw.length >= MIN_COMPRESS_BYTES ? negotiateEncoding(request) : 'identity';
+  const payload = encoding === 'br'
+    ? brotliCompressSync(raw, {
+        params: {
+          [zlibConstants.BROTLI_PARAM_QUALITY]: 5,
+          [zlibConstants.BROTLI_PARAM_SIZE_HINT]: raw.length
+        }
+      })
+    : encoding === 'gzip'
+      ? gzipSync(raw, { level: 6 })
+      : raw;
+
+  const responseHeaders: Record<string, string> = {
+    ...headers,
+    'Content-Type': contentType,
+    'Content-Length': String(payload.length),
+    'Vary': 'Accept-Encoding'
+  };
+  if (encoding !== 'identity') responseHeaders['Content-Encoding'] = encoding;
+  if (etag) responseHeaders['ETag'] = encodedTag(etag, encoding);
+
+  return new NextResponse(new Uint8Array(payload), { status, headers: responseHeaders });
+}
+
+export function compressedJson(
+  request: NextRequest,
+  data: unknown,
+  options: { etag?: string; status?: number; headers?: Record<string, string> } = {}
+) {
+  return compressedResponse(request, JSON.stringify(data), {
+    ...options,
+    contentType: 'application/json'
+  });
+}
@@ -0,0 +1,22 @@
+// Writable columns of paket_pengadaan, in insert order
+export const PAKET_COLUMNS = [
+  'file_name',
+  'md5_hash',
+  'nama_paket',
+  'kode_paket',
+  'tanggal_pembuatan',
+  'tanggal_penutupan',
+  'kl_pd_instansi',
+  'satuan_kerja',
+  'jenis_pengadaan',
+  'metode_pengadaan',
+  'nilai_pagu_paket',
+  'nilai_hps_paket',
+  'lokasi_pekerjaan',
+  'syarat_kualifikasi',
+  'peserta_non_tender',
+  'html_content'
+] as const;
+
+// Largest number of records accepted by one batch request
+export const MAX_BATCH_SIZE = 5000;
@@ -0,0 +1,155 @@
+import { PoolConnection } from 'mysql2/promise';
+import { pool } from '@/lib/database';
+
+/**
+ * Incrementally maintained paket statistics (table: paket_stats).
+ *
+ * Every paket write passes the rows it removed and the rows it added to
+ * applyPaketStatsDelta inside the same transaction, so the aggregates stay in
+ * step with paket_pengadaan and stats reads are a handful of primary-key lookups.
+ */
+
+// Columns needed to compute the stats buckets of a paket row
+export const PAKET_STATS_COLUMNS =
+  'tanggal_pembuatan, kl_pd_instansi, jenis_pengadaan, metode_pengadaan, nilai_pagu_paket, nilai_hps_paket';
+
+export const STATS_DIMENSIONS = ['month', 'instansi', 'jenis', 'metode'] as const;
+export type StatsDimension = typeof STATS_DIMENSIONS[number];
+
+export interface PaketStatsRow {
+  tanggal_pembuatan?: string | Date | null;
+  kl_pd_instansi?: string | null;
+  jenis_pengadaan?: string | null;
+  metode_pengadaan?: string | null;
+  nilai_pagu_paket?: number | string | null;
+  nilai_hps_paket?: number | string | null;
+}
+
+export interface StatsBucket {
+  bucket: string;
+  count: number;
+  pagu_sum: number;
+  hps_sum: number;
+}
+
+// A string starting with a real YYYY-MM; anything else (e.g. "15/01/2024") has no month bucket
+const MONTH_PREFIX = /^\d{4}-(0[1-9]|1[0-2])/;
+
+// YYYY-MM bucket for a DATE value coming from mysql2 (Date) or a request body (string),
+// '' when missing or malformed, like month_code in python_code/analytics.py
+export function monthBucket(value: string | Date | null | undefined): string {
+  if (!value) return '';
+  if (value instanceof Date) {
+    if (isNaN(value.getTime())) return '';
+    return `${value.getFullYear()}-${String(value.getMonth() + 1).padStart(2, '0')}`;
+  }
+  const text = String(value);
+  return MONTH_PREFIX.test(text) ? text.slice(0, 7) : '';
+}
+
+function textBucket(value: string | null | undefined): string {
+  return value ? String(value).slice(0, 255) : '';
+}
+
+function bucketsFor(row: PaketStatsRow): [string, string][] {
+  return [
+    ['total', 'all'],
+    ['month', monthBucket(row.tanggal_pembuatan)],
+    ['instansi', textBucket(row.kl_pd_instansi)],
+    ['jenis', textBucket(row.jenis_pengadaan)],
+    ['metode', textBucket(row.metode_pengadaan)]
+  ];
+}
+
+/**
+ * Fold removed/added paket rows into paket_stats with a single upsert.
+ * Must run on the connection of the transaction that changed the rows.
+ */
+export async function applyPaketStatsDelta(
+  connection: PoolConnection,
+  removed: PaketStatsRow[],
+  added: PaketStatsRow[]
+) {
+  const deltas = new Map<string, { dimension: string; bucket: string; count: number; pagu: number; hps: number }>();
+
+  const accumulate = (row: PaketStatsRow, sign: number) => {
+    const pagu = Number(row.nilai_pagu_paket) || 0;
+    const hps = Number(row.nilai_hps_paket) || 0;
+    for (const [dimension, bucket] of bucketsFor(row)) {
+      const key = `${dimension}\u0000${bucket}`;
+      const delta = deltas.get(key) || { dimension, bucket, count: 0, pagu: 0, hps: 0 };
+      delta.count += sign;
+      delta.pagu += sign * pagu;
+      delta.hps += sign * hps;
+      deltas.set(key, delta);
+    }
+  };
+
+  removed.forEach(row => accumulate(row, -1));
+  added.forEach(row => accumulate(row, 1));
+
+  const changed = [...deltas.values()].filter(d => d.count !== 0 || d.pagu !== 0 || d.hps !== 0);
+  if (changed.length === 0) return;
+
+  await connection.query(
+    `INSERT INTO paket_stats (dimension, bucket, paket_count, pagu_sum, hps_sum) VALUES ?
+     ON DUPLICATE KEY UPDATE
+       paket_count = paket_count + VALUES(paket_count),
+       pagu_sum = pagu_sum + VALUES(pagu_sum),
+       hps_sum = hps_sum + VALUES(hps_sum)`,
+    [changed.map(d => [d.dimension, d.bucket, d.count, d.pagu, d.hps])]
+  );
+}
+
+function toBucket(row: any): StatsBucket {
+  return {
+    bucket: row.bucket,
+    count: Number(row.paket_count) || 0,
+    pagu_sum: Number(row.pagu_sum) || 0,
+    hps_sum: Number(row.hps_sum) || 0
+  };
+}
+
+// Total plus the buckets of the given months, read by primary key
+export async function getMonthlyTotals(months: string[]) {
+  const [rows] = await pool.query(
+    `SELECT dimension, bucket, paket_count, pagu_sum, hps_sum FROM paket_stats
+     WHERE (dimension = 'total' AND bucket = 'all') OR (dimension = 'month' AND bucket IN (?))`,
+    [months]
+  );
+
+  const empty = (bucket: string): StatsBucket => ({ bucket, count: 0, pagu_sum: 0, hps_sum: 0 });
+  const total = (rows as any[]).find(r => r.dimension === 'total');
+  const byMonth: Record<string, StatsBucket> = {};
+  for (const month of months) {
+    const row = (rows as any[]).find(r => r.dimension === 'month' && r.bucket === month);
+    byMonth[month] = row ? toBucket(row) : empty(month);
+  }
+
+  return { total: total ? toBucket(total) : empty('all'), byMonth };
+}
+
+// Full breakdown: total plus every bucket of every dimension
+export async function getPaketStatsSummary() {
+  const [rows] = await pool.query(
+    'SELECT dimension, bucket, paket_count, pagu_sum, hps_sum FROM paket_stats WHERE paket_count > 0 ORDER BY dimension, bucket'
+  );
+
+  const summary: Record<string, any> = {
+    total: { bucket: 'all', count: 0, pagu_sum: 0, hps_sum: 0 },
+    by_month: [],
+    by_instansi: [],
+    by_jenis: [],
+    by_metode: []
+  };
+
+  for (const row of rows as any[]) {
+    if (row.dimension === 'total') {
+      summary.total = toBucket(row);
+    } else if ((STATS_DIMENSIONS as readonly string[]).includes(row.dimension)) {
+      summary[`by_${row.dimension}`].push(toBucket(row));
+    }
+  }
+
+  return summary;
+}
@@ -0,0 +1,53 @@
+-- Pre-aggregated statistics for paket_pengadaan.
+-- One row per (dimension, bucket); the paket write routes keep it up to date
+-- incrementally through lib/stats.ts, so stats reads never scan paket_pengadaan.
+--
+-- dimension: 'total' (bucket 'all'), 'month' (YYYY-MM of tanggal_pembuatan),
+--            'instansi', 'jenis', 'metode'. Missing values use the '' bucket.
+
+CREATE TABLE IF NOT EXISTS paket_stats (
+  dimension VARCHAR(16) NOT NULL,
+  bucket VARCHAR(255) NOT NULL,
+  paket_count BIGINT NOT NULL DEFAULT 0,
+  pagu_sum DECIMAL(20, 2) NOT NULL DEFAULT 0,
+  hps_sum DECIMAL(20, 2) NOT NULL DEFAULT 0,
+  PRIMARY KEY (dimension, bucket)
+);
+
+-- Backfill from the rows that already exist. The locks keep paket writers out until
+-- the backfill is done: a write landing between the DELETE and the INSERTs would be
+-- counted twice (its incremental delta plus the scan) or not at all. Writers wait on
+-- the lock, readers of paket_pengadaan do not.
+LOCK TABLES paket_pengadaan READ, paket_stats WRITE;
+
+DELETE FROM paket_stats;
+
+INSERT INTO paket_stats (dimension, bucket, paket_count, pagu_sum, hps_sum)
+SELECT 'total', 'all', COUNT(*), COALESCE(SUM(nilai_pagu_paket), 0), COALESCE(SUM(nilai_hps_paket), 0)
+FROM paket_pengadaan;
+
+INSERT INTO paket_stats (dimension, bucket, paket_count, pagu_sum, hps_sum)
+SELECT 'month', COALESCE(DATE_FORMAT(tanggal_pembuatan, '%Y-%m'), ''), COUNT(*),
+       COALESCE(SUM(nilai_pagu_paket), 0), COALESCE(SUM(nilai_hps_paket), 0)
+FROM paket_pengadaan
+GROUP BY COALESCE(DATE_FORMAT(tanggal_pembuatan, '%Y-%m'), '');
+
+INSERT INTO paket_stats (dimension, bucket, paket_count, pagu_sum, hps_sum)
+SELECT 'instansi', LEFT(COALESCE(kl_pd_instansi, ''), 255), COUNT(*),
+       COALESCE(SUM(nilai_pagu_paket), 0), COALESCE(SUM(nilai_hps_paket), 0)
+FROM paket_pengadaan
+GROUP BY LEFT(COALESCE(kl_pd_instansi, ''), 255);
+
+INSERT INTO paket_stats (dimension, bucket, paket_count, pagu_sum, hps_sum)
+SELECT 'jenis', LEFT(COALESCE(jenis_pengadaan, ''), 255), COUNT(*),
+       COALESCE(SUM(nilai_pagu_paket), 0), COALESCE(SUM(nilai_hps_paket), 0)
+FROM paket_pengadaan
+GROUP BY LEFT(COALESCE(jenis_pengadaan, ''), 255);
+
+INSERT INTO paket_stats (dimension, bucket, paket_count, pagu_sum, hps_sum)
+SELECT 'metode', LEFT(COALESCE(metode_pengadaan, ''), 255), COUNT(*),
+       COALESCE(SUM(nilai_pagu_paket), 0), COALESCE(SUM(nilai_hps_paket), 0)
+FROM paket_pengadaan
+GROUP BY LEFT(COALESCE(metode_pengadaan, ''), 255);
+
+UNLOCK TABLES;
@@ -0,0 +1,5 @@
+-- The batch upsert (POST /api/paket/batch) relies on md5_hash being unique:
+-- INSERT ... ON DUPLICATE KEY UPDATE matches existing rows through this key.
+-- Remove duplicate md5_hash rows before applying if this fails.
+
+ALTER TABLE paket_pengadaan ADD UNIQUE INDEX uq_paket_md5_hash (md5_hash);
@@ -0,0 +1,22 @@
+-- Append-only change log behind GET /api/changes and /api/changes/stream.
+-- The id doubles as the resumable SSE event id (Last-Event-ID).
+--
+-- entity: 'paket' (entity_key = paket id) or 'favorite' (entity_key = md5_hash, user_id = owner)
+-- action: 'created', 'updated' or 'deleted'
+--
+-- Old events can be pruned at any time, e.g.
+--   DELETE FROM change_events WHERE created_at < NOW() - INTERVAL 7 DAY;
+-- subscribers resuming from a pruned id simply continue from the oldest kept event.
+
+CREATE TABLE IF NOT EXISTS change_events (
+  id BIGINT UNSIGNED NOT NULL AUTO_INCREMENT,
+  entity VARCHAR(16) NOT NULL,
+  action VARCHAR(16) NOT NULL,
+  entity_key VARCHAR(64) NOT NULL,
+  user_id INT NULL,
+  payload JSON NULL,
+  created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (id),
+  INDEX idx_change_events_user (user_id, id),
+  INDEX idx_change_events_created (created_at)
+);
@@ -0,0 +1,6 @@
+-- Keyset pagination of GET /api/favorites walks a user's favorites newest first:
+--   WHERE user_id = ? AND (created_at, id) < (cursor) ORDER BY created_at DESC, id DESC LIMIT n
+-- InnoDB secondary indexes end with the primary key, so this index also covers
+-- the id tie-break and each page is a short range scan instead of a filesort.
+
+ALTER TABLE user_favorites ADD INDEX idx_user_favorites_user_created (user_id, created_at);
@@ -0,0 +1,17 @@
+-- Indexes for the lookups every request path depends on. python_code/query_plans.py
+-- runs EXPLAIN on the routes' SQL and fails when one of them scans or filesorts.
+--
+--   login               SELECT ... FROM users WHERE email = ?
+--   register            SELECT user_id FROM users WHERE email = ? OR username = ?  (index merge)
+--   favorite check/DEL  ... FROM user_favorites WHERE user_id = ? AND md5_hash = ?
+--
+-- Paket pagination (ORDER BY id DESC) walks the primary key, the favorites join
+-- probes uq_paket_md5_hash (002) and favorites listing uses idx_user_favorites_user_created (004).
+-- If the imported base schema already has an equivalent index (e.g. a UNIQUE email),
+-- skip that statement rather than keeping two.
+
+ALTER TABLE users
+  ADD INDEX idx_users_email (email),
+  ADD INDEX idx_users_username (username);
+
+ALTER TABLE user_favorites ADD INDEX idx_user_favorites_user_md5 (user_id, md5_hash);
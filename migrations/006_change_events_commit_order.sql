@@ -0,0 +1,16 @@
+-- Makes change_events ids follow commit order.
+--
+-- AUTO_INCREMENT hands out ids at INSERT time, not at COMMIT. Two writers can commit
+-- out of id order (A takes 10, B takes 11, B commits first), and a reader paging with
+-- `id > last_seen` that reads between the two commits moves past 10 and never sees it.
+-- recordChanges (lib/changes.ts) locks this single row before inserting its events, so
+-- a transaction takes its ids only after the previous writer committed or rolled back.
+-- Writers record their changes last, so the lock covers little more than the INSERT
+-- and the COMMIT. Gaps left by rolled-back transactions are never filled, which is fine.
+
+CREATE TABLE IF NOT EXISTS change_events_writer (
+  id TINYINT UNSIGNED NOT NULL,
+  PRIMARY KEY (id)
+);
+
+INSERT IGNORE INTO change_events_writer (id) VALUES (1);
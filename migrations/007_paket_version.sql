@@ -0,0 +1,11 @@
+-- Row version behind the paket ETags (lib/http.ts).
+--
+-- updated_at has one-second resolution, so two updates of a paket within the same
+-- second left the ETag unchanged and a client revalidating in between got a 304 for
+-- stale content. Every API write that changes a paket row (PUT /api/paket/[id],
+-- POST and PUT /api/paket/batch) sets version = version + 1 in the same statement.
+-- Rows changed with plain SQL outside the API must bump it as well, or clients keep
+-- their cached copy until the next API write.
+
+ALTER TABLE paket_pengadaan
+  ADD COLUMN version INT UNSIGNED NOT NULL DEFAULT 0;
@@ -0,0 +1,467 @@
+"""
+Paket Analytics
+Columnar NumPy copies of paket data with vectorized group-by, top-N and time-bucket aggregations
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple, Union
+
+import numpy as np
+from colorama import Fore
+
+# Dictionary-encoded text columns: name -> paket field
+CATEGORIES = {"instansi": "kl_pd_instansi", "jenis": "jenis_pengadaan", "metode": "metode_pengadaan"}
+# Time buckets over the month column (months since year 0, -1 when tanggal_pembuatan is missing)
+BUCKETS = ("month", "quarter", "year")
+DIMENSIONS = tuple(CATEGORIES) + BUCKETS
+METRICS = ("count", "pagu_sum", "hps_sum", "hps_ratio", "mean_hps_ratio")
+MISSING_MONTH = -1
+
+
+def month_code(value) -> int:
+    """year * 12 + month - 1 for "YYYY-MM-DD..." (or a date), MISSING_MONTH when absent or malformed
+
+    A month outside 1-12 is malformed too, rather than spilling into the next or previous year.
+    """
+    if not value:
+        return MISSING_MONTH
+    text = str(value)
+    try:
+        year, month = int(text[0:4]), int(text[5:7])
+    except ValueError:
+        return MISSING_MONTH
+    if not 1 <= month <= 12:
+        return MISSING_MONTH
+    return year * 12 + month - 1
+
+
+def bucket_label(kind: str, code: int) -> str:
+    if code < 0:
+        return ""
+    if kind == "month":
+        return f"{code // 12:04d}-{code % 12 + 1:02d}"
+    if kind == "quarter":
+        return f"{code // 4:04d}-Q{code % 4 + 1}"
+    return f"{code:04d}"
+
+
+def _number(value) -> float:
+    # Same as Number(x) || 0 in lib/stats.ts; mysql2 returns DECIMAL columns as strings
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return number if number == number else 0.0
+
+
+class PaketFrameBuilder:
+    """Appends paket dicts into growing column buffers, so loading never holds every dict at once"""
+
+    def __init__(self, capacity: int = 65536):
+        self.size = 0
+        self.columns = {
+            "id": np.zeros(capacity, dtype=np.int64),
+            "month": np.zeros(capacity, dtype=np.int32),
+            "pagu": np.zeros(capacity, dtype=np.float64),
+            "hps": np.zeros(capacity, dtype=np.float64),
+            **{name: np.zeros(capacity, dtype=np.int32) for name in CATEGORIES},
+        }
+        self.labels: Dict[str, List[str]] = {name: [] for name in CATEGORIES}
+        self._codes: Dict[str, Dict[str, int]] = {name: {} for name in CATEGORIES}
+
+    def _grow(self) -> None:
+        for name, column in self.columns.items():
+            grown = np.zeros(len(column) * 2, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            self.columns[name] = grown
+
+    def append(self, row: Dict) -> None:
+        if self.size == len(self.columns["id"]):
+            self._grow()
+        i = self.size
+        columns = self.columns
+        columns["id"][i] = int(row.get("id") or 0)
+        columns["month"][i] = month_code(row.get("tanggal_pembuatan"))
+        columns["pagu"][i] = _number(row.get("nilai_pagu_paket"))
+        columns["hps"][i] = _number(row.get("nilai_hps_paket"))
+        for name, field in CATEGORIES.items():
+            label = row.get(field) or ""
+            codes = self._codes[name]
+            code = codes.get(label)
+            if code is None:
+                code = codes[label] = len(codes)
+                self.labels[name].append(label)
+            columns[name][i] = code
+        self.size += 1
+
+    def extend(self, rows: Iterable[Dict]) -> "PaketFrameBuilder":
+        for row in rows:
+            self.append(row)
+        return self
+
+    def build(self) -> "PaketFrame":
+        return PaketFrame({name: column[:self.size].copy() for name, column in self.columns.items()},
+                          {name: list(labels) for name, labels in self.labels.items()})
+
+
+class PaketFrame:
+    """Paket as NumPy columns: id, month, pagu, hps and dictionary-encoded instansi, jenis and metode
+
+    Aggregations are bincounts over integer group codes, so they cost a few
+    passes over contiguous arrays however many groups there are. A frame saved
+    with save() can be opened with load(path, mmap=True); its columns are then
+    paged in from disk on demand instead of read into memory.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray], labels: Dict[str, List[str]]):
+        self.columns = columns
+        self.labels = labels
+
+    def __len__(self) -> int:
+        return len(self.columns["id"])
+
+    # Loading
+
+    @classmethod
+    def from_records(cls, rows: Iterable[Dict]) -> "PaketFrame":
+        return PaketFrameBuilder().extend(rows).build()
+
+    @classmethod
+    def from_file(cls, path: str) -> "PaketFrame":
+        """A file written by `python -m cli export`: JSON lines, or CSV when the name ends in .csv"""
+        with open(path, newline="") as f:
+            if path.endswith(".csv"):
+                import csv
+                return cls.from_records(csv.DictReader(f))
+            return cls.from_records(json.loads(line) for line in f if line.strip())
+
+    @classmethod
+    def from_api(cls, client, search: str = None, page_size: int = 1000, workers: int = 4) -> "PaketFrame":
+        """Every paket from a running server, streamed page by page"""
+        from cli import iter_paket
+        return cls.from_records(iter_paket(client, search, page_size, workers))
+
+    def save(self, path: str) -> None:
+        """One .npy file per column plus labels.json in the directory `path`"""
+        os.makedirs(path, exist_ok=True)
+        for name, column in self.columns.items():
+            np.save(os.path.join(path, f"{name}.npy"), column)
+        with open(os.path.join(path, "labels.json"), "w") as f:
+            json.dump({"rows": len(self), "labels": self.labels}, f)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "PaketFrame":
+        with open(os.path.join(path, "labels.json")) as f:
+            meta = json.load(f)
+        names = ["id", "month", "pagu", "hps", *CATEGORIES]
+        columns = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r" if mmap else None)
+                   for name in names}
+        return cls(columns, meta["labels"])
+
+    # Filtering
+
+    def mask(self, **equals) -> np.ndarray:
+        """Boolean row mask, e.g. mask(jenis="Barang", month_from="2024-01", month_to="2024-06")
+
+        Category values are labels; month bounds are inclusive YYYY-MM.
+        """
+        selected = np.ones(len(self), dtype=bool)
+        for key, value in equals.items():
+            if key in CATEGORIES:
+                labels = self.labels[key]
+                if value not in labels:
+                    return np.zeros(len(self), dtype=bool)
+                selected &= self.columns[key] == labels.index(value)
+            elif key in ("month_from", "month_to"):
+                bound = month_code(value + "-01")
+                if bound == MISSING_MONTH:
+                    raise ValueError(f"{key} must be YYYY-MM, got {value!r}")
+                if key == "month_from":
+                    selected &= self.columns["month"] >= bound
+                else:
+                    selected &= (self.columns["month"] <= bound) & (self.columns["month"] >= 0)
+            else:
+                raise ValueError(f"cannot filter on {key!r}")
+        return selected
+
+    # Aggregation
+
+    def _codes(self, dimension: str) -> Tuple[np.ndarray, int, List[str]]:
+        """Group code per row, number of groups and group labels for one dimension"""
+        if dimension in CATEGORIES:
+            labels = self.labels[dimension]
+            return np.asarray(self.columns[dimension]), len(labels), labels
+        if dimension not in BUCKETS:
+            raise ValueError(f"unknown dimension {dimension!r} (expected one of {', '.join(DIMENSIONS)})")
+        month = np.asarray(self.columns["month"])
+        divisor = {"month": 1, "quarter": 3, "year": 12}[dimension]
+        codes = np.where(month >= 0, month // divisor, -1)
+        present = codes[codes >= 0]
+        if len(present) == 0:
+            return np.zeros(len(codes), dtype=np.int64), 1, [""]
+        low, high = int(present.min()), int(present.max())
+        # Slot 0 holds the rows without a date; slots 1.. cover every bucket from low to high
+        shifted = np.where(codes >= 0, codes - low + 1, 0)
+        return shifted, high - low + 2, [""] + [bucket_label(dimension, code) for code in range(low, high + 1)]
+
+    def group_by(self, dimensions: Union[str, Sequence[str]], where: np.ndarray = None,
+                 keep_empty: bool = False) -> Dict[str, np.ndarray]:
+        """count, pagu_sum, hps_sum, hps_ratio (hps_sum / pagu_sum) and mean_hps_ratio per group
+
+        `dimensions` is one name or several (instansi, jenis, metode, month,
+        quarter, year); the result has one label array per dimension. Groups
+        without rows are dropped unless keep_empty is set, which time-bucket
+        histograms use to keep gaps visible.
+        """
+        dimensions = [dimensions] if isinstance(dimensions, str) else list(dimensions)
+        combined, size, parts = None, 1, []
+        for dimension in dimensions:
+            codes, groups, labels = self._codes(dimension)
+            combined = codes.astype(np.int64) if combined is None else combined * groups + codes
+            size *= groups
+            parts.append((dimension, groups, labels))
+
+        pagu = np.asarray(self.columns["pagu"])
+        hps = np.asarray(self.columns["hps"])
+        if where is not None:
+            combined, pagu, hps = combined[where], pagu[where], hps[where]
+
+        count = np.bincount(combined, minlength=size)
+        pagu_sum = np.bincount(combined, weights=pagu, minlength=size)
+        hps_sum = np.bincount(combined, weights=hps, minlength=size)
+        priced = pagu > 0
+        ratio_sum = np.bincount(combined[priced], weights=hps[priced] / pagu[priced], minlength=size)
+        priced_count = np.bincount(combined[priced], minlength=size)
+
+        groups = np.arange(size) if keep_empty else np.flatnonzero(count)
+        result: Dict[str, np.ndarray] = {}
+        remainder = groups
+        for dimension, group_count, labels in reversed(parts):
+            result[dimension] = np.asarray(labels, dtype=object)[remainder % group_count]
+            remainder = remainder // group_count
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result.update({
+                "count": count[groups],
+                "pagu_sum": pagu_sum[groups],
+                "hps_sum": hps_sum[groups],
+                "hps_ratio": np.where(pagu_sum[groups] > 0, hps_sum[groups] / pagu_sum[groups], np.nan),
+                "mean_hps_ratio": np.where(priced_count[groups] > 0,
+                                           ratio_sum[groups] / np.maximum(priced_count[groups], 1), np.nan),
+            })
+        return result
+
+    def top(self, dimension: str, n: int = 10, by: str = "pagu_sum", where: np.ndarray = None) -> Dict[str, np.ndarray]:
+        """The n groups with the largest `by`, largest first"""
+        groups = self.group_by(dimension, where)
+        values = np.nan_to_num(groups[by], nan=-np.inf)
+        if n < len(values):
+            picked = np.argpartition(-values, n - 1)[:n]
+        else:
+            picked = np.arange(len(values))
+        picked = picked[np.argsort(-values[picked], kind="stable")]
+        return {name: column[picked] for name, column in groups.items()}
+
+    def histogram(self, bucket: str = "month", where: np.ndarray = None) -> Dict[str, np.ndarray]:
+        """Per time bucket from the first to the last dated paket, empty buckets included, undated ones left out"""
+        if bucket not in BUCKETS:
+            raise ValueError(f"unknown time bucket {bucket!r} (expected one of {', '.join(BUCKETS)})")
+        groups = self.group_by(bucket, where, keep_empty=True)
+        dated = groups[bucket] != ""
+        return {name: column[dated] for name, column in groups.items()}
+
+    def top_paket(self, n: int = 10, by: str = "pagu", where: np.ndarray = None) -> np.ndarray:
+        """Ids of the n paket with the largest pagu (or hps), largest first"""
+        values = np.asarray(self.columns[by], dtype=np.float64)
+        ids = np.asarray(self.columns["id"])
+        if where is not None:
+            values, ids = values[where], ids[where]
+        n = min(n, len(values))
+        if n == 0:
+            return ids[:0]
+        picked = np.argpartition(-values, n - 1)[:n]
+        return ids[picked[np.argsort(-values[picked], kind="stable")]]
+
+
+def table_rows(groups: Dict[str, np.ndarray]) -> Iterator[Dict]:
+    """Group-by result as one dict per group, for JSON output"""
+    names = list(groups)
+    for i in range(len(groups["count"])):
+        row = {}
+        for name in names:
+            value = groups[name][i]
+            row[name] = value.item() if isinstance(value, np.generic) else value
+            if isinstance(row[name], float) and row[name] != row[name]:
+                row[name] = None
+        yield row
+
+
+def print_groups(title: str, groups: Dict[str, np.ndarray], dimensions: Sequence[str]) -> None:
+    print(f"\n{Fore.MAGENTA}📊 {title}")
+    label_width = max([24] + [len(str(label)) + 2 for d in dimensions for label in groups[d][:50]])
+    header = "".join(f"{d:<{label_width}}" for d in dimensions)
+    print(f"{Fore.WHITE}{header}{'count':>10}{'pagu':>20}{'hps':>20}{'hps/pagu':>10}")
+    for row in table_rows(groups):
+        labels = "".join(f"{str(row[d]) or '(none)':<{label_width}}" for d in dimensions)
+        ratio = f"{row['hps_ratio']:.3f}" if row["hps_ratio"] is not None else "-"
+        print(f"{Fore.WHITE}{labels}{row['count']:>10}{row['pagu_sum']:>20,.0f}{row['hps_sum']:>20,.0f}{ratio:>10}")
+
+
+# Benchmark against the dict loop this module replaces
+
+def synthetic_rows(rows: int, seed: int = 0) -> Iterator[Dict]:
+    """Paket-shaped dicts with 500 instansi, 3 jenis, 4 metode and five years of dates"""
+    rng = np.random.default_rng(seed)
+    instansi = [f"Instansi {i}" for i in range(500)]
+    jenis = ["Barang", "Jasa Konsultansi", "Pekerjaan Konstruksi"]
+    metode = ["Tender", "Pengadaan Langsung", "E-Purchasing", "Seleksi"]
+    chunk = 100_000
+    for start in range(0, rows, chunk):
+        size = min(chunk, rows - start)
+        pagu = np.round(rng.lognormal(19, 1.5, size), 2)
+        hps = np.round(pagu * rng.uniform(0.8, 1.0, size), 2)
+        months = rng.integers(2020 * 12, 2025 * 12, size)
+        days = rng.integers(1, 29, size)
+        inst, jen, met = rng.integers(0, len(instansi), size), rng.integers(0, 3, size), rng.integers(0, 4, size)
+        missing = rng.random(size) < 0.01
+        for i in range(size):
+            yield {
+                "id": start + i + 1,
+                "tanggal_pembuatan": None if missing[i] else
+                f"{months[i] // 12:04d}-{months[i] % 12 + 1:02d}-{days[i]:02d}",
+                "kl_pd_instansi": instansi[inst[i]],
+                "jenis_pengadaan": jenis[jen[i]],
+                "metode_pengadaan": metode[met[i]],
+                "nilai_pagu_paket": f"{pagu[i]:.2f}",
+                "nilai_hps_paket": f"{hps[i]:.2f}",
+            }
+
+
+def naive_group_by(rows: List[Dict], key) -> Dict[str, Dict[str, float]]:
+    """The per-dict loop analysts wrote: {group: {count, pagu_sum, hps_sum}}"""
+    groups: Dict[str, Dict[str, float]] = {}
+    for row in rows:
+        group = groups.setdefault(key(row), {"count": 0, "pagu_sum": 0.0, "hps_sum": 0.0})
+        group["count"] += 1
+        group["pagu_sum"] += float(row["nilai_pagu_paket"] or 0)
+        group["hps_sum"] += float(row["nilai_hps_paket"] or 0)
+    return groups
+
+
+def run_benchmark(rows: int, repeat: int = 3) -> Dict:
+    print(f"{Fore.BLUE}🧮 Generating {rows:,} synthetic paket...")
+    records = list(synthetic_rows(rows))
+
+    started = time.perf_counter()
+    frame = PaketFrame.from_records(records)
+    load_seconds = time.perf_counter() - started
+
+    naive_keys = {
+        "instansi": lambda row: row["kl_pd_instansi"] or "",
+        "jenis": lambda row: row["jenis_pengadaan"] or "",
+        "month": lambda row: (row["tanggal_pembuatan"] or "")[:7],
+    }
+    results = {"rows": rows, "load_s": round(load_seconds, 3), "dimensions": {}}
+    for dimension, key in naive_keys.items():
+        naive_times, vector_times = [], []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            naive = naive_group_by(records, key)
+            naive_times.append(time.perf_counter() - started)
+            started = time.perf_counter()
+            vector = frame.group_by(dimension)
+            vector_times.append(time.perf_counter() - started)
+
+        expected = {label: naive.get(label, {"count": -1, "pagu_sum": np.nan}) for label in vector[dimension]}
+        same = (len(naive) == len(vector["count"])
+                and all(expected[label]["count"] == count for label, count in zip(vector[dimension], vector["count"]))
+                and np.allclose([expected[label]["pagu_sum"] for label in vector[dimension]], vector["pagu_sum"]))
+        results["dimensions"][dimension] = {"groups": len(vector["count"]), "naive_s": round(min(naive_times), 4),
+                                            "numpy_s": round(min(vector_times), 4),
+                                            "speedup": round(min(naive_times) / min(vector_times), 1),
+                                            "matches": bool(same)}
+
+    print(f"{Fore.CYAN}   Building the columns took {load_seconds:.2f}s (once per dataset; "
+          f"save() it and load() the .npy files to skip it)")
+    print(f"{Fore.WHITE}   {'group by':<12}{'groups':>8}{'dict loop':>12}{'numpy':>10}{'speedup':>10}")
+    for dimension, numbers in results["dimensions"].items():
+        color = Fore.WHITE if numbers["matches"] else Fore.RED
+        print(f"{color}   {dimension:<12}{numbers['groups']:>8}{numbers['naive_s'] * 1000:>10.0f}ms"
+              f"{numbers['numpy_s'] * 1000:>8.1f}ms{numbers['speedup']:>9.0f}x"
+              f"{'' if numbers['matches'] else '  results differ'}")
+    return results
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build, query and benchmark columnar paket analytics")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="build a column directory from an export file or a running server")
+    source = build.add_mutually_exclusive_group(required=True)
+    source.add_argument("--from-file", help="JSON lines or CSV written by python -m cli export")
+    source.add_argument("--url", help="API base URL to page through")
+    build.add_argument("--workers", type=int, default=4, help="pages fetched in parallel with --url")
+    build.add_argument("--out", required=True, help="directory for the .npy columns")
+
+    report = commands.add_parser("report", help="group-by, top-N or time-bucket report over a column directory")
+    report.add_argument("path", help="directory written by build")
+    report.add_argument("--by", default="instansi", help=f"comma-separated dimensions: {', '.join(DIMENSIONS)}")
+    report.add_argument("--top", type=int, help="only the N largest groups")
+    report.add_argument("--sort", choices=METRICS, default="pagu_sum", help="metric --top ranks by")
+    report.add_argument("--histogram", choices=BUCKETS, help="per time bucket instead, gaps included")
+    report.add_argument("--where", action="append", default=[],
+                        help="filter like jenis=Barang or month_from=2024-01 (repeatable)")
+    report.add_argument("--json", action="store_true", help="print JSON lines instead of a table")
+
+    bench = commands.add_parser("bench", help="vectorized group-by against the dict loop")
+    bench.add_argument("--rows", type=int, default=1_000_000)
+    bench.add_argument("--repeat", type=int, default=3)
+    bench.add_argument("--json", help="write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    if args.command == "bench":
+        results = run_benchmark(args.rows, args.repeat)
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump(results, f)
+        return 0 if all(numbers["matches"] for numbers in results["dimensions"].values()) else 1
+
+    if args.command == "build":
+        started = time.perf_counter()
+        if args.from_file:
+            frame = PaketFrame.from_file(args.from_file)
+        else:
+            from api_client import SimpleCRUDAPIClient
+            frame = PaketFrame.from_api(SimpleCRUDAPIClient(args.url, verbose=False), workers=args.workers)
+        frame.save(args.out)
+        print(f"{Fore.GREEN}✅ {len(frame):,} paket written to {args.out} in {time.perf_counter() - started:.1f}s")
+        return 0
+
+    frame = PaketFrame.load(args.path)
+    filters = dict(condition.split("=", 1) for condition in args.where)
+    where = frame.mask(**filters) if filters else None
+    if args.histogram:
+        dimensions = [args.histogram]
+        groups = frame.histogram(args.histogram, where)
+    else:
+        dimensions = args.by.split(",")
+        if args.top and len(dimensions) == 1:
+            groups = frame.top(dimensions[0], args.top, args.sort, where)
+        else:
+            groups = frame.group_by(dimensions, where)
+            order = np.argsort(-np.nan_to_num(groups[args.sort], nan=-np.inf), kind="stable")[:args.top]
+            groups = {name: column[order] for name, column in groups.items()}
+    if args.json:
+        for row in table_rows(groups):
+            print(json.dumps(row))
+    else:
+        title = f"{len(frame):,} paket by {', '.join(dimensions)}" + (f" where {', '.join(args.where)}" if args.where else "")
+        print_groups(title, groups, dimensions)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
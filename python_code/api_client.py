@@ -3,29 +3,206 @@ Simple CRUD API Client
 A Python client for testing all CRUD operations
 """
 
+import os
+import socket
+import sys
 import requests
 import json
 import time
-from typing import Dict, Any, Optional
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple
 from colorama import init, Fore, Style
+from urllib3.util.request import ACCEPT_ENCODING
 
 # Initialize colorama for colored output
 init(autoreset=True)
 
+class _InFlightRequest:
+    """A GET request on the wire whose response is shared by identical callers"""
+    def __init__(self, epoch: int):
+        # The client's write epoch when the request was sent; later writes make it too old to join
+        self.epoch = epoch
+        self.done = threading.Event()
+        self.response = None
+        self.error = None
+
+class ChangeSubscription:
+    """Background reader of the change stream that calls handler(event) for every event
+    
+    The thread has its own session, so the stream never shares a connection
+    (or the session's connection pool) with the client's other requests.
+    """
+    def __init__(self, client: "SimpleCRUDAPIClient", handler: Callable[[Dict], None],
+                 since: Optional[int] = None):
+        self.client = client
+        self.handler = handler
+        self.last_event_id = since
+        self._stop = threading.Event()
+        self._response = None
+        self._session = requests.Session()
+        self._session.headers.update(client.session.headers)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+    
+    def start(self) -> "ChangeSubscription":
+        self._thread.start()
+        return self
+    
+    def stop(self, timeout: float = 5) -> None:
+        """Stop after the current event, even on an idle stream; waits at most `timeout` seconds"""
+        self._stop.set()
+        # A blocked read only notices the stop event when something arrives; shutting the
+        # socket down makes it return now
+        response = self._response
+        if response is not None:
+            _shutdown_stream(response)
+        self._thread.join(timeout)
+    
+    def _connected(self, response: requests.Response) -> None:
+        self._response = response
+        if self._stop.is_set():
+            _shutdown_stream(response)
+    
+    def _run(self) -> None:
+        try:
+            for event in self.client.iter_changes(since=self.last_event_id, stop_event=self._stop,
+                                                  session=self._session, on_connect=self._connected):
+                self.last_event_id = event["id"]
+                try:
+                    self.handler(event)
+                except Exception as e:
+                    print(f"{Fore.RED}❌ Change handler failed for event {event['id']}: {e}")
+        finally:
+            self._response = None
+            self._session.close()
+
+
+def _shutdown_stream(response: requests.Response) -> None:
+    """Shut down the socket under a streamed response, so a read blocked on it returns at once"""
+    raw = response.raw
+    # urllib3 keeps the connection on streamed responses; http.client's file object is the fallback
+    sock = getattr(getattr(raw, "_connection", None), "sock", None)
+    if sock is None:
+        sock = getattr(getattr(getattr(getattr(raw, "_fp", None), "fp", None), "raw", None), "_sock", None)
+    if sock is None:
+        return
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass  # Already closed
+
+
+def format_pool_metrics(metrics: Dict, top: int = 8) -> str:
+    """Render /api/health/metrics data: pool state, acquire wait and the slowest routes by total query time"""
+    pool = metrics.get("pool") or {}
+    acquire = metrics.get("acquire") or {}
+    lines = [
+        f"{Fore.CYAN}🗄️ DB pool: active={pool.get('active', 0)} idle={pool.get('idle', 0)} "
+        f"queued={pool.get('queued', 0)} limit={pool.get('limit', 0)} "
+        f"(peak active={pool.get('peak_active', 0)} queued={pool.get('peak_queued', 0)})",
+        f"{Fore.CYAN}   acquire: n={acquire.get('count', 0)} avg={acquire.get('avg_ms', 0):.1f}ms "
+        f"p95={acquire.get('p95_ms', 0):.1f}ms max={acquire.get('max_ms', 0):.1f}ms "
+        f"errors={acquire.get('errors', 0)}"
+    ]
+    
+    routes = metrics.get("routes") or {}
+    ranked = sorted(routes.items(), key=lambda item: item[1]["query"]["count"] * item[1]["query"]["avg_ms"],
+                    reverse=True)
+    if ranked:
+        lines.append(f"{Fore.WHITE}   {'Route':<38}{'queries':>9}{'avg':>8}{'p95':>8}{'wait p95':>10}{'err':>6}")
+    for route, stats in ranked[:top]:
+        query, wait = stats["query"], stats["acquire"]
+        color = Fore.RED if stats.get("errors") else Fore.WHITE
+        lines.append(f"{color}   {route:<38}{query['count']:>9}{query['avg_ms']:>8.1f}{query['p95_ms']:>8.1f}"
+                     f"{wait['p95_ms']:>10.1f}{stats.get('errors', 0):>6}")
+
+    cache = metrics.get("cache")
+    if cache and cache.get("enabled"):
+        lines.append(f"{Fore.CYAN}🧊 Result cache: hit rate={cache.get('hit_rate', 0):.1%} "
+                     f"entries={cache.get('entries', 0)} {cache.get('bytes', 0) / 1048576:.1f}MB "
+                     f"evictions={cache.get('evictions', 0)} invalidations={cache.get('invalidations', 0)}")
+    return "\n".join(lines)
+
+
+def cache_hit_delta(before: Dict, after: Dict) -> Dict[str, Dict]:
+    """Result-cache hits/misses between two /api/health/metrics "cache" snapshots, overall and per namespace"""
+    def delta(old: Dict, new: Dict) -> Dict:
+        hits = new.get("hits", 0) - old.get("hits", 0)
+        misses = new.get("misses", 0) - old.get("misses", 0)
+        return {"hits": hits, "misses": misses, "hit_rate": hits / (hits + misses) if hits + misses else 0.0}
+
+    result = {"total": delta(before, after)}
+    old_namespaces = before.get("namespaces") or {}
+    for name, counts in (after.get("namespaces") or {}).items():
+        result[name] = delta(old_namespaces.get(name, {}), counts)
+    return result
+
+
 class SimpleCRUDAPIClient:
-    def __init__(self, base_url: str = None):
+    # Server-side limit on records per /api/paket/batch request
+    MAX_BATCH_SIZE = 5000
+    # GET responses kept for If-None-Match revalidation
+    ETAG_CACHE_SIZE = 256
+    
+    def __init__(self, base_url: str = None, verbose: bool = True, reuse_responses: bool = True):
         if base_url is None:
             # If no URL provided, ask user
             base_url = self._get_server_url()
         
         self.base_url = base_url.rstrip('/')
+        # verbose=False skips the banner and response printing (load and bulk tools)
+        self.verbose = verbose
         self.session = requests.Session()
+        # Advertise every encoding urllib3 can decode (br needs the brotli package)
+        self.session.headers["Accept-Encoding"] = ACCEPT_ENCODING
         self.auth_token = None
         
-        print(f"{Fore.BLUE}🔗 Connected to: {self.base_url}")
+        # reuse_responses=False sends every GET to the server: no coalescing and no ETag
+        # revalidation. The load tools use it so they measure the server, not the client's reuse.
+        self.reuse_responses = reuse_responses
+        
+        # Single-flight state: identical concurrent GETs share one response. Every
+        # completed non-GET request bumps the write epoch, and a GET only joins one
+        # sent in the current epoch, so a caller never gets a response older than its own writes.
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        self._write_epoch = 0
+        self.metrics = {"requests": 0, "coalesced": 0, "revalidated": 0}
+        
+        # Conditional GETs: cache key -> (etag, response) in LRU order
+        self._etag_cache = OrderedDict()
+        
+        # Traffic capture (traffic_capture.CaptureRecorder); API_CAPTURE_FILE turns it on for every client
+        self.recorder = None
+        if os.environ.get("API_CAPTURE_FILE"):
+            from traffic_capture import CaptureRecorder
+            self.recorder = CaptureRecorder.shared(os.environ["API_CAPTURE_FILE"], self.base_url)
+        
+        # Throttling (throttle.TokenBucket or AdaptiveConcurrency), may be shared by many clients;
+        # API_THROTTLE gives every client in the process the same one, e.g. API_THROTTLE=aimd:max=64
+        self.throttle = None
+        if os.environ.get("API_THROTTLE"):
+            from throttle import shared_throttle
+            self.throttle = shared_throttle(os.environ["API_THROTTLE"])
+        
+        # Favorites write-behind (write_behind.FavoriteWriteQueue), see enable_favorites_write_behind
+        self.favorites_queue = None
+        
+        # Profiling (profiling.ClientProfiler); API_PROFILE names the output files, once per process
+        if os.environ.get("API_PROFILE"):
+            from profiling import start_global
+            start_global(os.environ["API_PROFILE"], os.environ.get("API_PROFILE_MODE", "sampling"))
+        
+        if self.verbose:
+            print(f"{Fore.BLUE}🔗 Connected to: {self.base_url}")
     
     def _get_server_url(self):
-        """Get server URL from user input"""
+        """Get server URL from API_URL, else from user input (the default URL when stdin is not a terminal)"""
+        if os.environ.get("API_URL"):
+            return os.environ["API_URL"]
+        if not sys.stdin.isatty():
+            return "http://localhost:3001"
+        
         print(f"{Fore.CYAN}No server URL provided. Please enter server details:")
         
         host = input(f"{Fore.WHITE}Host (default: localhost): ").strip() or "localhost"
@@ -41,14 +218,136 @@ class SimpleCRUDAPIClient:
         return f"http://{host}:{port}"
         
     def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, 
-                     params: Optional[Dict] = None, use_auth: bool = True) -> requests.Response:
-        """Make HTTP request with proper headers and error handling"""
+                     params: Optional[Dict] = None, use_auth: bool = True,
+                     auth_token: Optional[str] = None) -> requests.Response:
+        """Make HTTP request with proper headers and error handling
+        
+        Identical GET requests issued concurrently (same URL, params and token)
+        are coalesced: only the first one goes to the server and the others
+        wait for and share its response, unless this client finished a write
+        since that first one was sent. Neither that nor the ETag cache applies
+        when reuse_responses is off. With a recorder attached, every call
+        is appended to its capture. `auth_token` is sent instead of the
+        client's own token (the favorites write-behind queue writes for
+        whichever token queued the operation).
+        """
+        if self.recorder is None:
+            return self._perform_request(method, endpoint, data, params, use_auth, auth_token)
+        
+        token = (auth_token or self.auth_token) if use_auth else None
+        started = time.time()
+        response = None
+        try:
+            response = self._perform_request(method, endpoint, data, params, use_auth, auth_token)
+            return response
+        finally:
+            self.recorder.record(method, endpoint, params, data, token, started,
+                                 time.time() - started, response)
+    
+    def _perform_request(self, method: str, endpoint: str, data: Optional[Dict],
+                         params: Optional[Dict], use_auth: bool,
+                         auth_token: Optional[str] = None) -> requests.Response:
         url = f"{self.base_url}{endpoint}"
         headers = {"Content-Type": "application/json"}
         
-        if use_auth and self.auth_token:
-            headers["Authorization"] = f"Bearer {self.auth_token}"
+        token = auth_token or self.auth_token
+        if use_auth and token:
+            headers["Authorization"] = f"Bearer {token}"
+        
+        if method.upper() != "GET":
+            with self._inflight_lock:
+                self.metrics["requests"] += 1
+            try:
+                return self._send_request(method, url, headers, data, params)
+            finally:
+                # Even a failed write may have landed
+                with self._inflight_lock:
+                    self._write_epoch += 1
+        
+        if not self.reuse_responses:
+            with self._inflight_lock:
+                self.metrics["requests"] += 1
+            return self._send_request(method, url, headers, data, params)
+        
+        key = (
+            url,
+            tuple(sorted((k, str(v)) for k, v in (params or {}).items())),
+            headers.get("Authorization")
+        )
+        with self._inflight_lock:
+            call = self._inflight.get(key)
+            is_leader = call is None or call.epoch != self._write_epoch
+            if is_leader:
+                call = _InFlightRequest(self._write_epoch)
+                self._inflight[key] = call
+                self.metrics["requests"] += 1
+            else:
+                self.metrics["coalesced"] += 1
+        
+        if not is_leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.response
         
+        try:
+            call.response = self._send_conditional(key, url, headers, params)
+            return call.response
+        except BaseException as e:
+            # Whatever stops the leader (a bug, KeyboardInterrupt) reaches the followers too,
+            # instead of them returning a None response
+            call.error = e
+            raise
+        finally:
+            with self._inflight_lock:
+                # A newer call may have taken the slot after a write
+                if self._inflight.get(key) is call:
+                    del self._inflight[key]
+            call.done.set()
+    
+    def _send_conditional(self, key: Tuple, url: str, headers: Dict,
+                          params: Optional[Dict]) -> requests.Response:
+        """Send a GET, revalidating a previously cached response with If-None-Match
+        
+        A 304 answer returns the cached response; a fresh 200 with an ETag
+        replaces the cache entry.
+        """
+        with self._inflight_lock:
+            cached = self._etag_cache.get(key)
+        
+        if cached:
+            headers = {**headers, "If-None-Match": cached[0]}
+        response = self._send_request("GET", url, headers, None, params)
+        
+        with self._inflight_lock:
+            if response.status_code == 304 and cached:
+                self.metrics["revalidated"] += 1
+                self._etag_cache.move_to_end(key)
+                return cached[1]
+            
+            etag = response.headers.get("ETag")
+            if response.status_code == 200 and etag:
+                self._etag_cache[key] = (etag, response)
+                self._etag_cache.move_to_end(key)
+                while len(self._etag_cache) > self.ETAG_CACHE_SIZE:
+                    self._etag_cache.popitem(last=False)
+            else:
+                self._etag_cache.pop(key, None)
+        
+        return response
+    
+    def _send_request(self, method: str, url: str, headers: Dict, data: Optional[Dict],
+                      params: Optional[Dict]) -> requests.Response:
+        """Send a single HTTP request over the session, through the throttle when there is one
+        
+        The throttle sees 5xx, 429 and transport errors (timeouts, refused
+        connections) as overload; other 4xx answers are the caller's problem.
+        """
+        throttle = self.throttle
+        if throttle is not None:
+            throttle.acquire()
+        started = time.perf_counter()
+        ok = False
         try:
             response = self.session.request(
                 method=method,
@@ -58,13 +357,29 @@ class SimpleCRUDAPIClient:
                 params=params,
                 timeout=10
             )
+            ok = response.status_code < 500 and response.status_code != 429
             return response
         except requests.exceptions.RequestException as e:
-            print(f"{Fore.RED}❌ Request failed: {e}")
+            if self.verbose:
+                print(f"{Fore.RED}❌ Request failed: {e}")
             raise
+        finally:
+            if throttle is not None:
+                throttle.release(time.perf_counter() - started, ok)
+    
+    def get_metrics(self) -> Dict:
+        """Get request counters: coalesced GETs and GETs answered 304 from the ETag cache"""
+        with self._inflight_lock:
+            metrics = dict(self.metrics)
+        calls = metrics["requests"] + metrics["coalesced"]
+        metrics["coalesce_ratio"] = round(metrics["coalesced"] / calls, 4) if calls else 0.0
+        return metrics
     
     def _print_response(self, response: requests.Response, test_name: str) -> Dict:
         """Print formatted response and return JSON data"""
+        if not self.verbose:
+            return self._response_json(response)
+        
         status_color = Fore.GREEN if response.status_code < 400 else Fore.RED
         print(f"{status_color}📡 {test_name}")
         print(f"   Status: {response.status_code}")
@@ -77,12 +392,32 @@ class SimpleCRUDAPIClient:
             print(f"   Response: {response.text}")
             return {"raw": response.text}
     
+    @staticmethod
+    def _response_json(response: requests.Response) -> Dict:
+        try:
+            return response.json()
+        except json.JSONDecodeError:
+            return {"raw": response.text}
+    
     # Health Check
-    def health_check(self) -> Dict:
-        """Test server health"""
+    def health_check(self, metrics: bool = False) -> Dict:
+        """Test server health; metrics=True fetches and renders the database pool metrics instead"""
+        if metrics:
+            result = self.get_health_metrics()
+            if self.verbose:
+                print(format_pool_metrics(result.get("data") or {}))
+            return result
         response = self._make_request("GET", "/health", use_auth=False)
         return self._print_response(response, "Health Check")
     
+    def get_health_metrics(self) -> Dict:
+        """Get pool state, acquire wait and per-route query times from /api/health/metrics"""
+        response = self._make_request("GET", "/api/health/metrics", use_auth=False)
+        try:
+            return response.json()
+        except json.JSONDecodeError:
+            return {"success": False, "raw": response.text}
+    
     # API Documentation
     def get_api_docs(self) -> Dict:
         """Get API documentation"""
@@ -205,14 +540,238 @@ class SimpleCRUDAPIClient:
         response = self._make_request("DELETE", f"/api/paket/{paket_id}", use_auth=False)
         return self._print_response(response, f"Delete Paket ({paket_id})")
     
+    # Paket batch operations
+    def create_paket_batch(self, records: List[Dict], chunk_size: int = 1000, print_chunks: bool = False) -> Dict:
+        """Create or update many paket (matched on md5_hash), chunked into batch requests
+        
+        An existing paket only gets the fields its record carries.
+        """
+        return self._send_batch("POST", "items", records, chunk_size, "Create Paket Batch",
+                                print_chunks=print_chunks)
+    
+    def update_paket_batch(self, updates: List[Dict], chunk_size: int = 1000, print_chunks: bool = False) -> Dict:
+        """Update many paket; each update is a dict with "id" plus the fields to change"""
+        return self._send_batch("PUT", "items", updates, chunk_size, "Update Paket Batch",
+                                print_chunks=print_chunks)
+    
+    def delete_paket_batch(self, paket_ids: List[int], chunk_size: int = 1000, print_chunks: bool = False) -> Dict:
+        """Delete many paket by ID"""
+        return self._send_batch("DELETE", "ids", paket_ids, chunk_size, "Delete Paket Batch",
+                                print_chunks=print_chunks)
+    
+    def _send_batch(self, method: str, key: str, items: List, chunk_size: int, test_name: str,
+                    endpoint: str = "/api/paket/batch", use_auth: bool = False,
+                    print_chunks: bool = False) -> Dict:
+        """Send items to a batch endpoint (default /api/paket/batch) in chunks and merge the per-item results
+        
+        Verbose clients print one summary for the whole batch, or every chunk's
+        response with print_chunks=True.
+        """
+        chunk_size = max(1, min(chunk_size, self.MAX_BATCH_SIZE))
+        chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+        merged = {"success": True, "data": {"results": [], "summary": {}}}
+        
+        for number, (start, chunk) in enumerate(zip(range(0, len(items), chunk_size), chunks), 1):
+            response = self._make_request(method, endpoint, data={key: chunk}, use_auth=use_auth)
+            if print_chunks:
+                result = self._print_response(response, f"{test_name} (chunk {number}/{len(chunks)})")
+            else:
+                result = self._response_json(response)
+            
+            if not result.get("success"):
+                merged["success"] = False
+                merged["error"] = result.get("error", f"Chunk {number} failed")
+                break
+            
+            data = result.get("data", {})
+            for item in data.get("results", []):
+                item["index"] += start
+                merged["data"]["results"].append(item)
+            for status, count in data.get("summary", {}).items():
+                merged["data"]["summary"][status] = merged["data"]["summary"].get(status, 0) + count
+        
+        if self.verbose and not print_chunks:
+            status_color = Fore.GREEN if merged["success"] else Fore.RED
+            print(f"{status_color}📡 {test_name} ({len(items)} items in {len(chunks)} chunks)")
+            print(f"   Summary: {json.dumps(merged['data']['summary'])}")
+            if not merged["success"]:
+                print(f"   Error: {merged['error']}")
+        return merged
+    
+    # Change feed
+    def get_changes(self, since: int = None, wait: int = 0) -> Dict:
+        """Long-poll for change events after `since`, waiting up to `wait` seconds"""
+        params = {"wait": wait}
+        if since is not None:
+            params["since"] = since
+        response = self._make_request("GET", "/api/changes", params=params)
+        return self._print_response(response, "Get Changes")
+    
+    def iter_changes(self, since: int = None, reconnect: bool = True,
+                     stop_event: threading.Event = None, retry_delay: float = 2,
+                     session: requests.Session = None,
+                     on_connect: Callable[[requests.Response], None] = None) -> Iterator[Dict]:
+        """Yield change events from the SSE stream
+        
+        Paket events are always included; favorites events of the logged-in user
+        when a token is set. After a disconnect the stream is resumed with
+        Last-Event-ID. The server assigns event ids in commit order, so a resumed
+        stream misses nothing unless the events were pruned from change_events
+        meanwhile. An event yielded just before a disconnect is not sent again.
+        
+        `stop_event` is checked after every event and heartbeat (every 15 s on an
+        idle stream); to stop sooner, shut the response passed to `on_connect`
+        down from another thread, as ChangeSubscription.stop() does. `session`
+        replaces the client's session for the stream.
+        """
+        url = f"{self.base_url}/api/changes/stream"
+        session = session or self.session
+        last_event_id = since
+        
+        while not (stop_event and stop_event.is_set()):
+            headers = {"Accept": "text/event-stream"}
+            if self.auth_token:
+                headers["Authorization"] = f"Bearer {self.auth_token}"
+            if last_event_id is not None:
+                headers["Last-Event-ID"] = str(last_event_id)
+            
+            try:
+                with session.get(url, headers=headers, stream=True, timeout=(10, 60)) as response:
+                    if response.status_code != 200:
+                        self._print_response(response, "Change Stream")
+                        return
+                    if on_connect is not None:
+                        on_connect(response)
+                    for event_id, data in self._parse_sse(response):
+                        if event_id is not None:
+                            last_event_id = int(event_id)
+                        if data is not None:
+                            yield json.loads(data)
+                        if stop_event and stop_event.is_set():
+                            return
+            except requests.exceptions.RequestException as e:
+                if stop_event and stop_event.is_set():
+                    # The stream was shut down to stop it
+                    return
+                if not reconnect:
+                    raise
+                print(f"{Fore.YELLOW}⚠️ Change stream interrupted, reconnecting: {e}")
+            
+            if not reconnect:
+                return
+            time.sleep(retry_delay)
+    
+    def subscribe_changes(self, handler: Callable[[Dict], None], since: int = None) -> ChangeSubscription:
+        """Call handler(event) for each change event on a background thread"""
+        return ChangeSubscription(self, handler, since).start()
+    
+    @staticmethod
+    def _parse_sse(response: requests.Response) -> Iterator[Tuple[Optional[str], Optional[str]]]:
+        """Yield (event id, data) per server-sent event block
+        
+        data is None for id-only blocks; comment blocks (heartbeats) yield
+        (None, None), so the caller regains control on an idle stream.
+        """
+        event_id, data = None, []
+        for line in response.iter_lines(chunk_size=None, decode_unicode=True):
+            if line == "":
+                yield event_id, "\n".join(data) if data else None
+                event_id, data = None, []
+            elif line.startswith(":"):
+                continue
+            else:
+                field, _, value = line.partition(":")
+                value = value[1:] if value.startswith(" ") else value
+                if field == "id":
+                    event_id = value
+                elif field == "data":
+                    data.append(value)
+    
+    # Statistics
+    def get_stats_summary(self) -> Dict:
+        """Get pre-aggregated paket stats (per month, instansi, jenis and metode)"""
+        response = self._make_request("GET", "/api/stats/summary", use_auth=False)
+        return self._print_response(response, "Get Stats Summary")
+    
     # Favorites CRUD
-    def get_all_favorites(self) -> Dict:
-        """Get all user favorites"""
-        response = self._make_request("GET", "/api/favorites")
+    def get_all_favorites(self, limit: int = None, cursor: str = None, fields: List[str] = None) -> Dict:
+        """Get user favorites, newest first
+        
+        Without limit or cursor the server returns every favorite at once. With
+        them it returns one page and `pagination.next_cursor` while more remain.
+        `fields` limits the paket columns (and notes) returned.
+        """
+        failed = self._flush_queued_favorites()
+        if failed:
+            return failed
+        params = {}
+        if limit is not None:
+            params["limit"] = limit
+        if cursor:
+            params["cursor"] = cursor
+        if fields:
+            params["fields"] = ",".join(fields)
+        response = self._make_request("GET", "/api/favorites", params=params or None)
         return self._print_response(response, "Get All Favorites")
     
+    def iter_favorites(self, page_size: int = 500, fields: List[str] = None) -> Iterator[Dict]:
+        """Yield every favorite, newest first, fetching one cursor page at a time"""
+        cursor = None
+        while True:
+            result = self.get_all_favorites(limit=page_size, cursor=cursor, fields=fields)
+            if not result.get("success"):
+                raise RuntimeError(result.get("error", "Failed to fetch favorites"))
+            yield from result.get("data", [])
+            cursor = (result.get("pagination") or {}).get("next_cursor")
+            if not cursor:
+                return
+    
+    def enable_favorites_write_behind(self, window: float = 0.5, max_batch: int = 500):
+        """Queue add_to_favorites / remove_from_favorites instead of sending each one
+        
+        Operations on the same md5_hash within `window` seconds coalesce into
+        their net result, written in batches of up to `max_batch` through
+        POST /api/favorites/batch. They return {"success": True, "queued": True}
+        immediately. Call flush_favorites() where they must be durable; the
+        rest is flushed at exit. Returns the write_behind.FavoriteWriteQueue.
+        """
+        from write_behind import FavoriteWriteQueue
+        if self.favorites_queue is None:
+            self.favorites_queue = FavoriteWriteQueue(self, window=window, max_batch=max_batch)
+        return self.favorites_queue
+    
+    def flush_favorites(self) -> Dict:
+        """Write queued favorite operations now (no-op without write-behind)"""
+        if self.favorites_queue is None:
+            return {"success": True, "written": 0, "summary": {}, "error": None}
+        return self.favorites_queue.flush()
+    
+    def _flush_queued_favorites(self) -> Optional[Dict]:
+        """Write queued favorite operations so reads and clears see them; returns an error result on failure
+        
+        Flushes even when nothing is pending: flush() waits for a batch the
+        background writer has in flight.
+        """
+        if self.favorites_queue is None:
+            return None
+        result = self.favorites_queue.flush()
+        if result["success"]:
+            return None
+        error = f"Queued favorite operations could not be written: {result['error']}"
+        if self.verbose:
+            print(f"{Fore.RED}❌ {error}")
+        return {"success": False, "error": error}
+    
+    def apply_favorites_batch(self, items: List[Dict], chunk_size: int = 1000, print_chunks: bool = False) -> Dict:
+        """Add and remove many favorites; items are {"md5_hash", "action": "add" | "remove", "notes"?}"""
+        return self._send_batch("POST", "items", items, chunk_size, "Favorites Batch",
+                                endpoint="/api/favorites/batch", use_auth=True, print_chunks=print_chunks)
+    
     def add_to_favorites(self, md5_hash: str, notes: str = None) -> Dict:
         """Add paket to favorites using md5_hash"""
+        if self.favorites_queue is not None:
+            self.favorites_queue.add(md5_hash, notes)
+            return {"success": True, "queued": True}
         data = {"md5_hash": md5_hash}
         if notes:
             data["notes"] = notes
@@ -221,20 +780,33 @@ class SimpleCRUDAPIClient:
     
     def remove_from_favorites(self, md5_hash: str) -> Dict:
         """Remove paket from favorites using md5_hash"""
+        if self.favorites_queue is not None:
+            self.favorites_queue.remove(md5_hash)
+            return {"success": True, "queued": True}
         response = self._make_request("DELETE", f"/api/favorites/{md5_hash}")
         return self._print_response(response, f"Remove from Favorites (MD5: {md5_hash})")
     
     def check_favorite_status(self, md5_hash: str) -> Dict:
         """Check if paket is in favorites using md5_hash"""
+        failed = self._flush_queued_favorites()
+        if failed:
+            return failed
         response = self._make_request("GET", f"/api/favorites/check/{md5_hash}")
         return self._print_response(response, f"Check Favorite Status (MD5: {md5_hash})")
     
     def get_favorites_stats(self) -> Dict:
         """Get favorites statistics"""
+        failed = self._flush_queued_favorites()
+        if failed:
+            return failed
         response = self._make_request("GET", "/api/favorites/stats")
         return self._print_response(response, "Get Favorites Statistics")
     
     def clear_all_favorites(self) -> Dict:
         """Clear all favorites"""
+        # Queued adds left unwritten would bring favorites back after the clear
+        failed = self._flush_queued_favorites()
+        if failed:
+            return failed
         response = self._make_request("DELETE", "/api/favorites")
         return self._print_response(response, "Clear All Favorites")
@@ -0,0 +1,198 @@
+"""
+Auth Micro-Benchmark
+Measures requests/second for login and for token verification with and without a cache hit
+"""
+
+import argparse
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+from typing import Callable, Dict, List
+
+import requests
+from colorama import Fore
+
+from api_client import SimpleCRUDAPIClient
+from load_runner import LatencyHistogram
+
+PHASES = ["login", "verify-hit", "verify-miss"]
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def mint_token(payload: Dict, secret: str) -> str:
+    """HS256 JWT, as jsonwebtoken signs it on the server"""
+    header = _b64url(json.dumps({"alg": "HS256", "typ": "JWT"}, separators=(",", ":")).encode())
+    body = _b64url(json.dumps(payload, separators=(",", ":")).encode())
+    signature = hmac.new(secret.encode(), f"{header}.{body}".encode(), hashlib.sha256).digest()
+    return f"{header}.{body}.{_b64url(signature)}"
+
+
+class PhaseResult:
+    def __init__(self, name: str):
+        self.name = name
+        self.latency = LatencyHistogram()
+        self.errors = 0
+        self.duration = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, ok: bool) -> None:
+        with self._lock:
+            self.latency.record(seconds)
+            self.errors += not ok
+
+    def rps(self) -> float:
+        return self.latency.count / self.duration if self.duration else 0.0
+
+
+class AuthBenchmark:
+    """Closed-loop runs of the three auth paths against one benchmark user
+
+    login        POST /api/auth/login (user lookup, bcrypt compare, token signing)
+    verify-hit   GET /api/users/profile, always with the same token
+    verify-miss  GET /api/users/profile, each time with a freshly minted token,
+                 so the server has to check the signature on every request
+
+    The two verify phases hit the same route, so the gap between them is the
+    cost of signature verification. Fresh tokens are signed with `jwt_secret`,
+    which must match the server's JWT_SECRET.
+    """
+
+    def __init__(self, base_url: str, seconds: float = 10, concurrency: int = 8,
+                 jwt_secret: str = "your-secret-key"):
+        self.base_url = base_url
+        self.seconds = seconds
+        self.concurrency = concurrency
+        self.jwt_secret = jwt_secret
+        self.results: Dict[str, PhaseResult] = {}
+        self.user: Dict = {}
+        self.token = None
+
+    def setup(self) -> None:
+        client = SimpleCRUDAPIClient(self.base_url, verbose=False)
+        suffix = f"{int(time.time())}_{secrets.token_hex(3)}"
+        self.user = {"username": f"authbench_{suffix}", "email": f"authbench_{suffix}@example.com",
+                     "password": "authbench123", "full_name": "Auth Benchmark"}
+        response = client._make_request("POST", "/api/auth/register", data=self.user, use_auth=False)
+        if response.status_code != 201:
+            raise RuntimeError(f"could not register the benchmark user: {response.status_code} {response.text}")
+        body = response.json()
+        self.user["user_id"] = body["data"]["user_id"]
+        self.token = body["token"]
+
+    def teardown(self) -> None:
+        client = SimpleCRUDAPIClient(self.base_url, verbose=False)
+        client.auth_token = self.token
+        try:
+            client._make_request("DELETE", "/api/users/account")
+        except requests.exceptions.RequestException:
+            pass
+
+    def _fresh_token(self) -> str:
+        now = int(time.time())
+        return mint_token({"userId": self.user["user_id"], "email": self.user["email"],
+                           "jti": secrets.token_hex(8), "iat": now, "exp": now + 3600}, self.jwt_secret)
+
+    def _login(self, client: SimpleCRUDAPIClient) -> requests.Response:
+        return client._make_request("POST", "/api/auth/login", use_auth=False,
+                                    data={"email": self.user["email"], "password": self.user["password"]})
+
+    def _verify_hit(self, client: SimpleCRUDAPIClient) -> requests.Response:
+        client.auth_token = self.token
+        return client._make_request("GET", "/api/users/profile")
+
+    def _verify_miss(self, client: SimpleCRUDAPIClient) -> requests.Response:
+        client.auth_token = self._fresh_token()
+        return client._make_request("GET", "/api/users/profile")
+
+    def run_phase(self, name: str, call: Callable[[SimpleCRUDAPIClient], requests.Response]) -> PhaseResult:
+        result = PhaseResult(name)
+        deadline = time.perf_counter() + self.seconds
+
+        def worker():
+            # Every call reaches the server: no GET coalescing, no ETag revalidation
+            client = SimpleCRUDAPIClient(self.base_url, verbose=False, reuse_responses=False)
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    ok = call(client).status_code == 200
+                except requests.exceptions.RequestException:
+                    ok = False
+                result.record(time.perf_counter() - started, ok)
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(self.concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        result.duration = time.perf_counter() - started
+        self.results[name] = result
+        return result
+
+    def run(self, phases: List[str] = None) -> Dict[str, PhaseResult]:
+        calls = {"login": self._login, "verify-hit": self._verify_hit, "verify-miss": self._verify_miss}
+        self.setup()
+        try:
+            for name in phases or PHASES:
+                print(f"{Fore.BLUE}⏱️ {name}: {self.concurrency} threads for {self.seconds:.0f}s")
+                self.run_phase(name, calls[name])
+        finally:
+            self.teardown()
+        return self.results
+
+    def print_report(self) -> None:
+        ms = lambda seconds: f"{seconds * 1000:9.2f}"
+        print(f"\n{Fore.CYAN}{'='*70}")
+        print(f"{Fore.CYAN}🔐 AUTH BENCHMARK ({self.concurrency} threads)")
+        print(f"{Fore.CYAN}{'='*70}")
+        print(f"{Fore.WHITE}{'Phase':<14}{'requests':>10}{'req/s':>10}{'p50':>9}{'p99':>9}{'errors':>8}")
+        for result in self.results.values():
+            color = Fore.RED if result.errors else Fore.GREEN
+            print(f"{color}{result.name:<14}{result.latency.count:>10}{result.rps():>10.1f}"
+                  f"{ms(result.latency.percentile(50))}{ms(result.latency.percentile(99))}{result.errors:>8}")
+        print(f"{Fore.WHITE}Latencies in ms.")
+
+        miss = self.results.get("verify-miss")
+        if miss and miss.errors == miss.latency.count:
+            print(f"{Fore.YELLOW}⚠️ Every verify-miss request failed: does --jwt-secret match the server's JWT_SECRET?")
+
+    def to_dict(self) -> Dict:
+        return {name: {"requests": result.latency.count, "rps": result.rps(), "errors": result.errors,
+                       "duration": result.duration, "latency": result.latency.to_dict()}
+                for name, result in self.results.items()}
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Requests/second for login, verify-hit and verify-miss")
+    parser.add_argument("--url", default="http://localhost:3001")
+    parser.add_argument("--seconds", type=float, default=10, help="length of each phase")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--phases", default=",".join(PHASES), help="comma-separated subset of " + ", ".join(PHASES))
+    parser.add_argument("--jwt-secret", default=os.environ.get("JWT_SECRET", "your-secret-key"),
+                        help="the server's JWT_SECRET, used to sign verify-miss tokens")
+    parser.add_argument("--json", help="write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    print(f"{Fore.MAGENTA}🔐 Auth benchmark against {args.url}")
+    benchmark = AuthBenchmark(args.url, args.seconds, args.concurrency, args.jwt_secret)
+    benchmark.run(args.phases.split(","))
+    benchmark.print_report()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(benchmark.to_dict(), f)
+
+    return 1 if any(result.errors for result in benchmark.results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
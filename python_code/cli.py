@@ -0,0 +1,299 @@
+"""
+API Command Line
+Non-interactive entry point for scripted use: python -m cli <health|list|export|import|bench|load> [options]
+"""
+
+# Only the standard library is imported up front; each command imports the client
+# (requests, colorama, urllib3) when it runs, so --help and config errors stay fast.
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, Iterator, List
+
+DEFAULTS = {"url": "http://localhost:3001", "token": None, "throttle": None}
+# Settings read from the environment when not given as flags
+ENVIRONMENT = {"url": "API_URL", "token": "API_TOKEN", "throttle": "API_THROTTLE"}
+DEFAULT_CONFIG = os.path.join(os.path.expanduser("~"), ".crud-api.json")
+
+
+def load_settings(args: argparse.Namespace) -> Dict:
+    """Flags over environment over config file over defaults
+
+    The config file is JSON with any of the DEFAULTS keys: --config, else
+    $API_CONFIG, else ~/.crud-api.json when it exists.
+    """
+    settings = dict(DEFAULTS)
+    path = args.config or os.environ.get("API_CONFIG")
+    if path or os.path.exists(DEFAULT_CONFIG):
+        with open(path or DEFAULT_CONFIG) as f:
+            settings.update({key: value for key, value in json.load(f).items() if key in DEFAULTS})
+    for key, name in ENVIRONMENT.items():
+        if os.environ.get(name):
+            settings[key] = os.environ[name]
+    for key in DEFAULTS:
+        if getattr(args, key, None) is not None:
+            settings[key] = getattr(args, key)
+    return settings
+
+
+def make_client(settings: Dict):
+    from api_client import SimpleCRUDAPIClient
+    client = SimpleCRUDAPIClient(settings["url"], verbose=False)
+    client.auth_token = settings["token"]
+    if settings["throttle"]:
+        from throttle import shared_throttle
+        client.throttle = shared_throttle(settings["throttle"])
+    return client
+
+
+def report_throttle(client) -> None:
+    if client.throttle is not None:
+        print(f"# throttle {json.dumps(client.throttle.snapshot())}", file=sys.stderr)
+
+
+def write_json(data, stream=None) -> None:
+    json.dump(data, stream or sys.stdout, default=str)
+    (stream or sys.stdout).write("\n")
+
+
+def cmd_health(args: argparse.Namespace, settings: Dict) -> int:
+    client = make_client(settings)
+    result = client.get_health_metrics() if args.metrics else client.health_check()
+    write_json(result)
+    return 0 if result.get("success") else 1
+
+
+def cmd_list(args: argparse.Namespace, settings: Dict) -> int:
+    result = make_client(settings).get_all_paket(search=args.search, page=args.page, limit=args.limit)
+    if not result.get("success"):
+        write_json(result, sys.stderr)
+        return 1
+    if args.format == "json":
+        write_json(result)
+    elif args.format == "jsonl":
+        for row in result["data"]:
+            write_json(row)
+    else:
+        for row in result["data"]:
+            print(f"{row.get('id')}\t{row.get('kode_paket')}\t{row.get('nilai_pagu_paket')}\t{row.get('nama_paket')}")
+        pagination = result.get("pagination", {})
+        print(f"# page {pagination.get('page')}/{pagination.get('totalPages')}, {pagination.get('total')} paket",
+              file=sys.stderr)
+    return 0
+
+
+def iter_paket(client, search: str = None, page_size: int = 1000, workers: int = 1) -> Iterator[Dict]:
+    """Every paket (matching search) in the list's id order; pages after the first are fetched by `workers` threads"""
+    def fetch(page: int) -> Dict:
+        result = client.get_all_paket(search=search, page=page, limit=page_size)
+        if not result.get("success"):
+            raise RuntimeError(f"page {page} failed: {result.get('error') or result.get('raw', '')[:200]}")
+        return result
+
+    first = fetch(1)
+    yield from first["data"]
+    pages = range(2, first["pagination"]["totalPages"] + 1)
+    if workers <= 1:
+        for page in pages:
+            yield from fetch(page)["data"]
+        return
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(workers) as executor:
+        for result in executor.map(fetch, pages):
+            yield from result["data"]
+
+
+def cmd_export(args: argparse.Namespace, settings: Dict) -> int:
+    client = make_client(settings)
+    output = sys.stdout if args.output == "-" else open(args.output, "w", newline="")
+    count = 0
+    try:
+        if args.format == "csv":
+            import csv
+            writer = None
+            for row in iter_paket(client, args.search, args.page_size, args.workers):
+                if writer is None:
+                    writer = csv.DictWriter(output, fieldnames=list(row), extrasaction="ignore")
+                    writer.writeheader()
+                writer.writerow(row)
+                count += 1
+        else:
+            for row in iter_paket(client, args.search, args.page_size, args.workers):
+                write_json(row, output)
+                count += 1
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    print(f"# exported {count} paket", file=sys.stderr)
+    report_throttle(client)
+    return 0
+
+
+def read_records(path: str) -> List[Dict]:
+    """Paket records from a JSON array, JSON lines (as written by export) or CSV file; "-" reads stdin"""
+    stream = sys.stdin if path == "-" else open(path, newline="")
+    try:
+        if path.endswith(".csv"):
+            import csv
+            return [{key: value for key, value in row.items() if value != ""} for row in csv.DictReader(stream)]
+        text = stream.read()
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    if text.lstrip().startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def cmd_import(args: argparse.Namespace, settings: Dict) -> int:
+    records = read_records(args.file)
+    client = make_client(settings)
+    chunks = [records[i:i + args.chunk_size] for i in range(0, len(records), args.chunk_size)]
+    if args.workers > 1:
+        # Chunks are independent upserts keyed on md5_hash, so they may land in any order
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(args.workers) as executor:
+            results = list(executor.map(lambda chunk: client.create_paket_batch(chunk, len(chunk)), chunks))
+    else:
+        results = [client.create_paket_batch(records, chunk_size=args.chunk_size)] if records else []
+
+    summary: Dict[str, int] = {}
+    for result in results:
+        for status, count in result.get("data", {}).get("summary", {}).items():
+            summary[status] = summary.get(status, 0) + count
+    errors = [result["error"] for result in results if result.get("error")]
+    success = all(result.get("success") for result in results)
+    write_json({"success": success, "records": len(records), "summary": summary,
+                "error": "; ".join(errors) or None})
+    report_throttle(client)
+    return 0 if success and not summary.get("error") else 1
+
+
+def measure_startup(commands: Dict[str, List[str]], runs: int) -> Dict[str, Dict]:
+    """Wall time of fresh interpreter processes, per command"""
+    results = {}
+    for name, command in commands.items():
+        times = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                           cwd=os.path.dirname(os.path.abspath(__file__)), check=False)
+            times.append((time.perf_counter() - started) * 1000)
+        times.sort()
+        results[name] = {"runs": runs, "median_ms": statistics.median(times),
+                         "p90_ms": times[min(len(times) - 1, int(len(times) * 0.9))], "min_ms": times[0]}
+    return results
+
+
+def cmd_bench(args: argparse.Namespace, settings: Dict) -> int:
+    if args.startup:
+        python = sys.executable
+        results = measure_startup({
+            "interpreter": [python, "-c", "pass"],
+            "cli --help": [python, "-m", "cli", "--help"],
+            "import api_client": [python, "-c", "import api_client"],
+        }, args.runs)
+        for name, stats in results.items():
+            print(f"{name:<20}{stats['median_ms']:>9.1f} ms median{stats['p90_ms']:>9.1f} ms p90", file=sys.stderr)
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump(results, f)
+        slow = args.max_ms and results["cli --help"]["median_ms"] > args.max_ms
+        return 1 if slow else 0
+
+    from load_runner import ClosedLoopRunner
+    runner = ClosedLoopRunner(settings["url"], args.duration, concurrency=args.concurrency,
+                              auth_token=settings["token"])
+    report = runner.run()
+    report.print_report(f"BENCHMARK ({args.concurrency} threads)")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report.to_dict(), f)
+    return 1 if report.total().errors else 0
+
+
+def cmd_load(args: argparse.Namespace, settings: Dict) -> int:
+    forwarded = ["--url", settings["url"]] + (["--token", settings["token"]] if settings["token"] else [])
+    forwarded += [arg for arg in args.options if arg != "--"]
+    if settings["throttle"]:
+        # Every client the runners create (in this process and in worker processes) picks it up
+        os.environ["API_THROTTLE"] = settings["throttle"]
+    if args.processes > 1:
+        import load_workers
+        return load_workers.main(["--processes", str(args.processes)] + forwarded)
+    import load_runner
+    return load_runner.main(forwarded)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m cli", description="Simple CRUD API command line")
+    parser.add_argument("--url", help=f"API base URL (${ENVIRONMENT['url']}, default {DEFAULTS['url']})")
+    parser.add_argument("--token", help=f"bearer token for authenticated routes (${ENVIRONMENT['token']})")
+    parser.add_argument("--throttle", help="aimd[:max=N,...], bucket:RATE[,burst=N] or none ($API_THROTTLE)")
+    parser.add_argument("--config", help=f"JSON settings file ($API_CONFIG, default {DEFAULT_CONFIG})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    health = commands.add_parser("health", help="server health as JSON; exit 1 when unhealthy")
+    health.add_argument("--metrics", action="store_true", help="pool, query and cache metrics instead")
+    health.set_defaults(run=cmd_health)
+
+    listing = commands.add_parser("list", help="one page of paket")
+    listing.add_argument("--search", "-q")
+    listing.add_argument("--page", type=int, default=1)
+    listing.add_argument("--limit", type=int, default=10)
+    listing.add_argument("--format", choices=["table", "json", "jsonl"], default="table")
+    listing.set_defaults(run=cmd_list)
+
+    export = commands.add_parser("export", help="every paket as JSON lines or CSV")
+    export.add_argument("--output", "-o", default="-", help="file to write (default stdout)")
+    export.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+    export.add_argument("--search", "-q")
+    export.add_argument("--page-size", type=int, default=1000)
+    export.add_argument("--workers", type=int, default=1, help="pages fetched in parallel")
+    export.set_defaults(run=cmd_export)
+
+    load = commands.add_parser("import", help="create or update paket from a JSON, JSON lines or CSV file")
+    load.add_argument("file", help='file written by export, or "-" for stdin')
+    load.add_argument("--chunk-size", type=int, default=1000)
+    load.add_argument("--workers", type=int, default=1, help="batch requests sent in parallel")
+    load.set_defaults(run=cmd_import)
+
+    bench = commands.add_parser("bench", help="closed-loop benchmark, or --startup for CLI startup time")
+    bench.add_argument("--duration", type=float, default=10)
+    bench.add_argument("--concurrency", type=int, default=8)
+    bench.add_argument("--startup", action="store_true", help="time fresh interpreter, CLI and client startup")
+    bench.add_argument("--runs", type=int, default=20, help="processes per startup measurement")
+    bench.add_argument("--max-ms", type=float, help="fail when the CLI's median startup exceeds this")
+    bench.add_argument("--json", help="write the results as JSON to this file")
+    bench.set_defaults(run=cmd_bench)
+
+    run = commands.add_parser("load", help="open-loop load test (options after -- go to load_runner.py)")
+    run.add_argument("--processes", type=int, default=1, help="above 1, run through load_workers.py")
+    run.add_argument("options", nargs=argparse.REMAINDER)
+    run.set_defaults(run=cmd_load)
+    return parser
+
+
+def main(argv: List[str] = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        settings = load_settings(args)
+    except (OSError, ValueError) as e:
+        print(f"cannot read config: {e}", file=sys.stderr)
+        return 2
+    if settings["throttle"]:
+        from throttle import shared_throttle
+        try:
+            shared_throttle(settings["throttle"])
+        except ValueError as e:
+            print(f"invalid throttle: {e}", file=sys.stderr)
+            return 2
+    return args.run(args, settings)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
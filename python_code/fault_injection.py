@@ -0,0 +1,242 @@
+"""
+Fault Injection
+Per-route latency, errors, connection resets and bandwidth caps for the stand-in server
+"""
+
+import argparse
+import fnmatch
+import json
+import math
+import random
+import socket
+import struct
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+import requests
+from colorama import Fore
+
+# Named rule sets for --faults; anything else is read as a JSON file
+PRESETS: Dict[str, List[Dict]] = {
+    # MySQL under load: most queries quick, a heavy tail of slow ones
+    "slow-mysql": [
+        {"route": "/api/paket*", "latency": {"dist": "lognormal", "median_ms": 40, "p99_ms": 800}},
+        {"route": "/api/favorites*", "latency": {"dist": "lognormal", "median_ms": 20, "p99_ms": 400}},
+        {"route": "/api/stats*", "latency": {"dist": "lognormal", "median_ms": 60, "p99_ms": 1500}},
+    ],
+    # Pool exhaustion (queueLimit reached) and a proxy dropping connections
+    "flaky": [
+        {"route": "/api/*", "error_rate": 0.05, "error_status": 503, "reset_rate": 0.01,
+         "latency": {"dist": "exponential", "mean_ms": 10}},
+    ],
+    # bcrypt-bound auth plus a slow link for the list payloads
+    "slow-auth": [
+        {"route": "/api/auth/*", "latency": {"dist": "uniform", "min_ms": 80, "max_ms": 250}},
+        {"route": "/api/paket", "methods": ["GET"], "bandwidth_kbps": 256},
+    ],
+}
+
+
+def sample_latency(spec: Optional[Dict], rng: random.Random) -> float:
+    """Seconds of added latency drawn from a distribution spec
+
+        {"dist": "fixed", "ms": 50}
+        {"dist": "uniform", "min_ms": 10, "max_ms": 100}
+        {"dist": "exponential", "mean_ms": 20}
+        {"dist": "lognormal", "median_ms": 30, "p99_ms": 500}
+
+    Every kind accepts "max_ms" as a cap.
+    """
+    if not spec:
+        return 0.0
+    dist = spec.get("dist", "fixed")
+    if dist == "fixed":
+        ms = spec["ms"]
+    elif dist == "uniform":
+        ms = rng.uniform(spec["min_ms"], spec["max_ms"])
+    elif dist == "exponential":
+        ms = rng.expovariate(1 / spec["mean_ms"])
+    elif dist == "lognormal":
+        # 2.326 is the standard normal's 99th percentile
+        sigma = math.log(spec["p99_ms"] / spec["median_ms"]) / 2.326
+        ms = rng.lognormvariate(math.log(spec["median_ms"]), sigma)
+    else:
+        raise ValueError(f"unknown latency distribution {dist!r}")
+    return min(ms, spec.get("max_ms", ms)) / 1000
+
+
+class FaultRule:
+    """Faults for requests whose path matches `route` (a glob, e.g. /api/favorites/*) and, optionally, `methods`"""
+
+    FIELDS = {"route", "methods", "latency", "error_rate", "error_status", "reset_rate", "bandwidth_kbps"}
+
+    def __init__(self, spec: Dict, rng: random.Random):
+        unknown = set(spec) - self.FIELDS
+        if unknown:
+            raise ValueError(f"unknown fault rule fields: {', '.join(sorted(unknown))}")
+        self.spec = spec
+        self.route = spec.get("route", "*")
+        self.methods = {method.upper() for method in spec.get("methods", [])}
+        self.latency = spec.get("latency")
+        self.error_rate = spec.get("error_rate", 0.0)
+        self.error_status = spec.get("error_status", 503)
+        self.reset_rate = spec.get("reset_rate", 0.0)
+        self.bandwidth = spec.get("bandwidth_kbps", 0) * 1024 / 8
+        self.rng = rng
+        sample_latency(self.latency, random.Random(0))
+        self.counts = {"requests": 0, "delayed_s": 0.0, "errors": 0, "resets": 0}
+
+    def matches(self, method: str, path: str) -> bool:
+        return (not self.methods or method in self.methods) and fnmatch.fnmatchcase(path, self.route)
+
+
+class FaultInjector:
+    """Ordered fault rules; the first rule matching a request applies to it
+
+    Each rule draws from its own generator seeded from `seed` and the rule's
+    position, so a client sending requests one at a time sees the same faults
+    on every run. Concurrent clients interleave their draws, so only the
+    distribution is reproducible then.
+    """
+
+    def __init__(self, rules: List[Dict] = None, seed: int = 0):
+        self._lock = threading.Lock()
+        self.set_rules(rules or [], seed)
+
+    def set_rules(self, rules: List[Dict], seed: int = 0) -> None:
+        built = [FaultRule(spec, random.Random(f"{seed}:{index}")) for index, spec in enumerate(rules)]
+        with self._lock:
+            self.rules = built
+            self.seed = seed
+
+    def match(self, method: str, path: str) -> Optional[FaultRule]:
+        return next((rule for rule in self.rules if rule.matches(method, path)), None)
+
+    def decide(self, method: str, path: str) -> Dict:
+        """What to do to this request: {"rule", "delay", "reset", "error"}"""
+        rule = self.match(method, path)
+        if rule is None:
+            return {"rule": None, "delay": 0.0, "reset": False, "error": None}
+        with self._lock:
+            delay = sample_latency(rule.latency, rule.rng)
+            reset = rule.rng.random() < rule.reset_rate
+            error = None if reset or rule.rng.random() >= rule.error_rate else rule.error_status
+            rule.counts["requests"] += 1
+            rule.counts["delayed_s"] += delay
+            rule.counts["resets"] += reset
+            rule.counts["errors"] += error is not None
+        return {"rule": rule, "delay": delay, "reset": reset, "error": error}
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {"seed": self.seed,
+                    "rules": [{**rule.spec, "counts": {**rule.counts, "delayed_s": round(rule.counts["delayed_s"], 3)}}
+                              for rule in self.rules]}
+
+
+def reset_connection(connection: socket.socket) -> None:
+    """Close with SO_LINGER 0, so the peer gets a RST instead of a FIN"""
+    try:
+        connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+        connection.close()
+    except OSError:
+        pass
+
+
+def write_throttled(wfile, body: bytes, bytes_per_second: float) -> None:
+    """Write body in 50 ms slices so it arrives at no more than bytes_per_second"""
+    chunk = max(1, int(bytes_per_second / 20))
+    started = time.perf_counter()
+    for offset in range(0, len(body), chunk):
+        wfile.write(body[offset:offset + chunk])
+        ahead = (offset + chunk) / bytes_per_second - (time.perf_counter() - started)
+        if ahead > 0:
+            time.sleep(ahead)
+
+
+def load_rules(name_or_path: str) -> List[Dict]:
+    """A preset's rules, or the rules in a JSON file (a list, or {"rules": [...]})"""
+    if name_or_path in PRESETS:
+        return PRESETS[name_or_path]
+    with open(name_or_path) as f:
+        data = json.load(f)
+    return data["rules"] if isinstance(data, dict) else data
+
+
+# Scripting a running stand-in server from benchmarks
+
+def configure_faults(base_url: str, rules: List[Dict], seed: int = 0) -> Dict:
+    """Replace the stand-in server's fault rules (an empty list clears them)"""
+    response = requests.put(f"{base_url.rstrip('/')}/__faults", json={"rules": rules, "seed": seed}, timeout=10)
+    response.raise_for_status()
+    return response.json()
+
+
+def get_faults(base_url: str) -> Dict:
+    """The stand-in server's fault rules with per-rule counts"""
+    response = requests.get(f"{base_url.rstrip('/')}/__faults", timeout=10)
+    response.raise_for_status()
+    return response.json()
+
+
+def print_rules(data: Dict) -> None:
+    for rule in data["rules"]:
+        counts = rule.get("counts", {})
+        print(f"{Fore.CYAN}{json.dumps({key: value for key, value in rule.items() if key != 'counts'})}")
+        print(f"{Fore.WHITE}   {counts.get('requests', 0)} requests, {counts.get('delayed_s', 0):.1f}s delay, "
+              f"{counts.get('errors', 0)} errors, {counts.get('resets', 0)} resets")
+    if not data["rules"]:
+        print(f"{Fore.GREEN}✅ No faults configured")
+
+
+class injected_faults:
+    """Apply fault rules to a running stand-in for the duration of a block, then clear them
+
+        with injected_faults(url, load_rules("flaky"), seed=7):
+            runner.run()
+    """
+
+    def __init__(self, base_url: str, rules: List[Dict], seed: int = 0, verbose: bool = False):
+        self.base_url = base_url
+        self.rules = rules
+        self.seed = seed
+        self.verbose = verbose
+        self.counts: Optional[Dict] = None
+
+    def __enter__(self) -> "injected_faults":
+        configure_faults(self.base_url, self.rules, self.seed)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.counts = get_faults(self.base_url).get("data")
+        configure_faults(self.base_url, [])
+        if self.verbose:
+            print(f"{Fore.YELLOW}⚠️ Injected faults:")
+            print_rules(self.counts)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Show, set or clear a running stand-in server's fault rules")
+    parser.add_argument("--url", default="http://localhost:3001")
+    parser.add_argument("action", choices=["show", "set", "clear"])
+    parser.add_argument("rules", nargs="?", help=f"JSON file or preset ({', '.join(PRESETS)}) for set")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.action == "set":
+        if not args.rules:
+            parser.error("set needs a rules file or preset")
+        result = configure_faults(args.url, load_rules(args.rules), args.seed)
+    elif args.action == "clear":
+        result = configure_faults(args.url, [])
+    else:
+        result = get_faults(args.url)
+
+    print_rules(result["data"])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
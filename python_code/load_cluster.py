@@ -0,0 +1,293 @@
+"""
+Load Cluster
+Coordinator/agent mode: agents on several machines connect over TCP and run one scenario in sync
+"""
+
+import argparse
+import json
+import multiprocessing
+import socket
+import sys
+import threading
+import time
+import traceback
+from typing import Dict, List, Optional
+
+from colorama import Fore
+
+from load_runner import Endpoint, LoadReport, add_schedule_arguments, schedule_duration, schedule_spec
+from load_workers import build_runner, default_spec, run_multiprocess, wait_for_start
+
+DEFAULT_PORT = 5557
+
+# Seconds between handing out the config and the common start, long enough for agents to spawn processes
+DEFAULT_START_DELAY = 3.0
+
+# Seconds past the end of the scenario an agent may take to drain and send its report
+DEFAULT_RESULT_GRACE = 60.0
+
+# Protocol: one JSON object per line
+#   agent -> coordinator  {"type": "hello", "agent": name, "processes": n, "clock": time.time()}
+#   coordinator -> agent  {"type": "config", "spec": {...}}     (spec carries shard and start_at)
+#   agent -> coordinator  {"type": "result", "report": {...}}   or {"type": "error", "error": text}
+
+
+def send_message(stream, message: Dict) -> None:
+    stream.write(json.dumps(message).encode() + b"\n")
+    stream.flush()
+
+
+def read_message(stream) -> Optional[Dict]:
+    line = stream.readline()
+    return json.loads(line) if line else None
+
+
+class AgentConnection:
+    """Coordinator side of one connected agent"""
+
+    def __init__(self, sock: socket.socket, stream, hello: Dict, received_at: float):
+        self.sock = sock
+        self.stream = stream
+        self.name = hello.get("agent", "?")
+        self.processes = hello.get("processes", 1)
+        # Agent clock minus coordinator clock, off by at most the one-way network delay
+        self.clock_offset = hello.get("clock", received_at) - received_at
+        self.result: Optional[LoadReport] = None
+        self.error: Optional[str] = None
+
+    def close(self) -> None:
+        self.stream.close()
+        self.sock.close()
+
+
+class LoadCoordinator:
+    """Wait for `agents` agents, give each its share of `spec`, start them together and merge the results
+
+    In open mode agent i of n takes every n-th arrival of the schedule (and
+    splits that again across its processes), so the cluster as a whole sends
+    the requested rate. In closed mode every agent runs the full concurrency.
+
+    An agent that has not reported `result_grace` seconds after the scenario
+    should have ended (hung, or its machine dropped off the network) counts
+    as failed, and the agents that did report are merged without it.
+    """
+
+    def __init__(self, spec: Dict, agents: int, host: str = "0.0.0.0", port: int = DEFAULT_PORT,
+                 start_delay: float = DEFAULT_START_DELAY, join_timeout: float = 60.0,
+                 result_grace: float = DEFAULT_RESULT_GRACE):
+        self.spec = spec
+        self.expected = agents
+        self.start_delay = start_delay
+        self.join_timeout = join_timeout
+        self.result_grace = result_grace
+        self.agents: List[AgentConnection] = []
+        self.server = socket.create_server((host, port))
+        self.port = self.server.getsockname()[1]
+
+    def _accept_agents(self) -> None:
+        self.server.settimeout(self.join_timeout)
+        while len(self.agents) < self.expected:
+            try:
+                sock, address = self.server.accept()
+            except socket.timeout:
+                raise TimeoutError(f"only {len(self.agents)} of {self.expected} agents joined "
+                                   f"within {self.join_timeout:.0f}s")
+            sock.settimeout(self.join_timeout)
+            stream = sock.makefile("rwb")
+            try:
+                hello = read_message(stream)
+            except (OSError, ValueError):
+                hello = None
+            if not hello or hello.get("type") != "hello":
+                stream.close()
+                sock.close()
+                continue
+            agent = AgentConnection(sock, stream, hello, time.time())
+            self.agents.append(agent)
+            print(f"{Fore.GREEN}✅ Agent {agent.name} joined from {address[0]} "
+                  f"({agent.processes} processes, clock offset {agent.clock_offset * 1000:+.1f}ms) "
+                  f"[{len(self.agents)}/{self.expected}]")
+
+    def _scenario_seconds(self) -> float:
+        if self.spec["mode"] == "closed":
+            return self.spec["duration"]
+        return schedule_duration(self.spec["schedule"])
+
+    def _collect(self, agent: AgentConnection) -> None:
+        try:
+            message = read_message(agent.stream)
+        except socket.timeout:
+            message = {"type": "error", "error": f"no result within {agent.sock.gettimeout():.1f}s of the config"}
+        except (OSError, ValueError) as e:
+            message = {"type": "error", "error": str(e)}
+        if message is None:
+            agent.error = "connection closed before a result was sent"
+        elif message["type"] == "result":
+            agent.result = LoadReport.from_dict(message["report"])
+        else:
+            agent.error = message.get("error", "unknown error")
+
+    def run(self) -> LoadReport:
+        try:
+            self._accept_agents()
+            start_at = time.time() + self.start_delay
+            deadline = self.start_delay + self._scenario_seconds() + self.result_grace
+            for shard, agent in enumerate(self.agents):
+                spec = dict(self.spec, shard=[shard, len(self.agents)], start_at=start_at + agent.clock_offset)
+                agent.sock.settimeout(deadline)
+                send_message(agent.stream, {"type": "config", "spec": spec})
+            print(f"{Fore.MAGENTA}🚀 Starting {len(self.agents)} agents in {self.start_delay:.1f}s")
+
+            collectors = [threading.Thread(target=self._collect, args=(agent,), daemon=True)
+                          for agent in self.agents]
+            for thread in collectors:
+                thread.start()
+            for thread in collectors:
+                thread.join()
+
+            merged = LoadReport()
+            for agent in self.agents:
+                if agent.error:
+                    print(f"{Fore.RED}❌ Agent {agent.name} failed:\n{agent.error}")
+                else:
+                    merged.merge(agent.result)
+                    merged.duration = max(merged.duration, agent.result.duration)
+            return merged
+        finally:
+            for agent in self.agents:
+                agent.close()
+            self.server.close()
+
+
+class LoadAgent:
+    """Connect to a coordinator, run the scenario it hands out and send back the report"""
+
+    def __init__(self, coordinator: str, port: int = DEFAULT_PORT, processes: int = 1,
+                 name: str = None, base_url: str = None, connect_timeout: float = 30.0):
+        self.coordinator = coordinator
+        self.port = port
+        self.processes = processes
+        self.name = name or f"{socket.gethostname()}-{id(self):x}"
+        self.base_url = base_url
+        self.connect_timeout = connect_timeout
+
+    def _connect(self) -> socket.socket:
+        deadline = time.monotonic() + self.connect_timeout
+        while True:
+            try:
+                return socket.create_connection((self.coordinator, self.port), timeout=5)
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.2)
+
+    def _execute(self, spec: Dict) -> LoadReport:
+        if self.processes > 1:
+            return run_multiprocess(spec, self.processes, show_progress=False)
+        runner = build_runner(spec, 0, 1)
+        wait_for_start(spec)
+        return runner.run()
+
+    def run(self) -> Optional[LoadReport]:
+        sock = self._connect()
+        sock.settimeout(None)
+        stream = sock.makefile("rwb")
+        try:
+            send_message(stream, {"type": "hello", "agent": self.name, "processes": self.processes,
+                                  "clock": time.time()})
+            message = read_message(stream)
+            if not message or message.get("type") != "config":
+                return None
+
+            spec = message["spec"]
+            if self.base_url:
+                spec["base_url"] = self.base_url
+            try:
+                report = self._execute(spec)
+            except Exception:
+                send_message(stream, {"type": "error", "error": traceback.format_exc()})
+                raise
+            send_message(stream, {"type": "result", "report": report.to_dict()})
+            return report
+        finally:
+            stream.close()
+            sock.close()
+
+
+def load_endpoints(path: str) -> List[List]:
+    """Endpoints from a JSON file: a list of {"name", "method", "path", "params", "use_auth", "weight"}"""
+    with open(path) as f:
+        return [list(Endpoint(**entry)) for entry in json.load(f)]
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Distributed load runs across several machines")
+    roles = parser.add_subparsers(dest="role", required=True)
+
+    coordinator = roles.add_parser("coordinator", help="hand out the scenario and merge results")
+    coordinator.add_argument("--agents", type=int, required=True, help="number of agents to wait for")
+    coordinator.add_argument("--bind", default="0.0.0.0")
+    coordinator.add_argument("--port", type=int, default=DEFAULT_PORT)
+    coordinator.add_argument("--url", default="http://localhost:3001")
+    coordinator.add_argument("--closed", action="store_true",
+                             help="benchmark mode: each thread sends back-to-back for --duration seconds")
+    coordinator.add_argument("--users", type=int, default=8,
+                             help="concurrent users per agent process (closed mode)")
+    add_schedule_arguments(coordinator)
+    coordinator.add_argument("--workers", type=int, default=32, help="sender threads per agent process (open mode)")
+    coordinator.add_argument("--drop-after", type=float, default=5.0)
+    coordinator.add_argument("--token", help="bearer token for authenticated endpoints")
+    coordinator.add_argument("--endpoints", help="JSON file with the endpoint mix (default: README read mix)")
+    coordinator.add_argument("--start-delay", type=float, default=DEFAULT_START_DELAY)
+    coordinator.add_argument("--result-grace", type=float, default=DEFAULT_RESULT_GRACE,
+                             help="seconds after the scenario's end to wait for agent reports")
+    coordinator.add_argument("--json", help="write the merged report as JSON to this file")
+
+    agent = roles.add_parser("agent", help="connect to a coordinator and generate load")
+    agent.add_argument("--coordinator", default="localhost", help="host[:port] of the coordinator")
+    agent.add_argument("--processes", type=int, default=multiprocessing.cpu_count())
+    agent.add_argument("--name", help="agent name shown by the coordinator")
+    agent.add_argument("--url", help="override the API URL handed out by the coordinator")
+
+    args = parser.parse_args(argv)
+
+    if args.role == "agent":
+        host, _, port = args.coordinator.partition(":")
+        print(f"{Fore.CYAN}🔌 Connecting to coordinator {host}:{port or DEFAULT_PORT}")
+        report = LoadAgent(host, int(port or DEFAULT_PORT), args.processes, args.name, args.url).run()
+        if report is None:
+            print(f"{Fore.RED}❌ Coordinator closed the connection without a scenario")
+            return 1
+        total = report.total()
+        print(f"{Fore.GREEN}✅ Sent {total.sent} requests, {total.errors} errors, {total.dropped} dropped")
+        return 0
+
+    spec = default_spec(args.url)
+    spec.update({
+        "mode": "closed" if args.closed else "open",
+        "schedule": schedule_spec(args),
+        "duration": args.duration,
+        "concurrency": args.users,
+        "workers": args.workers,
+        "drop_after": args.drop_after,
+        "auth_token": args.token
+    })
+    if args.endpoints:
+        spec["endpoints"] = load_endpoints(args.endpoints)
+
+    runner = LoadCoordinator(spec, args.agents, args.bind, args.port, args.start_delay,
+                             result_grace=args.result_grace)
+    print(f"{Fore.CYAN}📡 Waiting for {args.agents} agents on port {runner.port}")
+    report = runner.run()
+    report.print_report(f"MERGED REPORT ({args.agents} AGENTS)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report.to_dict(), f)
+
+    total = report.total()
+    return 1 if total.errors or total.dropped else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,542 @@
+"""
+Open-Loop Load Runner
+Fires API requests on a fixed arrival schedule, independent of response times
+"""
+
+import argparse
+import contextlib
+import json
+import math
+import queue
+import random
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+import requests
+from colorama import Fore
+
+from api_client import SimpleCRUDAPIClient, cache_hit_delta, format_pool_metrics
+from fault_injection import injected_faults, load_rules
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram (~2% relative precision) that can be merged"""
+    GROWTH = 1.02
+    _LOG_GROWTH = math.log(GROWTH)
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        micros = max(seconds * 1e6, 1.0)
+        bucket = int(math.log(micros) / self._LOG_GROWTH)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def percentile(self, p: float) -> float:
+        """Latency in seconds at percentile p (0-100); upper edge of the bucket"""
+        if self.count == 0:
+            return 0.0
+        target = max(1, math.ceil(p / 100 * self.count))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= target:
+                return min(self.GROWTH ** (bucket + 1) / 1e6, self.max)
+        return self.max
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for bucket, count in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def to_dict(self) -> Dict:
+        return {
+            "counts": {str(bucket): count for bucket, count in self.counts.items()},
+            "count": self.count,
+            "total": self.total,
+            "min": self.min if self.count else 0.0,
+            "max": self.max
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "LatencyHistogram":
+        histogram = cls()
+        histogram.counts = {int(bucket): count for bucket, count in data["counts"].items()}
+        histogram.count = data["count"]
+        histogram.total = data["total"]
+        histogram.min = data["min"] if data["count"] else math.inf
+        histogram.max = data["max"]
+        return histogram
+
+
+class Endpoint(NamedTuple):
+    """One request type in a load scenario"""
+    name: str
+    method: str
+    path: str
+    params: Optional[Dict] = None
+    use_auth: bool = False
+    weight: float = 1.0
+
+
+# Read-heavy dashboard mix over the public endpoints from the README
+DEFAULT_ENDPOINTS = [
+    Endpoint("GET /api/paket", "GET", "/api/paket", {"page": 1, "limit": 10}, weight=5),
+    Endpoint("GET /api/paket?q", "GET", "/api/paket", {"q": "Laptop", "page": 1, "limit": 10}, weight=2),
+    Endpoint("GET /api/stats", "GET", "/api/stats", weight=2),
+    Endpoint("GET /api/stats/summary", "GET", "/api/stats/summary"),
+    Endpoint("GET /api/health", "GET", "/api/health"),
+]
+
+
+# Arrival schedules: iterables of send offsets in seconds from the start of the run
+
+def constant_schedule(rate: float, duration: float) -> Iterator[float]:
+    """`rate` requests per second for `duration` seconds"""
+    for i in range(int(rate * duration)):
+        yield i / rate
+
+
+def ramp_schedule(start_rate: float, end_rate: float, duration: float) -> Iterator[float]:
+    """Rate changing linearly from start_rate to end_rate over `duration` seconds"""
+    if duration <= 0:
+        return
+    slope = (end_rate - start_rate) / duration
+    if abs(slope) < 1e-12:
+        yield from constant_schedule(start_rate, duration)
+        return
+    total = int((start_rate + end_rate) / 2 * duration)
+    for k in range(total):
+        # Solve start_rate*t + slope*t^2/2 = k for the k-th arrival
+        yield (-start_rate + math.sqrt(start_rate ** 2 + 2 * slope * k)) / slope
+
+
+def step_schedule(steps: List[Tuple[float, float]]) -> Iterator[float]:
+    """Consecutive (rate, duration) plateaus"""
+    offset = 0.0
+    for rate, duration in steps:
+        for t in constant_schedule(rate, duration):
+            yield offset + t
+        offset += duration
+
+
+class EndpointStats:
+    """Counters and histograms for one endpoint of a load run"""
+
+    def __init__(self):
+        self.latency = LatencyHistogram()   # from intended send time
+        self.service = LatencyHistogram()   # from actual send time
+        self.sent = 0
+        self.errors = 0
+        self.late = 0
+        self.dropped = 0
+
+    def merge(self, other: "EndpointStats") -> None:
+        self.latency.merge(other.latency)
+        self.service.merge(other.service)
+        self.sent += other.sent
+        self.errors += other.errors
+        self.late += other.late
+        self.dropped += other.dropped
+
+    def to_dict(self) -> Dict:
+        return {
+            "latency": self.latency.to_dict(),
+            "service": self.service.to_dict(),
+            "sent": self.sent,
+            "errors": self.errors,
+            "late": self.late,
+            "dropped": self.dropped
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "EndpointStats":
+        stats = cls()
+        stats.latency = LatencyHistogram.from_dict(data["latency"])
+        stats.service = LatencyHistogram.from_dict(data["service"])
+        for field in ("sent", "errors", "late", "dropped"):
+            setattr(stats, field, data[field])
+        return stats
+
+
+class LoadReport:
+    """Per-endpoint results of a load run; reports from several runs can be merged"""
+
+    def __init__(self):
+        self.endpoints: Dict[str, EndpointStats] = {}
+        self.duration = 0.0
+        self._lock = threading.Lock()
+
+    def _stats(self, name: str) -> EndpointStats:
+        if name not in self.endpoints:
+            self.endpoints[name] = EndpointStats()
+        return self.endpoints[name]
+
+    def record(self, name: str, latency: float, service: float, late: bool, ok: bool) -> None:
+        with self._lock:
+            stats = self._stats(name)
+            stats.latency.record(latency)
+            stats.service.record(service)
+            stats.sent += 1
+            stats.late += late
+            stats.errors += not ok
+
+    def record_drop(self, name: str) -> None:
+        with self._lock:
+            self._stats(name).dropped += 1
+
+    def drain(self) -> Dict:
+        """Return the results so far as a dict and start over (for streaming deltas)"""
+        with self._lock:
+            data = {
+                "duration": self.duration,
+                "endpoints": {name: stats.to_dict() for name, stats in self.endpoints.items()}
+            }
+            self.endpoints = {}
+        return data
+
+    def merge(self, other: "LoadReport") -> None:
+        with self._lock:
+            for name, stats in other.endpoints.items():
+                self._stats(name).merge(stats)
+            self.duration = max(self.duration, other.duration)
+
+    def total(self) -> EndpointStats:
+        total = EndpointStats()
+        for stats in self.endpoints.values():
+            total.merge(stats)
+        return total
+
+    def to_dict(self) -> Dict:
+        return {
+            "duration": self.duration,
+            "endpoints": {name: stats.to_dict() for name, stats in self.endpoints.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "LoadReport":
+        report = cls()
+        report.duration = data["duration"]
+        report.endpoints = {name: EndpointStats.from_dict(stats) for name, stats in data["endpoints"].items()}
+        return report
+
+    def print_report(self, title: str = "OPEN-LOOP LOAD REPORT") -> None:
+        ms = lambda seconds: f"{seconds * 1000:8.1f}"
+        print(f"\n{Fore.CYAN}{'='*100}")
+        print(f"{Fore.CYAN}📊 {title}")
+        print(f"{Fore.CYAN}{'='*100}")
+        print(f"{Fore.WHITE}{'Endpoint':<28}{'sent':>8}{'rps':>8}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}"
+              f"{'svc p99':>9}{'late':>7}{'drop':>7}{'err':>7}")
+
+        rows = sorted(self.endpoints.items()) + [("TOTAL", self.total())]
+        for name, stats in rows:
+            rps = stats.sent / self.duration if self.duration else 0
+            color = Fore.RED if stats.errors or stats.dropped else Fore.YELLOW if stats.late else Fore.GREEN
+            print(f"{color}{name:<28}{stats.sent:>8}{rps:>8.1f}{ms(stats.latency.percentile(50))}"
+                  f"{ms(stats.latency.percentile(90))}{ms(stats.latency.percentile(99))}{ms(stats.latency.max)}"
+                  f"{ms(stats.service.percentile(99))}{stats.late:>7}{stats.dropped:>7}{stats.errors:>7}")
+
+        print(f"{Fore.WHITE}Latencies in ms, measured from the intended send time; "
+              f"'svc' is measured from the actual send time.")
+
+
+class OpenLoopRunner:
+    """Send requests at scheduled times, whether or not earlier ones have completed
+
+    A dispatcher thread releases each request at its intended time into a queue
+    served by `workers` threads, each with its own client session. Latency is
+    measured from the intended time, so time spent waiting for a free worker
+    (because the server is slow) is counted instead of hidden. A request that
+    could not start within `drop_after` seconds of its intended time is dropped;
+    one that started more than `late_threshold` seconds late is counted as late.
+    """
+
+    def __init__(self, base_url: str, schedule: Iterable[float],
+                 endpoints: List[Endpoint] = None, workers: int = 32,
+                 late_threshold: float = 0.01, drop_after: float = 5.0,
+                 auth_token: str = None, seed: int = None,
+                 client_factory: Callable[[str], SimpleCRUDAPIClient] = None):
+        self.base_url = base_url
+        self.schedule = schedule
+        self.endpoints = endpoints or DEFAULT_ENDPOINTS
+        self.workers = workers
+        self.late_threshold = late_threshold
+        self.drop_after = drop_after
+        self.auth_token = auth_token
+        self.random = random.Random(seed)
+        self.client_factory = client_factory or (lambda url: SimpleCRUDAPIClient(url, verbose=False))
+        self.report = LoadReport()
+        self._queue: "queue.Queue" = queue.Queue()
+
+    def _worker(self) -> None:
+        client = self.client_factory(self.base_url)
+        client.auth_token = self.auth_token
+        # Every scheduled request reaches the server, even with identical GETs in flight
+        client.reuse_responses = False
+
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            intended, endpoint = item
+
+            started = time.perf_counter()
+            lateness = started - intended
+            if lateness > self.drop_after:
+                self.report.record_drop(endpoint.name)
+                continue
+
+            try:
+                response = client._make_request(endpoint.method, endpoint.path, params=endpoint.params,
+                                                 use_auth=endpoint.use_auth)
+                ok = response.status_code < 500
+            except requests.exceptions.RequestException:
+                ok = False
+
+            finished = time.perf_counter()
+            self.report.record(endpoint.name, finished - intended, finished - started,
+                               lateness > self.late_threshold, ok)
+
+    def run(self) -> LoadReport:
+        threads = [threading.Thread(target=self._worker, daemon=True) for _ in range(self.workers)]
+        for thread in threads:
+            thread.start()
+
+        weights = [endpoint.weight for endpoint in self.endpoints]
+        start = time.perf_counter() + 0.05
+        for offset in self.schedule:
+            intended = start + offset
+            delay = intended - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            self._queue.put((intended, self.random.choices(self.endpoints, weights)[0]))
+
+        for _ in threads:
+            self._queue.put(None)
+        for thread in threads:
+            thread.join()
+
+        self.report.duration = time.perf_counter() - start
+        return self.report
+
+
+class ClosedLoopRunner:
+    """Benchmark mode: `concurrency` threads each send the next request as soon as
+    the previous one completes, for `duration` seconds"""
+
+    def __init__(self, base_url: str, duration: float, concurrency: int = 8,
+                 endpoints: List[Endpoint] = None, auth_token: str = None, seed: int = None,
+                 client_factory: Callable[[str], SimpleCRUDAPIClient] = None):
+        self.base_url = base_url
+        self.duration = duration
+        self.concurrency = concurrency
+        self.endpoints = endpoints or DEFAULT_ENDPOINTS
+        self.auth_token = auth_token
+        self.seed = seed
+        self.client_factory = client_factory or (lambda url: SimpleCRUDAPIClient(url, verbose=False))
+        self.report = LoadReport()
+
+    def _worker(self, index: int, deadline: float) -> None:
+        client = self.client_factory(self.base_url)
+        client.auth_token = self.auth_token
+        client.reuse_responses = False
+        rng = random.Random(None if self.seed is None else self.seed + index)
+        weights = [endpoint.weight for endpoint in self.endpoints]
+
+        while time.perf_counter() < deadline:
+            endpoint = rng.choices(self.endpoints, weights)[0]
+            started = time.perf_counter()
+            try:
+                response = client._make_request(endpoint.method, endpoint.path, params=endpoint.params,
+                                                 use_auth=endpoint.use_auth)
+                ok = response.status_code < 500
+            except requests.exceptions.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - started
+            self.report.record(endpoint.name, elapsed, elapsed, False, ok)
+
+    def run(self) -> LoadReport:
+        start = time.perf_counter()
+        deadline = start + self.duration
+        threads = [threading.Thread(target=self._worker, args=(i, deadline), daemon=True)
+                   for i in range(self.concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.report.duration = time.perf_counter() - start
+        return self.report
+
+
+class HealthMonitor:
+    """Print the server's pool and query metrics every `interval` seconds while a run is in progress
+
+        with HealthMonitor(base_url, 5):
+            runner.run()
+    """
+
+    def __init__(self, base_url: str, interval: float = 5.0, top: int = 5):
+        self.client = SimpleCRUDAPIClient(base_url, verbose=False)
+        self.interval = interval
+        self.top = top
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                result = self.client.get_health_metrics()
+            except requests.exceptions.RequestException as e:
+                print(f"{Fore.RED}❌ Health metrics unavailable: {e}")
+                continue
+            if result.get("success"):
+                print(format_pool_metrics(result["data"], self.top))
+            else:
+                print(f"{Fore.RED}❌ Health metrics unavailable: {result.get('error') or result.get('raw', '')[:80]}")
+
+    def __enter__(self) -> "HealthMonitor":
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+class CacheStatsProbe:
+    """Report the server's result-cache hit rate over a run, from /api/health/metrics before and after it"""
+
+    def __init__(self, base_url: str):
+        self.client = SimpleCRUDAPIClient(base_url, verbose=False)
+        self.before: Optional[Dict] = None
+        self.delta: Optional[Dict[str, Dict]] = None
+
+    def _snapshot(self) -> Optional[Dict]:
+        try:
+            result = self.client.get_health_metrics()
+        except requests.exceptions.RequestException:
+            return None
+        return (result.get("data") or {}).get("cache") if result.get("success") else None
+
+    def __enter__(self) -> "CacheStatsProbe":
+        self.before = self._snapshot()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        after = self._snapshot()
+        if self.before is None or after is None or not after.get("enabled"):
+            print(f"{Fore.YELLOW}⚠️ Result cache metrics unavailable (disabled, or the server predates them)")
+            return
+        self.delta = cache_hit_delta(self.before, after)
+        for name, counts in self.delta.items():
+            print(f"{Fore.CYAN}🧊 Result cache {name}: {counts['hits']} hits, {counts['misses']} misses "
+                  f"({counts['hit_rate']:.1%})")
+
+
+def parse_steps(text: str) -> List[Tuple[float, float]]:
+    """Parse "10:30,50:30" into [(10.0, 30.0), (50.0, 30.0)] (rate:seconds)"""
+    return [tuple(float(part) for part in step.split(":")) for step in text.split(",")]
+
+
+def schedule_from_spec(spec: Dict) -> Iterator[float]:
+    """Build a schedule from a plain dict (JSON/pickle friendly):
+    {"mode": "constant"|"ramp"|"step", "rate", "end_rate", "duration", "steps": [[rate, seconds], ...]}"""
+    mode = spec.get("mode", "constant")
+    if mode == "ramp":
+        return ramp_schedule(spec["rate"], spec["end_rate"], spec["duration"])
+    if mode == "step":
+        return step_schedule([tuple(step) for step in spec["steps"]])
+    return constant_schedule(spec["rate"], spec["duration"])
+
+
+def schedule_duration(spec: Dict) -> float:
+    """Seconds from the first to the last arrival slot of a schedule_from_spec() dict"""
+    if spec.get("mode", "constant") == "step":
+        return sum(seconds for _, seconds in spec["steps"])
+    return spec["duration"]
+
+
+def schedule_spec(args: argparse.Namespace) -> Dict:
+    return {
+        "mode": args.mode,
+        "rate": args.rate,
+        "end_rate": args.end_rate,
+        "duration": args.duration,
+        "steps": parse_steps(args.steps)
+    }
+
+
+def add_schedule_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--mode", choices=["constant", "ramp", "step"], default="constant")
+    parser.add_argument("--rate", type=float, default=10, help="requests/second (start rate for ramp)")
+    parser.add_argument("--end-rate", type=float, default=100, help="final rate for ramp")
+    parser.add_argument("--steps", default="10:30,50:30,100:30", help="rate:seconds,... for step")
+    parser.add_argument("--duration", type=float, default=30, help="seconds (constant and ramp)")
+
+
+def add_health_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--health-interval", type=float, default=0,
+                        help="print the server's pool metrics every N seconds during the run (0 = off)")
+    parser.add_argument("--cache-stats", action="store_true",
+                        help="print the server's result-cache hit rate for the run")
+    parser.add_argument("--faults", help="stand-in server only: fault rules (JSON file or preset) for the run")
+    parser.add_argument("--fault-seed", type=int, default=0)
+
+
+def health_monitor(args: argparse.Namespace):
+    """HealthMonitor for --health-interval, CacheStatsProbe for --cache-stats and --faults around a run"""
+    stack = contextlib.ExitStack()
+    if args.faults:
+        stack.enter_context(injected_faults(args.url, load_rules(args.faults), args.fault_seed, verbose=True))
+    if args.cache_stats:
+        stack.enter_context(CacheStatsProbe(args.url))
+    if args.health_interval > 0:
+        stack.enter_context(HealthMonitor(args.url, args.health_interval))
+    return stack
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Open-loop constant-arrival-rate load test")
+    parser.add_argument("--url", default="http://localhost:3001")
+    add_schedule_arguments(parser)
+    parser.add_argument("--workers", type=int, default=64)
+    parser.add_argument("--drop-after", type=float, default=5.0)
+    parser.add_argument("--token", help="bearer token for authenticated endpoints")
+    parser.add_argument("--json", help="write the report as JSON to this file")
+    add_health_argument(parser)
+    args = parser.parse_args(argv)
+
+    print(f"{Fore.MAGENTA}🚀 Open-loop {args.mode} load against {args.url}")
+    runner = OpenLoopRunner(args.url, schedule_from_spec(schedule_spec(args)), workers=args.workers,
+                            drop_after=args.drop_after, auth_token=args.token)
+    with health_monitor(args):
+        report = runner.run()
+    report.print_report()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report.to_dict(), f)
+
+    total = report.total()
+    return 1 if total.errors or total.dropped else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+"""
+Multi-Process Load Workers
+Runs load and benchmark scenarios in N worker processes and merges their results
+"""
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import sys
+import threading
+import time
+import traceback
+from multiprocessing.connection import Connection, wait
+from typing import Dict, List
+
+from colorama import Fore
+
+from load_runner import (
+    DEFAULT_ENDPOINTS, ClosedLoopRunner, Endpoint, LoadReport, OpenLoopRunner,
+    add_health_argument, add_schedule_arguments, health_monitor, schedule_from_spec, schedule_spec
+)
+
+
+def default_spec(base_url: str) -> Dict:
+    """Scenario spec understood by run_worker; a plain dict so it can be pickled or sent as JSON"""
+    return {
+        "base_url": base_url,
+        "mode": "open",                    # "open" (arrival schedule) or "closed" (benchmark)
+        "schedule": {"mode": "constant", "rate": 10, "duration": 30},
+        "duration": 30,                    # closed mode only
+        "concurrency": 8,                  # closed mode: threads per process
+        "workers": 32,                     # open mode: sender threads per process
+        "drop_after": 5.0,
+        "auth_token": None,
+        "endpoints": [list(endpoint) for endpoint in DEFAULT_ENDPOINTS],
+        "report_interval": 1.0,
+        "shard": [0, 1],                   # [index, count] of this machine's share of the schedule
+        "start_at": None                   # time.time() at which every process starts sending
+    }
+
+
+def build_runner(spec: Dict, index: int, processes: int):
+    """Runner for process `index` of `processes`
+
+    In open mode each process takes every `processes`-th arrival of the shared
+    schedule, so together they reproduce the requested rate exactly. A spec
+    with a `shard` first narrows the schedule to that machine's share.
+    """
+    shard, shards = spec.get("shard") or (0, 1)
+    seed = shard * processes + index
+    endpoints = [Endpoint(*endpoint) for endpoint in spec["endpoints"]]
+    if spec["mode"] == "closed":
+        return ClosedLoopRunner(spec["base_url"], spec["duration"], concurrency=spec["concurrency"],
+                                endpoints=endpoints, auth_token=spec["auth_token"], seed=seed)
+    schedule = itertools.islice(schedule_from_spec(spec["schedule"]), shard, None, shards)
+    schedule = itertools.islice(schedule, index, None, processes)
+    return OpenLoopRunner(spec["base_url"], schedule, endpoints=endpoints, workers=spec["workers"],
+                          drop_after=spec["drop_after"], auth_token=spec["auth_token"], seed=seed)
+
+
+def wait_for_start(spec: Dict) -> None:
+    """Sleep until the spec's synchronized start time, if it has one"""
+    if spec.get("start_at"):
+        delay = spec["start_at"] - time.time()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def run_worker(index: int, processes: int, spec: Dict, conn: Connection) -> None:
+    """Worker process entry point: run the scenario, streaming result deltas over `conn`"""
+    try:
+        runner = build_runner(spec, index, processes)
+        finished = threading.Event()
+
+        def stream_progress():
+            while not finished.wait(spec["report_interval"]):
+                conn.send({"type": "progress", "index": index, "report": runner.report.drain()})
+
+        wait_for_start(spec)
+        reporter = threading.Thread(target=stream_progress, daemon=True)
+        reporter.start()
+        runner.run()
+        finished.set()
+        reporter.join()
+
+        conn.send({"type": "done", "index": index, "report": runner.report.drain()})
+    except Exception:
+        conn.send({"type": "error", "index": index, "error": traceback.format_exc()})
+    finally:
+        conn.close()
+
+
+def run_multiprocess(spec: Dict, processes: int, show_progress: bool = True) -> LoadReport:
+    """Coordinator: start `processes` workers and merge their streamed histograms"""
+    context = multiprocessing.get_context("spawn")
+    connections: List[Connection] = []
+    workers = []
+
+    for index in range(processes):
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(target=run_worker, args=(index, processes, spec, sender), daemon=True)
+        process.start()
+        sender.close()
+        connections.append(receiver)
+        workers.append(process)
+
+    merged = LoadReport()
+    started = time.perf_counter() + max(0.0, (spec.get("start_at") or 0) - time.time())
+    pending = set(connections)
+    interval_sent = 0
+    last_progress = started
+
+    while pending:
+        for conn in wait(list(pending), timeout=spec["report_interval"]):
+            try:
+                message = conn.recv()
+            except EOFError:
+                pending.discard(conn)
+                continue
+
+            if message["type"] == "error":
+                print(f"{Fore.RED}❌ Worker {message['index']} failed:\n{message['error']}")
+                pending.discard(conn)
+                continue
+
+            delta = LoadReport.from_dict(message["report"])
+            interval_sent += delta.total().sent
+            merged.merge(delta)
+            if message["type"] == "done":
+                pending.discard(conn)
+
+        now = time.perf_counter()
+        if show_progress and now - last_progress >= spec["report_interval"]:
+            total = merged.total()
+            print(f"{Fore.BLUE}⏱️ {now - started:6.1f}s  {interval_sent / (now - last_progress):8.1f} req/s  "
+                  f"sent={total.sent} p99={total.latency.percentile(99) * 1000:.1f}ms "
+                  f"late={total.late} dropped={total.dropped} errors={total.errors}")
+            interval_sent = 0
+            last_progress = now
+
+    for process in workers:
+        process.join()
+
+    merged.duration = time.perf_counter() - started
+    return merged
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Multi-process load and benchmark runs")
+    parser.add_argument("--url", default="http://localhost:3001")
+    parser.add_argument("--processes", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--closed", action="store_true",
+                        help="benchmark mode: each thread sends back-to-back for --duration seconds")
+    parser.add_argument("--concurrency", type=int, default=8, help="threads per process (closed mode)")
+    add_schedule_arguments(parser)
+    parser.add_argument("--workers", type=int, default=32, help="sender threads per process (open mode)")
+    parser.add_argument("--drop-after", type=float, default=5.0)
+    parser.add_argument("--token", help="bearer token for authenticated endpoints")
+    parser.add_argument("--json", help="write the merged report as JSON to this file")
+    add_health_argument(parser)
+    args = parser.parse_args(argv)
+
+    spec = default_spec(args.url)
+    spec.update({
+        "mode": "closed" if args.closed else "open",
+        "schedule": schedule_spec(args),
+        "duration": args.duration,
+        "concurrency": args.concurrency,
+        "workers": args.workers,
+        "drop_after": args.drop_after,
+        "auth_token": args.token
+    })
+
+    print(f"{Fore.MAGENTA}🚀 {spec['mode'].title()}-loop run with {args.processes} processes against {args.url}")
+    with health_monitor(args):
+        report = run_multiprocess(spec, args.processes)
+    report.print_report(f"MERGED REPORT ({args.processes} PROCESSES)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report.to_dict(), f)
+
+    total = report.total()
+    return 1 if total.errors or total.dropped else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
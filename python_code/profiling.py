@@ -0,0 +1,336 @@
+"""
+Client Profiling
+Attributes client time to request phases and produces flamegraph-ready stacks
+"""
+
+import atexit
+import cProfile
+import inspect
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
+import urllib3.connection
+from colorama import Fore
+
+# Exclusive time per request phase; a phase entered inside another pauses the outer one
+#   build   client code from the endpoint call to the socket write: headers, cache keys, requests' own
+#           bookkeeping and request preparation
+#   send    connecting and writing the request
+#   wait    waiting for the status line and headers (server time plus network round trip)
+#   read    reading and decompressing the response body
+#   decode  JSON parsing
+#   print   formatting and printing the response
+#   other   the endpoint method's own code outside all of the above
+PHASES = ["build", "send", "wait", "read", "decode", "print", "other"]
+
+# (owner, attribute, phase) instrumented while a profiler is active
+_PHASE_HOOKS = [
+    ("api_client.SimpleCRUDAPIClient", "_make_request", "build"),
+    ("requests.Session", "prepare_request", "build"),
+    ("urllib3.connection.HTTPConnection", "request", "send"),
+    ("urllib3.connection.HTTPConnection", "getresponse", "wait"),
+    ("requests.models.Response", "content", "read"),
+    ("requests.models.Response", "json", "decode"),
+    ("api_client.SimpleCRUDAPIClient", "_print_response", "print"),
+]
+
+UNATTRIBUTED = "(no endpoint)"
+
+# Marks an attribute the owner inherited, so uninstalling deletes the patch instead of restoring it
+_INHERITED = object()
+
+
+class _ThreadState:
+    __slots__ = ("endpoint", "phases")
+
+    def __init__(self):
+        self.endpoint: Optional[str] = None
+        self.phases: List[List] = []      # [phase, resumed_at] from outermost to innermost
+
+
+class ClientProfiler:
+    """Profile everything the API client does while active
+
+        with ClientProfiler(mode="sampling") as profiler:
+            run_bulk_job()
+        profiler.print_summary()
+        profiler.write_collapsed("bulk.collapsed")
+
+    Every public SimpleCRUDAPIClient method is an endpoint method, and phase
+    times are charged to the outermost one running on the thread. mode
+    "sampling" also samples the stacks of all threads every `interval` seconds,
+    rooted at the endpoint method and phase, for flamegraph.pl or speedscope.
+    mode "deterministic" runs cProfile on the calling thread instead.
+    """
+
+    def __init__(self, mode: str = "sampling", interval: float = 0.002):
+        if mode not in ("sampling", "deterministic"):
+            raise ValueError(f"unknown profiling mode: {mode}")
+        self.mode = mode
+        self.interval = interval
+        self.phase_times: Dict[str, Dict[str, float]] = defaultdict(lambda: dict.fromkeys(PHASES, 0.0))
+        self.calls: Counter = Counter()
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.wall_time = 0.0
+        self._threads: Dict[int, _ThreadState] = {}
+        self._lock = threading.Lock()
+        self._originals: List[Tuple[type, str, object]] = []
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._cprofile: Optional[cProfile.Profile] = None
+        self._started = 0.0
+
+    # Phase accounting
+
+    def _state(self) -> _ThreadState:
+        ident = threading.get_ident()
+        state = self._threads.get(ident)
+        if state is None:
+            state = self._threads[ident] = _ThreadState()
+        return state
+
+    def _charge(self, state: _ThreadState, phase: str, seconds: float) -> None:
+        with self._lock:
+            self.phase_times[state.endpoint or UNATTRIBUTED][phase] += seconds
+
+    def _enter(self, phase: str) -> None:
+        state = self._state()
+        now = time.perf_counter()
+        if state.phases:
+            outer = state.phases[-1]
+            self._charge(state, outer[0], now - outer[1])
+        state.phases.append([phase, now])
+
+    def _exit(self) -> None:
+        state = self._state()
+        now = time.perf_counter()
+        phase, resumed_at = state.phases.pop()
+        self._charge(state, phase, now - resumed_at)
+        if state.phases:
+            state.phases[-1][1] = now
+
+    def _phase_wrapper(self, function: Callable, phase: str) -> Callable:
+        def wrapper(*args, **kwargs):
+            self._enter(phase)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self._exit()
+        wrapper.__wrapped__ = function
+        return wrapper
+
+    def _endpoint_wrapper(self, function: Callable, name: str) -> Callable:
+        def wrapper(*args, **kwargs):
+            state = self._state()
+            if state.endpoint is not None:
+                return function(*args, **kwargs)
+            state.endpoint = name
+            with self._lock:
+                self.calls[name] += 1
+            self._enter("other")
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self._exit()
+                state.endpoint = None
+        wrapper.__wrapped__ = function
+        return wrapper
+
+    # Instrumentation
+
+    def _patch(self, owner: type, attribute: str, replacement) -> None:
+        # The patch goes on `owner` even when a base class defines the attribute (urllib3 1.26's
+        # HTTPConnection inherits request() from http.client), so other subclasses are left alone
+        self._originals.append((owner, attribute, owner.__dict__.get(attribute, _INHERITED)))
+        setattr(owner, attribute, replacement)
+
+    def _install(self) -> None:
+        from api_client import SimpleCRUDAPIClient
+
+        for name, member in list(vars(SimpleCRUDAPIClient).items()):
+            if not name.startswith("_") and callable(member) and not isinstance(member, (staticmethod, type)):
+                self._patch(SimpleCRUDAPIClient, name, self._endpoint_wrapper(member, name))
+
+        owners = {
+            "api_client.SimpleCRUDAPIClient": SimpleCRUDAPIClient,
+            "requests.Session": requests.Session,
+            "urllib3.connection.HTTPConnection": urllib3.connection.HTTPConnection,
+            "requests.models.Response": requests.models.Response,
+        }
+        for owner_name, attribute, phase in _PHASE_HOOKS:
+            owner = owners[owner_name]
+            # Looked up along the MRO without invoking descriptors, so a property stays a property
+            member = inspect.getattr_static(owner, attribute)
+            if isinstance(member, property):
+                self._patch(owner, attribute, property(self._phase_wrapper(member.fget, phase)))
+            else:
+                self._patch(owner, attribute, self._phase_wrapper(member, phase))
+
+    def _uninstall(self) -> None:
+        for owner, attribute, original in reversed(self._originals):
+            if original is _INHERITED:
+                delattr(owner, attribute)
+            else:
+                setattr(owner, attribute, original)
+        self._originals.clear()
+
+    # Sampling
+
+    def _sample_loop(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    if code.co_filename != __file__:
+                        stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.reverse()
+
+                state = self._threads.get(ident)
+                endpoint = state.endpoint if state is not None else None
+                if endpoint is not None:
+                    try:
+                        phase = state.phases[-1][0]
+                    except IndexError:    # the thread left its phase while we looked
+                        phase = "other"
+                    root = [endpoint, f"[{phase}]"]
+                else:
+                    root = [UNATTRIBUTED]
+                self.stacks[";".join(root + stack)] += 1
+            self.samples += 1
+
+    # Lifecycle
+
+    def start(self) -> "ClientProfiler":
+        self._install()
+        self._started = time.perf_counter()
+        if self.mode == "sampling":
+            self._stop.clear()
+            self._sampler = threading.Thread(target=self._sample_loop, name="client-profiler", daemon=True)
+            self._sampler.start()
+        else:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        return self
+
+    def stop(self) -> None:
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        if self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+            self._sampler = None
+        self.wall_time += time.perf_counter() - self._started
+        self._uninstall()
+
+    def __enter__(self) -> "ClientProfiler":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    # Output
+
+    def write_collapsed(self, path: str) -> None:
+        """Collapsed stacks, one "frame;frame;frame count" line per distinct stack"""
+        with open(path, "w") as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f"{stack} {count}\n")
+
+    def write_pstats(self, path: str) -> None:
+        if self._cprofile is not None:
+            self._cprofile.dump_stats(path)
+
+    def top_functions(self, top: int = 15) -> List[Tuple[str, float]]:
+        """Hottest functions by own time: sampled leaf frames, or cProfile tottime"""
+        if self._cprofile is not None:
+            stats = pstats.Stats(self._cprofile)
+            rows = [(f"{func[2]} ({os.path.basename(func[0])}:{func[1]})", values[2])
+                    for func, values in stats.stats.items()]
+        else:
+            leaves: Counter = Counter()
+            for stack, count in self.stacks.items():
+                leaves[stack.rsplit(";", 1)[-1]] += count * self.interval
+            rows = list(leaves.items())
+        return sorted(rows, key=lambda row: row[1], reverse=True)[:top]
+
+    def summary(self) -> Dict:
+        return {
+            "mode": self.mode,
+            "wall_time": self.wall_time,
+            "samples": self.samples,
+            "endpoints": {name: {"calls": self.calls.get(name, 0), "phases": dict(phases),
+                                 "total": sum(phases.values())}
+                          for name, phases in self.phase_times.items()}
+        }
+
+    def print_summary(self, top: int = 15) -> None:
+        rows = sorted(self.phase_times.items(), key=lambda item: sum(item[1].values()), reverse=True)[:top]
+        print(f"\n{Fore.CYAN}{'='*112}")
+        print(f"{Fore.CYAN}🔬 CLIENT PROFILE ({self.mode}, {self.wall_time:.2f}s wall)")
+        print(f"{Fore.CYAN}{'='*112}")
+        print(f"{'Endpoint method':<26}{'calls':>6}{'total':>9}{'mean':>8}" +
+              "".join(f"{phase:>9}" for phase in PHASES))
+        for name, phases in rows:
+            total = sum(phases.values())
+            calls = self.calls.get(name, 0)
+            mean = total / calls * 1000 if calls else 0.0
+            print(f"{name:<26}{calls:>6}{total * 1000:>9.1f}{mean:>8.1f}" +
+                  "".join(f"{phases[phase] / total * 100 if total else 0:>8.1f}%" for phase in PHASES))
+        print("Times in ms; phase columns are shares of each endpoint method's total.")
+
+        print(f"\n{Fore.CYAN}🔥 Top {top} functions by own time")
+        for function, seconds in self.top_functions(top):
+            print(f"   {seconds * 1000:>9.1f}ms  {function}")
+
+
+_global_profiler: Optional[ClientProfiler] = None
+
+
+def start_global(output: str, mode: str = "sampling") -> ClientProfiler:
+    """Profile the rest of the process and write `<output>.json` plus
+    `<output>.collapsed` (sampling) or `<output>.pstats` (deterministic) at exit"""
+    global _global_profiler
+    if _global_profiler is not None:
+        return _global_profiler
+
+    profiler = _global_profiler = ClientProfiler(mode).start()
+
+    def finish():
+        profiler.stop()
+        profiler.print_summary()
+        with open(f"{output}.json", "w") as f:
+            json.dump(profiler.summary(), f, indent=2)
+        if mode == "sampling":
+            profiler.write_collapsed(f"{output}.collapsed")
+            print(f"{Fore.BLUE}📁 Stacks written to {output}.collapsed (flamegraph.pl or speedscope)")
+        else:
+            profiler.write_pstats(f"{output}.pstats")
+            print(f"{Fore.BLUE}📁 cProfile data written to {output}.pstats")
+
+    atexit.register(finish)
+    return profiler
+
+
+def enable_from_argv(argv: List[str] = None) -> Optional[ClientProfiler]:
+    """Handle a test runner's `--profile[=sampling|deterministic]` flag, removing it from argv"""
+    argv = sys.argv if argv is None else argv
+    for index, arg in enumerate(argv):
+        if arg == "--profile" or arg.startswith("--profile="):
+            del argv[index]
+            mode = arg.partition("=")[2] or "sampling"
+            script = os.path.splitext(os.path.basename(argv[0]))[0] if argv else "client"
+            return start_global(f"profile_{script}", mode)
+    return None
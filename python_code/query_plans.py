@@ -0,0 +1,277 @@
+"""
+Query Plan Check
+Runs EXPLAIN on the API routes' SQL and fails on full table scans and filesorts
+"""
+
+import argparse
+import json
+import os
+import secrets
+import sys
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import pymysql
+import pymysql.cursors
+from colorama import Fore
+
+from api_client import SimpleCRUDAPIClient
+
+
+class QueryPlan(NamedTuple):
+    """One statement as a route issues it; `allow` maps table (as EXPLAIN names it) -> why a full scan is expected"""
+    route: str
+    sql: str
+    params: Tuple[str, ...] = ()
+    allow: Dict[str, str] = {}
+
+
+# Mirrors the SQL in app/api and lib; keep in step when a route's query changes.
+# Params name sample values (see sample_values); FOR UPDATE is dropped, it does not change the plan.
+PAKET_SEARCH = "WHERE nama_paket LIKE %s OR kode_paket LIKE %s"
+SUBSTRING_SEARCH = {"paket_pengadaan": "?q= is a substring match (LIKE '%q%'), no B-tree index can serve it"}
+FAVORITES_LIST = ("SELECT f.id, f.created_at, f.notes, p.id, p.nama_paket, p.kode_paket "
+                  "FROM user_favorites f JOIN paket_pengadaan p ON f.md5_hash = p.md5_hash WHERE f.user_id = %s")
+
+PLANS = [
+    QueryPlan("POST /api/auth/login",
+              "SELECT user_id, username, email, full_name, password FROM users WHERE email = %s", ("email",)),
+    QueryPlan("POST /api/auth/register",
+              "SELECT user_id FROM users WHERE email = %s OR username = %s", ("email", "username")),
+    QueryPlan("GET /api/users/profile",
+              "SELECT user_id, username, email, full_name, nama, created_at FROM users WHERE user_id = %s",
+              ("user_id",)),
+    QueryPlan("GET /api/paket",
+              "SELECT COUNT(*) as total FROM paket_pengadaan"),
+    QueryPlan("GET /api/paket",
+              "SELECT * FROM paket_pengadaan ORDER BY id DESC LIMIT %s OFFSET %s", ("limit", "offset")),
+    QueryPlan("GET /api/paket?q=",
+              f"SELECT COUNT(*) as total FROM paket_pengadaan {PAKET_SEARCH}", ("search", "search"),
+              SUBSTRING_SEARCH),
+    QueryPlan("GET /api/paket?q=",
+              f"SELECT * FROM paket_pengadaan {PAKET_SEARCH} ORDER BY id DESC LIMIT %s OFFSET %s",
+              ("search", "search", "limit", "offset"), SUBSTRING_SEARCH),
+    QueryPlan("GET /api/paket/[id]",
+              "SELECT * FROM paket_pengadaan WHERE id = %s", ("paket_id",)),
+    QueryPlan("PUT /api/paket/[id]",
+              "UPDATE paket_pengadaan SET nama_paket = %s, version = version + 1 WHERE id = %s", ("search", "paket_id")),
+    QueryPlan("POST /api/paket/batch",
+              "SELECT id, md5_hash FROM paket_pengadaan WHERE md5_hash IN %s", ("md5_hashes",)),
+    QueryPlan("DELETE /api/paket/batch",
+              "SELECT id, md5_hash FROM paket_pengadaan WHERE id IN %s", ("paket_ids",)),
+    QueryPlan("GET /api/stats",
+              "SELECT dimension, bucket, paket_count, pagu_sum, hps_sum FROM paket_stats "
+              "WHERE (dimension = 'total' AND bucket = 'all') OR (dimension = 'month' AND bucket IN %s)",
+              ("months",)),
+    QueryPlan("GET /api/stats/summary",
+              "SELECT dimension, bucket, paket_count, pagu_sum, hps_sum FROM paket_stats "
+              "WHERE paket_count > 0 ORDER BY dimension, bucket", (),
+              {"paket_stats": "the summary returns every bucket; the table holds one row per bucket"}),
+    QueryPlan("GET /api/favorites",
+              f"{FAVORITES_LIST} ORDER BY f.created_at DESC, f.id DESC", ("user_id",)),
+    QueryPlan("GET /api/favorites?cursor=",
+              f"{FAVORITES_LIST} AND (f.created_at < %s OR (f.created_at = %s AND f.id < %s)) "
+              "ORDER BY f.created_at DESC, f.id DESC LIMIT 101",
+              ("user_id", "favorited_at", "favorited_at", "favorite_id")),
+    QueryPlan("GET /api/favorites/check/[md5_hash]",
+              "SELECT id, notes, created_at FROM user_favorites WHERE user_id = %s AND md5_hash = %s",
+              ("user_id", "md5_hash")),
+    QueryPlan("DELETE /api/favorites/[md5_hash]",
+              "DELETE FROM user_favorites WHERE user_id = %s AND md5_hash = %s", ("user_id", "md5_hash")),
+    QueryPlan("DELETE /api/favorites",
+              "SELECT md5_hash FROM user_favorites WHERE user_id = %s", ("user_id",)),
+    QueryPlan("GET /api/changes",
+              "SELECT id, entity, action, entity_key, payload, created_at FROM change_events "
+              "WHERE id > %s AND (user_id IS NULL OR user_id = %s) ORDER BY id LIMIT 100",
+              ("event_id", "user_id")),
+]
+
+
+class PlanResult(NamedTuple):
+    plan: QueryPlan
+    rows: List[Dict]
+    problems: List[str]
+    allowed: List[str]
+
+
+def check_plan(plan: QueryPlan, rows: List[Dict]) -> PlanResult:
+    """Full scans (type ALL) and filesorts in EXPLAIN's rows, split into problems and allowed scans"""
+    problems, allowed = [], []
+    for row in rows:
+        table = row.get("table") or ""
+        extra = row.get("Extra") or ""
+        if row.get("type") == "ALL":
+            message = f"full scan of {table} (~{row.get('rows')} rows)"
+            if table in plan.allow:
+                allowed.append(f"{message}: {plan.allow[table]}")
+            else:
+                problems.append(message)
+        if "Using filesort" in extra:
+            problems.append(f"filesort on {table}")
+        if "Using temporary" in extra:
+            problems.append(f"temporary table for {table}")
+    return PlanResult(plan, rows, problems, allowed)
+
+
+class PlanChecker:
+    """EXPLAIN every statement in PLANS against the database the server uses
+
+    Parameters come from existing rows so that const lookups hit real keys. With
+    `seed`, that many synthetic paket plus a user with favorites are first created
+    through the API (which keeps paket_stats and the change feed consistent) and
+    deleted again afterwards; small tables can make the optimizer prefer scans that
+    it would never pick on production-sized data.
+    """
+
+    def __init__(self, connection: pymysql.connections.Connection, base_url: str = None, seed: int = 0):
+        self.connection = connection
+        self.base_url = base_url
+        self.seed = seed
+        self.results: List[PlanResult] = []
+        self._client: Optional[SimpleCRUDAPIClient] = None
+        self._seeded_ids: List[int] = []
+
+    def query(self, sql: str, params: Tuple = ()) -> List[Dict]:
+        with self.connection.cursor(pymysql.cursors.DictCursor) as cursor:
+            cursor.execute(sql, params)
+            return list(cursor.fetchall())
+
+    def seed_data(self) -> None:
+        client = SimpleCRUDAPIClient(self.base_url, verbose=False)
+        run = f"{int(time.time())}_{secrets.token_hex(3)}"
+        user = {"username": f"plancheck_{run}", "email": f"plancheck_{run}@example.com",
+                "password": "plancheck123", "full_name": "Query Plan Check"}
+        response = client._make_request("POST", "/api/auth/register", data=user, use_auth=False)
+        if response.status_code != 201:
+            raise RuntimeError(f"could not register the seed user: {response.status_code} {response.text}")
+        client.auth_token = response.json()["token"]
+        self._client = client
+
+        records = [{
+            "file_name": f"plancheck_{run}_{i}.pdf",
+            "md5_hash": f"plancheck_{run}_{i}",
+            "nama_paket": f"Plan check paket {i}",
+            "kode_paket": f"PLAN-{run}-{i}",
+            "tanggal_pembuatan": f"2024-{i % 12 + 1:02d}-01",
+            "kl_pd_instansi": f"Instansi {i % 40}",
+            "jenis_pengadaan": ["Barang", "Jasa Konsultansi", "Pekerjaan Konstruksi"][i % 3],
+            "metode_pengadaan": "Tender",
+            "nilai_pagu_paket": 1000000 + i,
+            "nilai_hps_paket": 900000 + i
+        } for i in range(self.seed)]
+        result = client.create_paket_batch(records)
+        if not result.get("success"):
+            raise RuntimeError(f"seeding failed: {result.get('error')}")
+        self._seeded_ids = [item["id"] for item in result["data"]["results"] if item.get("id")]
+        for record in records[:min(self.seed, 200)]:
+            client.add_to_favorites(record["md5_hash"])
+        print(f"{Fore.BLUE}🌱 Seeded {len(self._seeded_ids)} paket and a user with favorites")
+
+    def cleanup(self) -> None:
+        if not self._client:
+            return
+        self._client.clear_all_favorites()
+        if self._seeded_ids:
+            self._client.delete_paket_batch(self._seeded_ids)
+        self._client.delete_user_account()
+
+    def sample_values(self) -> Dict:
+        """Keys of existing rows for the parameters in PLANS (made-up values where a table is empty)"""
+        paket = self.query("SELECT id, md5_hash FROM paket_pengadaan ORDER BY id DESC LIMIT 20")
+        favorite = self.query("SELECT id, user_id, md5_hash, created_at FROM user_favorites ORDER BY id DESC LIMIT 1")
+        user = self.query("SELECT user_id, email, username FROM users ORDER BY user_id DESC LIMIT 1")
+        event = self.query("SELECT COALESCE(MAX(id), 0) AS id FROM change_events")
+        favorite = favorite[0] if favorite else {"id": 1, "user_id": 1, "md5_hash": "", "created_at": "2024-01-01"}
+        user = user[0] if user else {"user_id": 1, "email": "nobody@example.com", "username": "nobody"}
+        month = time.strftime("%Y-%m")
+        return {
+            "email": user["email"],
+            "username": user["username"],
+            "user_id": favorite["user_id"],
+            "paket_id": paket[0]["id"] if paket else 1,
+            "paket_ids": tuple(row["id"] for row in paket) or (1,),
+            "md5_hash": favorite["md5_hash"],
+            "md5_hashes": tuple(row["md5_hash"] for row in paket) or ("",),
+            "favorite_id": favorite["id"],
+            "favorited_at": favorite["created_at"],
+            "search": "%jalan%",
+            "limit": 10,
+            "offset": 0,
+            "months": (month, month),
+            "event_id": max(int(event[0]["id"]) - 100, 0),
+        }
+
+    def run(self, analyze: bool = True) -> List[PlanResult]:
+        if self.seed:
+            self.seed_data()
+        try:
+            if analyze:
+                # Fresh index statistics, otherwise the plans reflect whatever the tables looked like before
+                self.query("ANALYZE TABLE users, paket_pengadaan, paket_stats, user_favorites, change_events")
+            values = self.sample_values()
+            for plan in PLANS:
+                rows = self.query(f"EXPLAIN {plan.sql}", tuple(values[name] for name in plan.params))
+                self.results.append(check_plan(plan, rows))
+        finally:
+            self.cleanup()
+        return self.results
+
+    def print_report(self) -> None:
+        print(f"\n{Fore.CYAN}{'='*70}")
+        print(f"{Fore.CYAN}🔎 QUERY PLANS")
+        print(f"{Fore.CYAN}{'='*70}")
+        for result in self.results:
+            access = ", ".join(f"{row.get('table')}:{row.get('type')}/{row.get('key') or '-'}" for row in result.rows)
+            color = Fore.RED if result.problems else Fore.YELLOW if result.allowed else Fore.GREEN
+            print(f"{color}{result.plan.route:<36} {access}")
+            for problem in result.problems:
+                print(f"{Fore.RED}   ❌ {problem}")
+            for note in result.allowed:
+                print(f"{Fore.YELLOW}   ⚠️ {note}")
+        failed = sum(1 for result in self.results if result.problems)
+        color = Fore.RED if failed else Fore.GREEN
+        print(f"{color}{len(self.results) - failed}/{len(self.results)} statements use indexes as expected")
+
+    def to_dict(self) -> List[Dict]:
+        return [{"route": result.plan.route, "sql": result.plan.sql, "problems": result.problems,
+                 "allowed": result.allowed, "explain": result.rows}
+                for result in self.results]
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="EXPLAIN the routes' SQL and fail on full scans and filesorts")
+    parser.add_argument("--db-host", default=os.environ.get("DB_HOST", "localhost"))
+    parser.add_argument("--db-port", type=int, default=int(os.environ.get("DB_PORT", "3306")))
+    parser.add_argument("--db-user", default=os.environ.get("DB_USER", "root"))
+    parser.add_argument("--db-password", default=os.environ.get("DB_PASSWORD", ""))
+    parser.add_argument("--db-name", default=os.environ.get("DB_NAME", "data_crud_v1"))
+    parser.add_argument("--url", default="http://localhost:3001", help="API used by --seed")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="create this many synthetic paket through the API first (removed afterwards)")
+    parser.add_argument("--no-analyze", action="store_true", help="skip ANALYZE TABLE before explaining")
+    parser.add_argument("--json", help="write the plans as JSON to this file")
+    args = parser.parse_args(argv)
+
+    try:
+        connection = pymysql.connect(host=args.db_host, port=args.db_port, user=args.db_user,
+                                     password=args.db_password, database=args.db_name, autocommit=True)
+    except pymysql.err.OperationalError as e:
+        print(f"{Fore.RED}❌ Cannot connect to {args.db_name}@{args.db_host}:{args.db_port}: {e}")
+        return 1
+    print(f"{Fore.MAGENTA}🔎 Checking {len(PLANS)} statements against {args.db_name}@{args.db_host}")
+    checker = PlanChecker(connection, args.url, args.seed)
+    try:
+        checker.run(analyze=not args.no_analyze)
+    finally:
+        connection.close()
+    checker.print_report()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(checker.to_dict(), f, default=str)
+
+    return 1 if any(result.problems for result in checker.results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
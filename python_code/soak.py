@@ -0,0 +1,513 @@
+"""
+Soak Test
+Loops the paket, favorites and user scenarios for hours and flags memory or latency drift
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import secrets
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import requests
+from colorama import Fore
+
+from api_client import SimpleCRUDAPIClient
+from load_runner import LatencyHistogram
+
+HEALTH = "GET /api/health"
+
+_BOOKKEEPING_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, sys.modules[LatencyHistogram.__module__].__file__),
+]
+
+
+def parse_duration(text: str) -> float:
+    """Seconds from "90", "90s", "45m" or "4h" """
+    match = re.fullmatch(r"\s*([\d.]+)\s*([smh]?)\s*", text)
+    if not match:
+        raise argparse.ArgumentTypeError(f"invalid duration: {text!r}")
+    return float(match.group(1)) * {"": 1, "s": 1, "m": 60, "h": 3600}[match.group(2)]
+
+
+def rss_bytes() -> Optional[int]:
+    """Current resident set size of this process, None where it cannot be read"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Peak rather than current RSS, but still monotone under a leak (bytes on macOS, KiB elsewhere)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+# Trend detection: Mann-Kendall test for a monotone trend plus the Theil-Sen slope for its size
+
+class Drift(NamedTuple):
+    series: str
+    samples: int
+    first: float             # Theil-Sen line at the first sample
+    last: float              # Theil-Sen line at the last sample
+    slope_per_hour: float
+    growth: float            # (last - first) / first
+    z: float
+    p: float                 # one-sided p-value for an upward trend
+    significant: bool
+
+    def to_dict(self) -> Dict:
+        return self._asdict()
+
+
+def mann_kendall(values: List[float]) -> Tuple[float, float]:
+    """(z, one-sided p) of the Mann-Kendall statistic for an upward trend, with tie correction"""
+    n = len(values)
+    s = 0
+    for i in range(n - 1):
+        for j in range(i + 1, n):
+            s += (values[j] > values[i]) - (values[j] < values[i])
+
+    ties: Dict[float, int] = {}
+    for value in values:
+        ties[value] = ties.get(value, 0) + 1
+    variance = (n * (n - 1) * (2 * n + 5)
+                - sum(t * (t - 1) * (2 * t + 5) for t in ties.values())) / 18
+    if variance <= 0:
+        return 0.0, 1.0
+    z = (s - 1) / math.sqrt(variance) if s > 0 else (s + 1) / math.sqrt(variance) if s < 0 else 0.0
+    return z, 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def theil_sen(times: List[float], values: List[float]) -> Tuple[float, float]:
+    """(slope, intercept) as the median of pairwise slopes"""
+    slopes = sorted((values[j] - values[i]) / (times[j] - times[i])
+                    for i in range(len(times) - 1) for j in range(i + 1, len(times))
+                    if times[j] != times[i])
+    slope = _median(slopes) if slopes else 0.0
+    intercept = _median([v - slope * t for t, v in zip(times, values)])
+    return slope, intercept
+
+
+def _median(values: List[float]) -> float:
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    return ordered[middle] if len(ordered) % 2 else (ordered[middle - 1] + ordered[middle]) / 2
+
+
+def _thin(points: List[Tuple[float, float]], limit: int) -> List[Tuple[float, float]]:
+    """Every k-th point so the O(n^2) statistics stay cheap on multi-hour series"""
+    step = max(1, math.ceil(len(points) / limit))
+    return points[::step]
+
+
+def detect_drift(series: str, points: List[Tuple[float, float]], alpha: float = 0.01,
+                 min_growth: float = 0.1, max_points: int = 500) -> Optional[Drift]:
+    """Test (seconds, value) points for upward drift
+
+    Significant means the Mann-Kendall p-value is below `alpha` and the fitted
+    line rises by at least `min_growth` (relative) over the series, so a
+    steady but negligible creep is not reported. None with fewer than 4 points.
+    """
+    points = _thin(points, max_points)
+    if len(points) < 4:
+        return None
+    times = [t for t, _ in points]
+    values = [v for _, v in points]
+    z, p = mann_kendall(values)
+    slope, intercept = theil_sen(times, values)
+    first = intercept + slope * times[0]
+    last = intercept + slope * times[-1]
+    growth = (last - first) / abs(first) if first else (math.inf if last > first else 0.0)
+    return Drift(series, len(points), first, last, slope * 3600, growth, z, p,
+                 p < alpha and growth >= min_growth)
+
+
+class SoakRecorder:
+    """Per-endpoint latency histograms in fixed time buckets, plus periodic process samples"""
+
+    def __init__(self, bucket_seconds: float = 300):
+        self.bucket_seconds = bucket_seconds
+        self.start = time.perf_counter()
+        self.buckets: List[Dict[str, LatencyHistogram]] = []
+        self.errors: Dict[str, int] = {}
+        self.samples: List[Dict] = []
+        self.iterations = 0
+        self._lock = threading.Lock()
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    def record(self, name: str, seconds: float, ok: bool) -> None:
+        index = int(self.elapsed() / self.bucket_seconds)
+        with self._lock:
+            while len(self.buckets) <= index:
+                self.buckets.append({})
+            bucket = self.buckets[index]
+            if name not in bucket:
+                bucket[name] = LatencyHistogram()
+            bucket[name].record(seconds)
+            if not ok:
+                self.errors[name] = self.errors.get(name, 0) + 1
+
+    def add_iteration(self) -> None:
+        """One scenario run finished; called by every user thread"""
+        with self._lock:
+            self.iterations += 1
+
+    def add_sample(self, sample: Dict) -> None:
+        with self._lock:
+            self.samples.append(sample)
+
+    def endpoints(self) -> List[str]:
+        with self._lock:
+            return sorted({name for bucket in self.buckets for name in bucket})
+
+    def percentile_series(self, name: str, p: float = 95, min_count: int = 20,
+                          after: float = 0) -> List[Tuple[float, float]]:
+        """(bucket midpoint in seconds, p-th percentile) for buckets with enough requests"""
+        with self._lock:
+            buckets = list(self.buckets)
+        series = []
+        for index, bucket in enumerate(buckets):
+            midpoint = (index + 0.5) * self.bucket_seconds
+            histogram = bucket.get(name)
+            if midpoint >= after and histogram and histogram.count >= min_count:
+                series.append((midpoint, histogram.percentile(p)))
+        return series
+
+    def sample_series(self, field: str, after: float = 0) -> List[Tuple[float, float]]:
+        with self._lock:
+            return [(s["t"], s[field]) for s in self.samples if s["t"] >= after and s.get(field) is not None]
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                "bucket_seconds": self.bucket_seconds,
+                "buckets": [{name: histogram.to_dict() for name, histogram in bucket.items()}
+                            for bucket in self.buckets],
+                "errors": dict(self.errors),
+                "samples": list(self.samples)
+            }
+
+
+class SoakRunner:
+    """Run the CRUD scenarios in a loop for `duration` seconds and watch for drift
+
+    Each of `users` threads registers its own user and cycles through the
+    paket, favorites and user scenarios, pausing `think` seconds between
+    scenarios. Every request lands in the recorder's current time bucket.
+    A sampler thread records client RSS, traced Python memory and the top
+    allocators every `sample_interval` seconds and times `/api/health` on a
+    separate session. Samples taken in the first `warmup` seconds are kept but
+    left out of the drift tests, so connection pools and caches can fill first.
+    """
+
+    SCENARIOS = ("paket", "favorites", "user")
+
+    def __init__(self, base_url: str, duration: float, users: int = 4, think: float = 0.0,
+                 bucket_seconds: float = 300, sample_interval: float = 10, warmup: float = 300,
+                 trace_memory: bool = True, top_allocators: int = 5,
+                 alpha: float = 0.01, min_growth: float = 0.1,
+                 client_factory: Callable[[str], SimpleCRUDAPIClient] = None):
+        self.base_url = base_url
+        self.duration = duration
+        self.users = users
+        self.think = think
+        self.sample_interval = sample_interval
+        self.warmup = warmup
+        self.trace_memory = trace_memory
+        self.top_allocators = top_allocators
+        self.alpha = alpha
+        self.min_growth = min_growth
+        self.client_factory = client_factory or (lambda url: SimpleCRUDAPIClient(url, verbose=False))
+        self.recorder = SoakRecorder(bucket_seconds)
+        self.drifts: List[Drift] = []
+        self._stop = threading.Event()
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+
+    @property
+    def iterations(self) -> int:
+        return self.recorder.iterations
+
+    # Scenarios
+
+    def _call(self, client: SimpleCRUDAPIClient, name: str, method: str, path: str,
+              data: Dict = None, params: Dict = None, use_auth: bool = True) -> Optional[requests.Response]:
+        started = time.perf_counter()
+        try:
+            response = client._make_request(method, path, data=data, params=params, use_auth=use_auth)
+        except requests.exceptions.RequestException:
+            self.recorder.record(name, time.perf_counter() - started, False)
+            return None
+        self.recorder.record(name, time.perf_counter() - started, response.status_code < 400)
+        return response
+
+    def _create_paket(self, client: SimpleCRUDAPIClient, md5_hash: str) -> Optional[int]:
+        response = self._call(client, "POST /api/paket", "POST", "/api/paket", data={
+            "nama_paket": "Soak Test Paket", "kode_paket": f"SOAK-{md5_hash[:8]}",
+            "nilai_pagu_paket": 75000000, "md5_hash": md5_hash, "file_name": "soak.pdf",
+            "kl_pd_instansi": "Dinas Teknologi", "jenis_pengadaan": "Barang",
+            "metode_pengadaan": "Tender Terbuka", "tanggal_pembuatan": "2024-01-15"
+        })
+        if response is None or response.status_code != 201:
+            return None
+        return response.json().get("data", {}).get("id")
+
+    def run_paket(self, client: SimpleCRUDAPIClient) -> None:
+        self._call(client, "GET /api/paket", "GET", "/api/paket", params={"page": 1, "limit": 10}, use_auth=False)
+        self._call(client, "GET /api/paket?q", "GET", "/api/paket",
+                   params={"q": "Laptop", "page": 1, "limit": 10}, use_auth=False)
+        paket_id = self._create_paket(client, secrets.token_hex(16))
+        if paket_id is None:
+            return
+        self._call(client, "GET /api/paket/{id}", "GET", f"/api/paket/{paket_id}", use_auth=False)
+        self._call(client, "PUT /api/paket/{id}", "PUT", f"/api/paket/{paket_id}",
+                   data={"nama_paket": "Soak Test Paket (updated)"})
+        self._call(client, "DELETE /api/paket/{id}", "DELETE", f"/api/paket/{paket_id}")
+        self._call(client, "GET /api/stats", "GET", "/api/stats", use_auth=False)
+
+    def run_favorites(self, client: SimpleCRUDAPIClient) -> None:
+        md5_hash = secrets.token_hex(16)
+        paket_id = self._create_paket(client, md5_hash)
+        if paket_id is None:
+            return
+        self._call(client, "POST /api/favorites", "POST", "/api/favorites",
+                   data={"md5_hash": md5_hash, "notes": "soak"})
+        self._call(client, "GET /api/favorites/check/{md5_hash}", "GET", f"/api/favorites/check/{md5_hash}")
+        self._call(client, "GET /api/favorites", "GET", "/api/favorites")
+        self._call(client, "GET /api/favorites/stats", "GET", "/api/favorites/stats")
+        self._call(client, "DELETE /api/favorites/{md5_hash}", "DELETE", f"/api/favorites/{md5_hash}")
+        self._call(client, "DELETE /api/paket/{id}", "DELETE", f"/api/paket/{paket_id}")
+
+    def run_user(self, client: SimpleCRUDAPIClient) -> None:
+        self._call(client, "GET /api/users/profile", "GET", "/api/users/profile")
+        self._call(client, "PUT /api/users/profile", "PUT", "/api/users/profile",
+                   data={"full_name": f"Soak User {secrets.token_hex(4)}"})
+
+    def _login(self, client: SimpleCRUDAPIClient, index: int) -> bool:
+        suffix = f"{int(time.time())}_{index}_{secrets.token_hex(3)}"
+        response = self._call(client, "POST /api/auth/register", "POST", "/api/auth/register", data={
+            "username": f"soak_{suffix}", "email": f"soak_{suffix}@example.com",
+            "password": "soakpassword123", "full_name": "Soak User"
+        }, use_auth=False)
+        if response is None or response.status_code != 201:
+            return False
+        client.auth_token = response.json().get("token")
+        return True
+
+    def _user_loop(self, index: int) -> None:
+        client = self.client_factory(self.base_url)
+        # Latency drift must come from the server, not from responses the client reused
+        client.reuse_responses = False
+        if not self._login(client, index):
+            print(f"{Fore.RED}❌ Soak user {index} could not register; running anonymous scenarios only")
+        scenarios = [getattr(self, f"run_{name}") for name in self.SCENARIOS]
+        if client.auth_token is None:
+            scenarios = [self.run_paket]
+
+        turn = index
+        while not self._stop.is_set():
+            scenarios[turn % len(scenarios)](client)
+            turn += 1
+            self.recorder.add_iteration()
+            if self.think:
+                self._stop.wait(self.think)
+
+        if client.auth_token:
+            self._call(client, "DELETE /api/users/account", "DELETE", "/api/users/account")
+
+    # Sampling
+
+    def take_sample(self, health_client: SimpleCRUDAPIClient) -> Dict:
+        sample = {"t": round(self.recorder.elapsed(), 3), "rss": rss_bytes(),
+                  "health": None, "traced": None, "top": []}
+
+        started = time.perf_counter()
+        try:
+            response = health_client._make_request("GET", "/api/health", use_auth=False)
+            ok = response.status_code == 200
+        except requests.exceptions.RequestException:
+            ok = False
+        health = time.perf_counter() - started
+        self.recorder.record(HEALTH, health, ok)
+        if ok:
+            sample["health"] = health
+
+        if self.trace_memory and tracemalloc.is_tracing():
+            # The soak's own buckets and samples grow by design; leave them out of the client's memory
+            snapshot = tracemalloc.take_snapshot().filter_traces(_BOOKKEEPING_FILTERS)
+            sample["traced"] = sum(stat.size for stat in snapshot.statistics("filename"))
+            if self._baseline is None and sample["t"] >= self.warmup:
+                self._baseline = snapshot
+            sample["top"] = self.top_growth(snapshot)
+        return sample
+
+    def top_growth(self, snapshot: "tracemalloc.Snapshot") -> List[Dict]:
+        """Allocation sites that grew the most since the post-warmup baseline (largest sites before it)"""
+        if self._baseline is None:
+            stats = snapshot.statistics("lineno")[:self.top_allocators]
+            return [{"site": str(stat.traceback), "size": stat.size, "growth": 0} for stat in stats]
+        stats = snapshot.compare_to(self._baseline, "lineno")[:self.top_allocators]
+        return [{"site": str(stat.traceback), "size": stat.size, "growth": stat.size_diff} for stat in stats]
+
+    def _sampler(self) -> None:
+        health_client = self.client_factory(self.base_url)
+        while True:
+            self.recorder.add_sample(self.take_sample(health_client))
+            if self._stop.wait(self.sample_interval):
+                return
+
+    # Run and analysis
+
+    def run(self) -> "SoakRunner":
+        started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+
+        sampler = threading.Thread(target=self._sampler, daemon=True)
+        users = [threading.Thread(target=self._user_loop, args=(i,), daemon=True) for i in range(self.users)]
+        sampler.start()
+        for thread in users:
+            thread.start()
+
+        try:
+            while not self._stop.wait(min(60, max(self.duration - self.recorder.elapsed(), 0))):
+                if self.recorder.elapsed() >= self.duration:
+                    break
+                self.print_progress()
+        except KeyboardInterrupt:
+            print(f"\n{Fore.YELLOW}⏹️ Interrupted, analysing what was collected")
+        finally:
+            self._stop.set()
+            for thread in users:
+                thread.join()
+            sampler.join()
+            # One last sample so the series end where the run did
+            self.recorder.add_sample(self.take_sample(self.client_factory(self.base_url)))
+            if started_tracing:
+                tracemalloc.stop()
+
+        self.drifts = self.analyse()
+        return self
+
+    def analyse(self) -> List[Drift]:
+        """Drift tests on memory, health latency and per-endpoint p95 after the warm-up"""
+        series = {
+            "client rss": self.recorder.sample_series("rss", self.warmup),
+            "client traced memory": self.recorder.sample_series("traced", self.warmup),
+            "health latency": self.recorder.sample_series("health", self.warmup),
+        }
+        for name in self.recorder.endpoints():
+            series[f"p95 {name}"] = self.recorder.percentile_series(name, 95, after=self.warmup)
+
+        tested = {name: points for name, points in series.items() if len(points) >= 4}
+        # Bonferroni: alpha is for the whole run, not for each of the series tested
+        alpha = self.alpha / max(len(tested), 1)
+        return [detect_drift(name, points, alpha, self.min_growth) for name, points in tested.items()]
+
+    def print_progress(self) -> None:
+        sample = self.recorder.samples[-1] if self.recorder.samples else {}
+        rss = sample.get("rss")
+        health = sample.get("health")
+        print(f"{Fore.BLUE}⏱️ {self.recorder.elapsed() / 60:6.1f} min  iterations={self.iterations}"
+              f"  rss={rss / 2**20 if rss else 0:.1f} MiB"
+              f"  health={health * 1000 if health else 0:.1f} ms")
+
+    def print_report(self) -> None:
+        ms = lambda seconds: f"{seconds * 1000:9.1f}"
+        recorder = self.recorder
+        print(f"\n{Fore.CYAN}{'='*100}")
+        print(f"{Fore.CYAN}🧪 SOAK TEST REPORT ({recorder.elapsed() / 60:.1f} min, "
+              f"{len(recorder.buckets)} buckets of {recorder.bucket_seconds:.0f}s)")
+        print(f"{Fore.CYAN}{'='*100}")
+
+        print(f"{Fore.WHITE}{'Endpoint':<38}{'requests':>9}{'errors':>8}{'p95 first':>11}{'p95 last':>11}{'p95 max':>10}")
+        for name in recorder.endpoints():
+            series = recorder.percentile_series(name, 95, min_count=1)
+            count = sum(bucket[name].count for bucket in recorder.buckets if name in bucket)
+            errors = recorder.errors.get(name, 0)
+            color = Fore.RED if errors else Fore.GREEN
+            values = [value for _, value in series] or [0.0]
+            print(f"{color}{name:<38}{count:>9}{errors:>8}{ms(values[0]):>11}{ms(values[-1]):>11}{ms(max(values)):>10}")
+
+        rss = recorder.sample_series("rss")
+        traced = recorder.sample_series("traced")
+        if rss:
+            print(f"\n{Fore.WHITE}Client RSS: {rss[0][1] / 2**20:.1f} MiB -> {rss[-1][1] / 2**20:.1f} MiB")
+        if traced:
+            print(f"{Fore.WHITE}Traced Python memory: {traced[0][1] / 2**20:.1f} MiB -> {traced[-1][1] / 2**20:.1f} MiB")
+        top = recorder.samples[-1]["top"] if recorder.samples else []
+        if top:
+            print(f"{Fore.WHITE}Top allocators (growth since warm-up):")
+            for entry in top:
+                print(f"   {entry['growth'] / 1024:+10.1f} KiB  {entry['size'] / 1024:10.1f} KiB  {entry['site']}")
+
+        print(f"\n{Fore.WHITE}{'Drift (after warm-up)':<50}{'n':>5}{'first':>12}{'last':>12}{'growth':>9}{'p':>10}")
+        for drift in self.drifts:
+            scale = 2**20 if drift.series.startswith("client") else 1e-3
+            unit = "MiB" if drift.series.startswith("client") else "ms"
+            color = Fore.RED if drift.significant else Fore.GREEN
+            print(f"{color}{drift.series:<50}{drift.samples:>5}{drift.first / scale:>8.1f}{unit:>4}"
+                  f"{drift.last / scale:>8.1f}{unit:>4}{drift.growth:>+9.0%}{drift.p:>10.2g}")
+        if not self.drifts:
+            print(f"{Fore.YELLOW}Not enough samples after the warm-up to test for drift")
+
+        flagged = [drift.series for drift in self.drifts if drift.significant]
+        if flagged:
+            print(f"\n{Fore.RED}⚠️ Significant upward drift: {', '.join(flagged)}")
+        else:
+            print(f"\n{Fore.GREEN}✅ No significant upward drift in memory or latency")
+
+    def to_dict(self) -> Dict:
+        return {
+            "base_url": self.base_url,
+            "duration": self.recorder.elapsed(),
+            "warmup": self.warmup,
+            "iterations": self.iterations,
+            "drift": [drift.to_dict() for drift in self.drifts],
+            **self.recorder.to_dict()
+        }
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Long-running soak test with memory and latency drift detection")
+    parser.add_argument("--url", default="http://localhost:3001")
+    parser.add_argument("--duration", type=parse_duration, default="4h", help="e.g. 90m, 4h (default 4h)")
+    parser.add_argument("--users", type=int, default=4, help="concurrent scenario loops")
+    parser.add_argument("--think", type=float, default=0.0, help="seconds between scenarios per user")
+    parser.add_argument("--bucket", type=parse_duration, default="5m", help="latency bucket width")
+    parser.add_argument("--sample-interval", type=parse_duration, default="10s")
+    parser.add_argument("--warmup", type=parse_duration, default="5m", help="left out of the drift tests")
+    parser.add_argument("--no-tracemalloc", action="store_true", help="skip tracemalloc (it slows allocation)")
+    parser.add_argument("--alpha", type=float, default=0.01, help="significance level for the whole run")
+    parser.add_argument("--min-growth", type=float, default=0.1, help="smallest relative rise worth flagging")
+    parser.add_argument("--json", help="write buckets, samples and drift results to this file")
+    args = parser.parse_args(argv)
+
+    print(f"{Fore.MAGENTA}🧪 Soak test against {args.url} for {args.duration / 3600:.2f} h with {args.users} users")
+    runner = SoakRunner(args.url, args.duration, users=args.users, think=args.think,
+                        bucket_seconds=args.bucket, sample_interval=args.sample_interval, warmup=args.warmup,
+                        trace_memory=not args.no_tracemalloc, alpha=args.alpha, min_growth=args.min_growth)
+    runner.run().print_report()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(runner.to_dict(), f)
+
+    return 1 if any(drift.significant for drift in runner.drifts) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,744 @@
+"""
+Local Stand-In Server
+In-memory imitation of the dashboard API for load tooling and client tests
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import re
+import secrets
+import threading
+import time
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from colorama import Fore
+
+from fault_injection import FaultInjector, load_rules, reset_connection, write_throttled
+
+PAKET_FIELDS = [
+    "file_name", "md5_hash", "nama_paket", "kode_paket", "tanggal_pembuatan", "tanggal_penutupan",
+    "kl_pd_instansi", "satuan_kerja", "jenis_pengadaan", "metode_pengadaan", "nilai_pagu_paket",
+    "nilai_hps_paket", "lokasi_pekerjaan", "syarat_kualifikasi", "peserta_non_tender", "html_content"
+]
+
+# Columns returned by the favorites join, as in app/api/favorites/route.ts
+FAVORITE_PAKET_FIELDS = [
+    "id", "md5_hash", "nama_paket", "kode_paket", "nilai_pagu_paket", "kl_pd_instansi", "satuan_kerja",
+    "jenis_pengadaan", "metode_pengadaan", "lokasi_pekerjaan", "peserta_non_tender", "tanggal_pembuatan",
+    "created_at", "updated_at"
+]
+
+
+# Hashes the favorites tests expect to exist, given to the first seed rows
+KNOWN_HASHES = ["032477c9bdd128dd1e1c3b3b7fe283f4", "1366f6f446e18cd51b472f28fdc42b2d"]
+
+
+def sample_paket(i: int) -> Dict:
+    """Deterministic seed row"""
+    instansi = ["Dinas Teknologi", "Dinas Kesehatan", "Dinas Pendidikan", "Kementerian PUPR"][i % 4]
+    pagu = 10_000_000 + (i * 7_919_000) % 990_000_000
+    return {
+        "file_name": f"paket_{i}.pdf",
+        "md5_hash": KNOWN_HASHES[i] if i < len(KNOWN_HASHES) else hashlib.md5(f"paket-{i}".encode()).hexdigest(),
+        "nama_paket": f"Pengadaan {['Laptop', 'Server', 'Jaringan', 'Kendaraan'][i % 4]} {i}",
+        "kode_paket": f"PKT{i:05d}",
+        "tanggal_pembuatan": f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+        "tanggal_penutupan": None,
+        "kl_pd_instansi": instansi,
+        "satuan_kerja": "Bagian Umum",
+        "jenis_pengadaan": ["Barang", "Jasa Konsultansi", "Pekerjaan Konstruksi"][i % 3],
+        "metode_pengadaan": ["Tender Terbuka", "Pengadaan Langsung", "E-Purchasing"][i % 3],
+        "nilai_pagu_paket": pagu,
+        "nilai_hps_paket": pagu * 0.9,
+        "lokasi_pekerjaan": "Jakarta",
+        "syarat_kualifikasi": "SIUP dan NPWP",
+        "peserta_non_tender": "Tidak ada",
+        "html_content": f"<p>Detail pengadaan {i}</p>" * 20
+    }
+
+
+# Upper bounds (ms) of the timing buckets in /api/health/metrics, as in lib/database.ts
+TIMING_BOUNDS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+
+
+class Timing:
+    """Count/avg/p95/max of durations, shaped like TimingStats in lib/database.ts"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(TIMING_BOUNDS_MS) + 1)
+
+    def record(self, ms: float) -> None:
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+        self.buckets[next((i for i, bound in enumerate(TIMING_BOUNDS_MS) if ms <= bound), len(TIMING_BOUNDS_MS))] += 1
+
+    def percentile(self, p: float) -> float:
+        target = max(1, -(-p * self.count // 100))
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= target:
+                return min(TIMING_BOUNDS_MS[index], self.max) if index < len(TIMING_BOUNDS_MS) else self.max
+        return self.max
+
+    def to_dict(self) -> Dict:
+        return {"count": self.count, "avg_ms": round(self.total / self.count, 2) if self.count else 0,
+                "p95_ms": round(self.percentile(95), 2) if self.count else 0, "max_ms": round(self.max, 2)}
+
+
+class DashboardState:
+    """In-memory tables guarded by one lock"""
+
+    def __init__(self, seed_paket: int = 100):
+        self.lock = threading.Lock()
+        self.paket: Dict[int, Dict] = {}
+        self.users: Dict[int, Dict] = {}
+        self.tokens: Dict[str, int] = {}
+        self.favorites: Dict[int, Dict[str, Dict]] = {}
+        self.next_paket_id = 1
+        self.next_user_id = 1
+        self.next_favorite_id = 1
+        # Route action times and in-flight actions, reported in place of DB pool metrics
+        self.route_times: Dict[str, Timing] = {}
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.started = time.time()
+        for i in range(seed_paket):
+            self.insert_paket(sample_paket(i))
+
+    def insert_paket(self, data: Dict) -> Dict:
+        now = time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime())
+        row = {"id": self.next_paket_id, **{field: data.get(field) for field in PAKET_FIELDS},
+               "created_at": now, "updated_at": now}
+        self.paket[row["id"]] = row
+        self.next_paket_id += 1
+        return row
+
+    def paket_by_hash(self, md5_hash: str) -> Optional[Dict]:
+        return next((row for row in self.paket.values() if row["md5_hash"] == md5_hash), None)
+
+
+class Request:
+    def __init__(self, handler: "StandInHandler", path: str, query: Dict[str, str], body, match):
+        self.handler = handler
+        self.path = path
+        self.query = query
+        self.body = body
+        self.params = match.groupdict() if match else {}
+        self.headers = handler.headers
+
+
+Response = Tuple[int, Dict]
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes; with Nagle on, each response waits on a delayed ACK
+    disable_nagle_algorithm = True
+    server: "StandInHTTPServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _dispatch(self, method: str) -> None:
+        parsed = urlparse(self.path)
+        query = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+
+        for route_method, pattern, action, name in self.server.routes:
+            match = pattern.fullmatch(parsed.path)
+            if route_method == method and match:
+                try:
+                    body = json.loads(raw) if raw else {}
+                except json.JSONDecodeError:
+                    self.send_json(400, {"success": False, "error": "Invalid JSON"})
+                    return
+                request = Request(self, parsed.path, query, body, match)
+                if not self.server.before_request(request):
+                    return
+                status, payload = self.server.run_action(action, name, request)
+                self.send_json(status, payload)
+                return
+
+        self.send_json(404, {"success": False, "error": "Route not found"})
+
+    def send_json(self, status: int, payload: Dict, extra_headers: Dict[str, str] = None) -> None:
+        body = json.dumps(payload, default=str).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (extra_headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.server.write_body(self, body)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+
+def route_template(pattern: str) -> str:
+    """Route name for metrics, as Next.js names it: /api/paket/(?P<id>\\d+) -> /api/paket/[id]"""
+    return re.sub(r"\(\?P<(\w+)>[^)]*\)", r"[\1]", pattern)
+
+
+# Route actions: (state, request) -> (status, json body)
+
+def _user_id(state: DashboardState, request: Request) -> Optional[int]:
+    header = request.headers.get("Authorization") or ""
+    token = header.split(" ")[1] if " " in header else None
+    return state.tokens.get(token)
+
+
+def _auth_error(request: Request) -> Response:
+    if not (request.headers.get("Authorization") or "").strip():
+        return 401, {"success": False, "error": "Access token required"}
+    return 403, {"success": False, "error": "Invalid or expired token"}
+
+
+def health(state, request) -> Response:
+    return 200, {"success": True, "message": "API is healthy", "database": "connected",
+                 "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())}
+
+
+def register(state, request) -> Response:
+    body = request.body
+    if not body.get("username") or not body.get("email") or not body.get("password"):
+        return 400, {"success": False, "error": "Username, email and password are required"}
+    with state.lock:
+        if any(u["email"] == body["email"] or u["username"] == body["username"] for u in state.users.values()):
+            return 400, {"success": False, "error": "User with this email or username already exists"}
+        user = {"user_id": state.next_user_id, "username": body["username"], "email": body["email"],
+                "password": body["password"], "full_name": body.get("full_name")}
+        state.users[user["user_id"]] = user
+        state.next_user_id += 1
+        token = secrets.token_hex(16)
+        state.tokens[token] = user["user_id"]
+    data = {key: user[key] for key in ("user_id", "username", "email", "full_name")}
+    return 201, {"success": True, "message": "User registered successfully", "data": data, "token": token}
+
+
+def login(state, request) -> Response:
+    email, password = request.body.get("email"), request.body.get("password")
+    if not email or not password:
+        return 400, {"success": False, "error": "Email and password are required"}
+    with state.lock:
+        user = next((u for u in state.users.values() if u["email"] == email), None)
+        if not user or user["password"] != password:
+            return 401, {"success": False, "error": "Invalid email or password"}
+        token = secrets.token_hex(16)
+        state.tokens[token] = user["user_id"]
+    data = {key: user[key] for key in ("user_id", "username", "email", "full_name")}
+    return 200, {"success": True, "message": "Login successful", "data": data, "token": token}
+
+
+def get_profile(state, request) -> Response:
+    user_id = _user_id(state, request)
+    if user_id is None:
+        return _auth_error(request)
+    user = state.users[user_id]
+    return 200, {"success": True, "data": {key: user[key] for key in ("user_id", "username", "email", "full_name")}}
+
+
+def update_profile(state, request) -> Response:
+    user_id = _user_id(state, request)
+    if user_id is None:
+        return _auth_error(request)
+    with state.lock:
+        state.users[user_id].update({k: v for k, v in request.body.items() if k in ("username", "full_name")})
+    return 200, {"success": True, "message": "Profile updated successfully"}
+
+
+def change_password(state, request) -> Response:
+    user_id = _user_id(state, request)
+    if user_id is None:
+        return _auth_error(request)
+    with state.lock:
+        user = state.users[user_id]
+        if user["password"] != request.body.get("currentPassword"):
+            return 400, {"success": False, "error": "Current password is incorrect"}
+        user["password"] = request.body.get("newPassword")
+    return 200, {"success": True, "message": "Password changed successfully"}
+
+
+def delete_account(state, request) -> Response:
+    user_id = _user_id(state, request)
+    if user_id is None:
+        return _auth_error(request)
+    with state.lock:
+        state.users.pop(user_id, None)
+        state.favorites.pop(user_id, None)
+        for token in [t for t, u in state.tokens.items() if u == user_id]:
+            del state.tokens[token]
+    return 200, {"success": True, "message": "Account deleted successfully"}
+
+
+def list_paket(state, request) -> Response:
+    q = request.query.get("q", "")
+    page = int(request.query.get("page", 1))
+    limit = int(request.query.get("limit", 10))
+    with state.lock:
+        rows = [row for row in state.paket.values() if not q or q in row["nama_paket"] or q in row["kode_paket"]]
+    rows.sort(key=lambda row: row["id"], reverse=True)
+    total = len(rows)
+    return 200, {"success": True, "data": rows[(page - 1) * limit:page * limit],
+                 "pagination": {"total": total, "page": page, "limit": limit, "totalPages": -(-total // limit)}}
+
+
+def create_paket(state, request) -> Response:
+    with state.lock:
+        row = state.insert_paket(request.body)
+    return 201, {"success": True, "data": {**request.body, "id": row["id"]}, "message": "Created successfully"}
+
+
+def get_paket(state, request) -> Response:
+    row = state.paket.get(int(request.params["id"]))
+    if not row:
+        return 404, {"success": False, "error": "Not found"}
+    return 200, {"success": True, "data": row}
+
+
+def update_paket(state, request) -> Response:
+    fields = {k: v for k, v in request.body.items() if k in PAKET_FIELDS}
+    if not fields:
+        return 400, {"success": False, "error": "No fields provided for update"}
+    with state.lock:
+        row = state.paket.get(int(request.params["id"]))
+        if not row:
+            return 404, {"success": False, "error": "Not found"}
+        row.update(fields, updated_at=time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime()))
+    return 200, {"success": True, "message": "Updated successfully"}
+
+
+def delete_paket(state, request) -> Response:
+    with state.lock:
+        if state.paket.pop(int(request.params["id"]), None) is None:
+            return 404, {"success": False, "error": "Not found"}
+    return 200, {"success": True, "message": "Deleted successfully"}
+
+
+def _batch_response(results: List[Dict]) -> Response:
+    summary = {"created": 0, "updated": 0, "deleted": 0, "not_found": 0, "error": 0}
+    for result in results:
+        summary[result["status"]] += 1
+    return 200, {"success": True, "data": {"results": results, "summary": summary}}
+
+
+def create_paket_batch(state, request) -> Response:
+    results = []
+    with state.lock:
+        for index, item in enumerate(request.body.get("items") or []):
+            if not item.get("md5_hash") or not item.get("nama_paket") or not item.get("kode_paket"):
+                results.append({"index": index, "status": "error",
+                                "error": "md5_hash, nama_paket and kode_paket are required"})
+                continue
+            existing = state.paket_by_hash(item["md5_hash"])
+            if existing:
+                existing.update({field: item[field] for field in PAKET_FIELDS if field in item})
+                results.append({"index": index, "status": "updated", "id": existing["id"], "md5_hash": item["md5_hash"]})
+            else:
+                row = state.insert_paket(item)
+                results.append({"index": index, "status": "created", "id": row["id"], "md5_hash": item["md5_hash"]})
+    return _batch_response(results)
+
+
+def update_paket_batch(state, request) -> Response:
+    results = []
+    with state.lock:
+        for index, item in enumerate(request.body.get("items") or []):
+            row = state.paket.get(item.get("id"))
+            if not row:
+                results.append({"index": index, "status": "not_found", "id": item.get("id")})
+                continue
+            row.update({k: v for k, v in item.items() if k in PAKET_FIELDS})
+            results.append({"index": index, "status": "updated", "id": row["id"]})
+    return _batch_response(results)
+
+
+def delete_paket_batch(state, request) -> Response:
+    results = []
+    with state.lock:
+        for index, paket_id in enumerate(request.body.get("ids") or []):
+            status = "deleted" if state.paket.pop(paket_id, None) else "not_found"
+            results.append({"index": index, "status": status, "id": paket_id})
+    return _batch_response(results)
+
+
+# As monthBucket in lib/stats.ts: a value not starting with a real YYYY-MM has no month
+MONTH_PREFIX = re.compile(r"\d{4}-(0[1-9]|1[0-2])")
+
+
+def _month(value) -> str:
+    text = str(value) if value else ""
+    return text[:7] if MONTH_PREFIX.match(text) else ""
+
+
+def stats(state, request) -> Response:
+    today = date.today()
+    this_month = f"{today.year}-{today.month:02d}"
+    last = date(today.year - (today.month == 1), (today.month - 2) % 12 + 1, 1)
+    last_month = f"{last.year}-{last.month:02d}"
+    with state.lock:
+        months = [_month(row["tanggal_pembuatan"]) for row in state.paket.values()]
+    this_count, last_count = months.count(this_month), months.count(last_month)
+    change = (this_count - last_count) / last_count * 100 if last_count else 0
+    return 200, {"totalTender": len(months), "thisMonthCount": this_count, "lastMonthCount": last_count,
+                 "percentageChange": round(change, 1)}
+
+
+def stats_summary(state, request) -> Response:
+    dimensions = {"month": "tanggal_pembuatan", "instansi": "kl_pd_instansi",
+                  "jenis": "jenis_pengadaan", "metode": "metode_pengadaan"}
+    summary = {f"by_{name}": {} for name in dimensions}
+    total = {"bucket": "all", "count": 0, "pagu_sum": 0, "hps_sum": 0}
+    with state.lock:
+        rows = list(state.paket.values())
+    for row in rows:
+        pagu, hps = float(row["nilai_pagu_paket"] or 0), float(row["nilai_hps_paket"] or 0)
+        for bucket in [total] + [
+            summary[f"by_{name}"].setdefault(
+                key, {"bucket": key, "count": 0, "pagu_sum": 0, "hps_sum": 0})
+            for name, column in dimensions.items()
+            for key in [_month(row[column]) if name == "month" else (row[column] or "")]
+        ]:
+            bucket["count"] += 1
+            bucket["pagu_sum"] += pagu
+            bucket["hps_sum"] += hps
+    data = {"total": total, **{name: sorted(buckets.values(), key=lambda b: b["bucket"])
+                               for name, buckets in summary.items()}}
+    return 200, {"success": True, "data": data}
+
+
+def list_favorites(state, request) -> Response:
+    user_id = _user_id(state, request)
+    if user_id is None:
+        return _auth_error(request)
+    fields = [f for f in request.query.get("fields", "").split(",") if f] or None
+    unknown = [f for f in fields or [] if f != "notes" and f not in FAVORITE_PAKET_FIELDS]
+    if unknown:
+        return 400, {"success": False, "error": f"Unknown fields: {', '.join(unknown)}"}
+    paginated = "limit" in request.query or "cursor" in request.query
+    limit = min(max(int(request.query.get("limit") or 100), 1), 1000)
+    after = None
+    if request.query.get("cursor"):
+        try:
+            favorited_at, favorite_id = base64.urlsafe_b64decode(request.query["cursor"]).decode().split("|")
+            after = (favorited_at, int(favorite_id))
+        except ValueError:
+            return 400, {"success": False, "error": "Invalid cursor"}
+
+    with state.lock:
+        rows = []
+        for favorite in state.favorites.get(user_id, {}).values():
+            paket = state.paket_by_hash(favorite["md5_hash"])
+            if paket and (after is None or (favorite["created_at"], favorite["id"]) < after):
+                row = {"favorite_id": favorite["id"], "favorited_at": favorite["created_at"]}
+                if not fields or "notes" in fields:
+                    row["notes"] = favorite["notes"]
+                row.update({field: paket[field] for field in FAVORITE_PAKET_FIELDS if not fields or field in fields})
+                rows.append(row)
+    rows.sort(key=lambda row: (row["favorited_at"], row["favorite_id"]), reverse=True)
+    if not paginated:
+        return 200, {"success": True, "data": rows, "count": len(rows)}
+
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = page[-1]
+        next_cursor = base64.urlsafe_b64encode(f"{last['favorited_at']}|{last['favorite_id']}".encode()).decode()
+    return 200, {"success": True, "data": page, "count": len(page),
+                 "pagination": {"limit": limit, "next_cursor": next_cursor}}
+
+
+def add_favorite(state, request) -> Response:
+    user_id = _user_id(state, request)
+    if user_id is None:
+        return _auth_error(request)
+    md5_hash = request.body.get("md5_hash")
+    if not md5_hash:
+        return 400, {"success": False, "error": "md5_hash is required"}
+    with state.lock:
+        paket = state.paket_by_hash(md5_hash)
+        if not paket:
+            return 404, {"success": False, "error": "Paket not found"}
+        favorites = state.favorites.setdefault(user_id, {})
+        if md5_hash in favorites:
+            return 400, {"success": False, "error": "Paket already in favorites"}
+        favorite = {"id": state.next_favorite_id, "md5_hash": md5_hash, "notes": request.body.get("notes"),
+                    "created_at": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime())}
+        favorites[md5_hash] = favorite
+        state.next_favorite_id += 1
+    return 201, {"success": True, "message": "Added to favorites successfully",
+                 "data": {"favorite_id": favorite["id"], "paket": paket, "favorited_at": favorite["created_at"]}}
+
+
+def clear_favorites(state, request) -> Response:
+    user_id = _user_id(state, request)
+    if user_id is None:
+        return _auth_error(request)
+    with state.lock:
+        cleared = len(state.favorites.pop(user_id, {}))
+    return 200, {"success": True, "message": f"Cleared {cleared} favorites successfully"}
+
+
+def remove_favorite(state, request) -> Response:
+    user_id = _user_id(state, request)
+    if user_id is None:
+        return _auth_error(request)
+    with state.lock:
+        if state.favorites.get(user_id, {}).pop(request.params["md5_hash"], None) is None:
+            return 404, {"success": False, "error": "Favorite not found"}
+    return 200, {"success": True, "message": "Removed from favorites successfully"}
+
+
+def favorites_batch(state, request) -> Response:
+    user_id = _user_id(state, request)
+    if user_id is None:
+        return _auth_error(request)
+    items = request.body.get("items")
+    if not isinstance(items, list) or not items:
+        return 400, {"success": False, "error": "items must be a non-empty array"}
+    results = []
+    seen = set()
+    with state.lock:
+        favorites = state.favorites.setdefault(user_id, {})
+        for index, item in enumerate(items):
+            md5_hash = item.get("md5_hash")
+            if not md5_hash or item.get("action") not in ("add", "remove"):
+                results.append({"index": index, "status": "error",
+                                "error": "md5_hash and an action of add or remove are required"})
+                continue
+            if md5_hash in seen:
+                results.append({"index": index, "status": "error", "md5_hash": md5_hash,
+                                "error": "Duplicate md5_hash in batch"})
+                continue
+            seen.add(md5_hash)
+            if item["action"] == "remove":
+                status = "removed" if favorites.pop(md5_hash, None) else "not_found"
+            elif not state.paket_by_hash(md5_hash):
+                status = "not_found"
+            elif md5_hash not in favorites:
+                favorites[md5_hash] = {"id": state.next_favorite_id, "md5_hash": md5_hash, "notes": item.get("notes"),
+                                       "created_at": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime())}
+                state.next_favorite_id += 1
+                status = "added"
+            elif "notes" in item and item["notes"] != favorites[md5_hash]["notes"]:
+                favorites[md5_hash]["notes"] = item["notes"]
+                status = "updated"
+            else:
+                status = "unchanged"
+            results.append({"index": index, "status": status, "md5_hash": md5_hash})
+    summary = {status: 0 for status in ("added", "removed", "updated", "unchanged", "not_found", "error")}
+    for result in results:
+        summary[result["status"]] += 1
+    return 200, {"success": True, "data": {"results": results, "summary": summary}}
+
+
+def check_favorite(state, request) -> Response:
+    user_id = _user_id(state, request)
+    if user_id is None:
+        return _auth_error(request)
+    favorite = state.favorites.get(user_id, {}).get(request.params["md5_hash"])
+    return 200, {"success": True, "data": {
+        "is_favorite": favorite is not None,
+        "favorite_id": favorite["id"] if favorite else None,
+        "notes": favorite["notes"] if favorite else None,
+        "favorited_at": favorite["created_at"] if favorite else None
+    }}
+
+
+def favorites_stats(state, request) -> Response:
+    user_id = _user_id(state, request)
+    if user_id is None:
+        return _auth_error(request)
+    count = len(state.favorites.get(user_id, {}))
+    return 200, {"success": True, "data": {"total_favorites": count, "recent_favorites": count}}
+
+
+def get_faults(state, request) -> Response:
+    return 200, {"success": True, "data": request.handler.server.faults.to_dict()}
+
+
+def set_faults(state, request) -> Response:
+    """Replace the fault rules: {"rules": [...], "seed": 0}"""
+    try:
+        request.handler.server.faults.set_rules(request.body.get("rules", []), request.body.get("seed", 0))
+    except (ValueError, KeyError, TypeError) as e:
+        return 400, {"success": False, "error": f"Invalid fault rules: {e}"}
+    return get_faults(state, request)
+
+
+def health_metrics(state, request) -> Response:
+    """Shaped like GET /api/health/metrics; there is no connection pool, so in-flight actions stand in for it"""
+    with state.lock:
+        routes = {route: {"query": timing.to_dict(), "acquire": Timing().to_dict(), "errors": 0}
+                  for route, timing in state.route_times.items()}
+        pool = {"active": state.in_flight, "idle": 0, "queued": 0, "total": state.in_flight, "limit": 0,
+                "peak_active": state.peak_in_flight, "peak_queued": 0}
+    return 200, {"success": True, "data": {"uptime_s": round(time.time() - state.started), "pool": pool,
+                                           "acquire": {**Timing().to_dict(), "errors": 0}, "routes": routes},
+                 "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())}
+
+
+ROUTES: List[Tuple[str, str, Callable]] = [
+    ("GET", r"/health", health),
+    ("GET", r"/api/health", health),
+    ("GET", r"/api/health/metrics", health_metrics),
+    ("POST", r"/api/auth/register", register),
+    ("POST", r"/api/auth/login", login),
+    ("GET", r"/api/users/profile", get_profile),
+    ("PUT", r"/api/users/profile", update_profile),
+    ("PUT", r"/api/users/change-password", change_password),
+    ("DELETE", r"/api/users/account", delete_account),
+    ("GET", r"/api/paket", list_paket),
+    ("POST", r"/api/paket", create_paket),
+    ("POST", r"/api/paket/batch", create_paket_batch),
+    ("PUT", r"/api/paket/batch", update_paket_batch),
+    ("DELETE", r"/api/paket/batch", delete_paket_batch),
+    ("GET", r"/api/paket/(?P<id>\d+)", get_paket),
+    ("PUT", r"/api/paket/(?P<id>\d+)", update_paket),
+    ("DELETE", r"/api/paket/(?P<id>\d+)", delete_paket),
+    ("GET", r"/api/stats", stats),
+    ("GET", r"/api/stats/summary", stats_summary),
+    ("GET", r"/api/favorites", list_favorites),
+    ("POST", r"/api/favorites", add_favorite),
+    ("DELETE", r"/api/favorites", clear_favorites),
+    ("GET", r"/api/favorites/stats", favorites_stats),
+    ("POST", r"/api/favorites/batch", favorites_batch),
+    ("GET", r"/api/favorites/check/(?P<md5_hash>[^/]+)", check_favorite),
+    ("DELETE", r"/api/favorites/(?P<md5_hash>[^/]+)", remove_favorite),
+    ("GET", r"/__faults", get_faults),
+    ("PUT", r"/__faults", set_faults),
+]
+
+
+class StandInHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 overflows under load runs and stalls connects for a SYN retry
+    request_queue_size = 1024
+
+    def __init__(self, address, state: DashboardState, faults: FaultInjector = None):
+        super().__init__(address, StandInHandler)
+        self.state = state
+        self.faults = faults or FaultInjector()
+        self.routes = [(method, re.compile(pattern), action, f"{method} {route_template(pattern)}")
+                       for method, pattern, action in ROUTES]
+
+    def run_action(self, action: Callable, route: str, request: Request) -> Response:
+        """Run a route action, timing it for /api/health/metrics"""
+        state = self.state
+        with state.lock:
+            state.in_flight += 1
+            state.peak_in_flight = max(state.peak_in_flight, state.in_flight)
+        started = time.perf_counter()
+        try:
+            return action(state, request)
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            with state.lock:
+                state.in_flight -= 1
+                state.route_times.setdefault(route, Timing()).record(elapsed)
+
+    def before_request(self, request: Request) -> bool:
+        """Apply injected latency, resets and errors; return False if the request was answered (or dropped) here"""
+        if request.path == "/__faults":
+            return True
+        fault = self.faults.decide(request.handler.command, request.path)
+        if fault["delay"]:
+            time.sleep(fault["delay"])
+        if fault["reset"]:
+            request.handler.close_connection = True
+            reset_connection(request.handler.connection)
+            return False
+        if fault["error"]:
+            headers = {"Retry-After": "1"} if fault["error"] == 503 else None
+            request.handler.send_json(fault["error"], {"success": False, "error": "Injected fault"}, headers)
+            return False
+        return True
+
+    def write_body(self, handler: StandInHandler, body: bytes) -> None:
+        rule = self.faults.match(handler.command, urlparse(handler.path).path)
+        if rule is not None and rule.bandwidth:
+            write_throttled(handler.wfile, body, rule.bandwidth)
+        else:
+            handler.wfile.write(body)
+
+
+class StandInServer:
+    """Run the stand-in API on a background thread
+
+        with StandInServer() as server:
+            client = SimpleCRUDAPIClient(server.url)
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, seed_paket: int = 100,
+                 faults: FaultInjector = None):
+        self.state = DashboardState(seed_paket)
+        self.httpd = StandInHTTPServer((host, port), self.state, faults)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def faults(self) -> FaultInjector:
+        return self.httpd.faults
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StandInServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "StandInServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="In-memory stand-in for the dashboard API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3001)
+    parser.add_argument("--seed", type=int, default=100, help="number of paket rows to start with")
+    parser.add_argument("--faults", help="fault rules: a JSON file or a preset (slow-mysql, flaky, slow-auth)")
+    parser.add_argument("--fault-seed", type=int, default=0, help="random seed for the fault rules")
+    args = parser.parse_args(argv)
+
+    faults = FaultInjector(load_rules(args.faults) if args.faults else [], args.fault_seed)
+    server = StandInServer(args.host, args.port, args.seed, faults)
+    print(f"{Fore.GREEN}✅ Stand-in API listening on {server.url} ({args.seed} paket)")
+    if faults.rules:
+        print(f"{Fore.YELLOW}⚠️ Injecting faults on {', '.join(rule.route for rule in faults.rules)}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+Suite Reports
+Per-step timing for the CRUD test suites, JSON and JUnit XML output, and a run history with regression flags
+"""
+
+import json
+import os
+import socket
+import sys
+import time
+import xml.etree.ElementTree as ET
+from typing import Dict, List, Optional, Tuple
+
+from colorama import Fore
+
+# Suites finished in this process, in order; write_reports() reports on them
+recorded_suites: List[Dict] = []
+
+# A step regressed when it got this much slower than in the previous run...
+REGRESSION_FACTOR = 1.5
+# ...and by more than this, so a 2 ms step taking 4 ms is not flagged
+REGRESSION_MIN_MS = 25.0
+# Runs shown in the trend table, the current one included
+TREND_RUNS = 5
+
+
+class SuiteRecorder:
+    """Wall time, request count and outcome of each step of one suite
+
+        results = SuiteRecorder("Paket CRUD", client)
+        results.start("Health Check")
+        if client.health_check().get("success"):
+            results.passed()
+        ...
+        passed_tests, total_tests = results.finish()
+
+    A step runs from start() until the next start(), stop() or finish(), and
+    fails unless passed() is called meanwhile. Requests are counted from the
+    client's get_metrics(), so GETs answered by another caller's in-flight
+    request are not counted.
+    """
+
+    def __init__(self, name: str, client):
+        self.name = name
+        self.client = client
+        self.steps: List[Dict] = []
+        self.started = time.time()
+        self._current: Optional[Dict] = None
+
+    def _requests(self) -> int:
+        return self.client.get_metrics()["requests"]
+
+    def start(self, step: str) -> None:
+        self.stop()
+        self._current = {"name": step, "passed": False, "error": None,
+                         "_started": time.perf_counter(), "_requests": self._requests()}
+
+    def passed(self) -> None:
+        self._current["passed"] = True
+
+    def fail(self, error) -> None:
+        """The current step raised; it fails with the error as message"""
+        if self._current is not None:
+            self._current["passed"] = False
+            self._current["error"] = str(error) or type(error).__name__
+
+    def stop(self) -> None:
+        step, self._current = self._current, None
+        if step is None:
+            return
+        step["seconds"] = round(time.perf_counter() - step.pop("_started"), 4)
+        step["requests"] = self._requests() - step.pop("_requests")
+        self.steps.append(step)
+
+    def finish(self, error: str = None) -> Tuple[int, int]:
+        """End the suite and register it for write_reports(); returns (passed, total)"""
+        if error and self._current is None:
+            self.start("Setup")
+        if error:
+            self.fail(error)
+        self.stop()
+        recorded_suites.append(self.to_dict())
+        passed = sum(step["passed"] for step in self.steps)
+        return passed, len(self.steps)
+
+    def to_dict(self) -> Dict:
+        return {"name": self.name, "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+                "seconds": round(sum(step["seconds"] for step in self.steps), 4),
+                "passed": sum(step["passed"] for step in self.steps), "total": len(self.steps),
+                "steps": list(self.steps)}
+
+
+# Output
+
+def write_json(path: str, suites: List[Dict], regressions: List[Dict] = ()) -> None:
+    with open(path, "w") as f:
+        json.dump({"url": os.environ.get("API_URL"), "suites": suites, "regressions": list(regressions)}, f, indent=2)
+
+
+def write_junit(path: str, suites: List[Dict], regressions: List[Dict] = ()) -> None:
+    """JUnit XML as read by Jenkins, GitLab and GitHub test reporters; one testcase per step"""
+    regressed = {(item["suite"], item["step"]): item for item in regressions}
+    root = ET.Element("testsuites", name="CRUD API", tests=str(sum(suite["total"] for suite in suites)),
+                      failures=str(sum(suite["total"] - suite["passed"] for suite in suites)),
+                      time=f"{sum(suite['seconds'] for suite in suites):.3f}")
+    for suite in suites:
+        element = ET.SubElement(root, "testsuite", name=suite["name"], tests=str(suite["total"]),
+                                failures=str(suite["total"] - suite["passed"]), errors="0", skipped="0",
+                                time=f"{suite['seconds']:.3f}", timestamp=suite["timestamp"],
+                                hostname=socket.gethostname())
+        for step in suite["steps"]:
+            case = ET.SubElement(element, "testcase", classname=suite["name"], name=step["name"],
+                                 time=f"{step['seconds']:.3f}")
+            properties = ET.SubElement(case, "properties")
+            ET.SubElement(properties, "property", name="requests", value=str(step["requests"]))
+            if not step["passed"]:
+                failure = ET.SubElement(case, "failure", message=step["error"] or "step failed")
+                failure.text = step["error"] or "The step's check did not pass; see the suite output."
+            regression = regressed.get((suite["name"], step["name"]))
+            if regression:
+                ET.SubElement(properties, "property", name="regressed", value=regression["reason"])
+                ET.SubElement(case, "system-out").text = f"Regressed against the previous run: {regression['reason']}"
+    if hasattr(ET, "indent"):  # Python 3.9+
+        ET.indent(root)
+    ET.ElementTree(root).write(path, encoding="utf-8", xml_declaration=True)
+
+
+# History
+
+def read_history(path: str) -> List[Dict]:
+    """Earlier runs from a JSON lines history file, oldest first"""
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def history_entry(suites: List[Dict]) -> Dict:
+    return {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "url": os.environ.get("API_URL"),
+            "steps": {f"{suite['name']} / {step['name']}": {"seconds": step["seconds"], "requests": step["requests"],
+                                                           "passed": step["passed"]}
+                      for suite in suites for step in suite["steps"]}}
+
+
+def find_regressions(previous: Dict, current: Dict, factor: float = REGRESSION_FACTOR,
+                     min_ms: float = REGRESSION_MIN_MS) -> List[Dict]:
+    """Steps that passed in both runs and got slower by `factor` and `min_ms`, or now send more requests"""
+    regressions = []
+    for key, step in current["steps"].items():
+        before = previous["steps"].get(key)
+        if not before or not before["passed"] or not step["passed"]:
+            continue
+        reasons = []
+        slower_ms = (step["seconds"] - before["seconds"]) * 1000
+        if step["seconds"] > before["seconds"] * factor and slower_ms > min_ms:
+            reasons.append(f"{before['seconds'] * 1000:.0f}ms -> {step['seconds'] * 1000:.0f}ms")
+        if step["requests"] > before["requests"]:
+            reasons.append(f"{before['requests']} -> {step['requests']} requests")
+        if reasons:
+            suite, _, name = key.partition(" / ")
+            regressions.append({"suite": suite, "step": name, "reason": ", ".join(reasons)})
+    return regressions
+
+
+def print_trends(history: List[Dict], current: Dict, regressions: List[Dict]) -> None:
+    runs = history[-(TREND_RUNS - 1):] + [current]
+    flagged = {f"{item['suite']} / {item['step']}" for item in regressions}
+    width = max([30] + [len(key) + 2 for key in current["steps"]])
+    print(f"\n{Fore.CYAN}⏱️ Step latency (ms), last {len(runs)} runs, oldest first:")
+    print(f"{Fore.WHITE}   {'Step':<{width}}" + "".join(f"{run['timestamp'][5:19].replace('T', ' '):>16}" for run in runs))
+    for key, step in current["steps"].items():
+        cells = []
+        for run in runs:
+            past = run["steps"].get(key)
+            cells.append(f"{past['seconds'] * 1000:>16.0f}" if past else f"{'-':>16}")
+        color = Fore.RED if key in flagged else Fore.WHITE if step["passed"] else Fore.YELLOW
+        print(f"{color}   {key:<{width}}" + "".join(cells))
+    if regressions:
+        print(f"\n{Fore.RED}⚠️ Regressed against the previous run ({len(regressions)}):")
+        for item in regressions:
+            print(f"{Fore.RED}   • {item['suite']} / {item['step']}: {item['reason']}")
+    elif len(runs) > 1:
+        print(f"\n{Fore.GREEN}✅ No step regressed against the previous run")
+
+
+# Command line
+
+def report_options_from_argv(argv: List[str] = None) -> Dict[str, Optional[str]]:
+    """Take `--json PATH`, `--junit PATH` and `--history PATH` (or --flag=PATH) out of argv
+
+    Like profiling.enable_from_argv, so the suites' positional port and host
+    arguments keep working.
+    """
+    argv = sys.argv if argv is None else argv
+    options = {"json": None, "junit": None, "history": None}
+    index = 1
+    while index < len(argv):
+        flag, equals, value = argv[index].partition("=")
+        name = flag[2:] if flag.startswith("--") else None
+        if name in options:
+            if not equals:
+                value = argv[index + 1] if index + 1 < len(argv) else None
+                del argv[index + 1:index + 2]
+            del argv[index]
+            options[name] = value
+        else:
+            index += 1
+    return options
+
+
+def write_reports(options: Dict[str, Optional[str]], suites: List[Dict] = None) -> List[Dict]:
+    """Write whatever `options` asks for about the recorded suites; returns the regressions found"""
+    suites = recorded_suites if suites is None else suites
+    regressions: List[Dict] = []
+    if options.get("history"):
+        history = read_history(options["history"])
+        current = history_entry(suites)
+        if history:
+            regressions = find_regressions(history[-1], current)
+        print_trends(history, current, regressions)
+        with open(options["history"], "a") as f:
+            f.write(json.dumps(current) + "\n")
+    if options.get("json"):
+        write_json(options["json"], suites, regressions)
+        print(f"{Fore.BLUE}📄 Results written to {options['json']}")
+    if options.get("junit"):
+        write_junit(options["junit"], suites, regressions)
+        print(f"{Fore.BLUE}📄 JUnit XML written to {options['junit']}")
+    return regressions
@@ -3,9 +3,12 @@ Complete CRUD Test Suite
 Runs all CRUD tests for Paket, User, and Favorites
 """
 
+import os
 import sys
 import time
 from api_client import SimpleCRUDAPIClient
+from profiling import enable_from_argv
+from suite_report import recorded_suites, report_options_from_argv, write_reports
 from colorama import Fore, Style
 
 # Import test modules
@@ -25,6 +28,13 @@ def get_server_info():
         print(f"{Fore.CYAN}{'='*50}")
         return base_url
     
+    # Then the environment, and the default server when nobody can answer a prompt
+    if os.environ.get("API_URL") or not sys.stdin.isatty():
+        base_url = os.environ.get("API_URL", "http://localhost:3001")
+        print(f"{Fore.GREEN}✅ Using {'API_URL' if os.environ.get('API_URL') else 'default server'}: {base_url}")
+        print(f"{Fore.CYAN}{'='*50}")
+        return base_url
+    
     # Interactive input if no command line args
     print(f"{Fore.CYAN}🔍 Server Configuration")
     print(f"{Fore.CYAN}{'='*50}")
@@ -65,6 +75,9 @@ def run_all_tests():
     # Get server info from user
     base_url = get_server_info()
     
+    # The suites below create their own clients, which read API_URL instead of prompting again
+    os.environ["API_URL"] = base_url
+    
     # Test connection first
     if not quick_health_check(base_url):
         print(f"\n{Fore.RED}❌ Cannot proceed with tests. API is not available.")
@@ -120,13 +133,14 @@ def run_all_tests():
     
     # Individual test results
     print(f"\n{Fore.CYAN}📋 Individual Test Results:")
+    suite_seconds = {suite['name']: suite['seconds'] for suite in recorded_suites}
     for test_name, results in test_results.items():
         passed = results['passed']
         total = results['total']
         success_rate = round((passed / total) * 100, 1) if total > 0 else 0
         status_color = Fore.GREEN if passed == total else Fore.YELLOW if passed > total/2 else Fore.RED
         
-        print(f"   {status_color}• {test_name}: {passed}/{total} ({success_rate}%)")
+        print(f"   {status_color}• {test_name}: {passed}/{total} ({success_rate}%) in {suite_seconds.get(test_name, 0):.2f}s")
     
     # Overall summary
     overall_success_rate = round((total_passed / total_tests) * 100, 1) if total_tests > 0 else 0
@@ -186,5 +200,10 @@ def quick_health_check(base_url):
         return False
 
 if __name__ == "__main__":
+    enable_from_argv()
+    # --json, --junit and --history come out of argv before the port and host are read
+    report_options = report_options_from_argv()
     # Run all tests (includes server configuration and health check)
     run_all_tests()
+    if recorded_suites:
+        write_reports(report_options)
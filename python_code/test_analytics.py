@@ -0,0 +1,181 @@
+"""
+Analytics Test
+PaketFrame group-by, histograms, top-N, masks and saved columns, checked against hand-computed results
+"""
+
+import datetime
+
+import numpy as np
+import pytest
+
+from analytics import MISSING_MONTH, PaketFrame, month_code
+
+ROWS = [
+    {"id": 1, "kl_pd_instansi": "A", "jenis_pengadaan": "Barang", "metode_pengadaan": "Tender",
+     "tanggal_pembuatan": "2024-01-15", "nilai_pagu_paket": 100, "nilai_hps_paket": 90},
+    {"id": 2, "kl_pd_instansi": "A", "jenis_pengadaan": "Jasa", "metode_pengadaan": "Tender",
+     "tanggal_pembuatan": "2024-01-20T08:00:00", "nilai_pagu_paket": 200, "nilai_hps_paket": 150},
+    {"id": 3, "kl_pd_instansi": "B", "jenis_pengadaan": "Barang", "metode_pengadaan": "Langsung",
+     "tanggal_pembuatan": "2024-03-05", "nilai_pagu_paket": 50, "nilai_hps_paket": 50},
+    # Undated and unpriced: counted, but left out of histograms and mean_hps_ratio
+    {"id": 4, "kl_pd_instansi": "B", "jenis_pengadaan": "Barang", "metode_pengadaan": "Tender",
+     "tanggal_pembuatan": None, "nilai_pagu_paket": 0, "nilai_hps_paket": 10},
+    # Month 13 is malformed, not January of the next year
+    {"id": 5, "kl_pd_instansi": "A", "jenis_pengadaan": "Barang", "metode_pengadaan": "Langsung",
+     "tanggal_pembuatan": "2024-13-01", "nilai_pagu_paket": 300, "nilai_hps_paket": 240},
+    # DECIMAL columns arrive from mysql2 as strings
+    {"id": 6, "kl_pd_instansi": "C", "jenis_pengadaan": "Jasa", "metode_pengadaan": "Langsung",
+     "tanggal_pembuatan": "2023-12-31", "nilai_pagu_paket": "1000.50", "nilai_hps_paket": "900"},
+]
+
+
+@pytest.fixture
+def frame():
+    return PaketFrame.from_records(ROWS)
+
+
+def as_rows(groups, dimensions):
+    """Group-by result as {labels: (count, pagu_sum, hps_sum, hps_ratio, mean_hps_ratio)}"""
+    keys = zip(*(groups[dimension] for dimension in dimensions))
+    values = zip(groups["count"], groups["pagu_sum"], groups["hps_sum"], groups["hps_ratio"], groups["mean_hps_ratio"])
+    return {key: tuple(float(value) for value in metrics) for key, metrics in zip(keys, values)}
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2024-01-15", 2024 * 12),
+    ("2024-12-31T23:59:59", 2024 * 12 + 11),
+    (datetime.date(2024, 5, 1), 2024 * 12 + 4),
+    ("2024-13-01", MISSING_MONTH),
+    ("2024-00-10", MISSING_MONTH),
+    ("2024", MISSING_MONTH),
+    ("not a date", MISSING_MONTH),
+    ("", MISSING_MONTH),
+    (None, MISSING_MONTH),
+])
+def test_month_code(value, expected):
+    assert month_code(value) == expected
+
+
+def test_group_by_two_dimensions(frame):
+    groups = frame.group_by(["instansi", "jenis"])
+
+    assert as_rows(groups, ["instansi", "jenis"]) == pytest.approx({
+        ("A", "Barang"): (2, 400, 330, 330 / 400, (0.9 + 0.8) / 2),
+        ("A", "Jasa"): (1, 200, 150, 0.75, 0.75),
+        ("B", "Barang"): (2, 50, 60, 1.2, 1.0),
+        ("C", "Jasa"): (1, 1000.5, 900, 900 / 1000.5, 900 / 1000.5),
+    })
+
+
+def test_group_by_category_and_bucket(frame):
+    groups = frame.group_by(["jenis", "quarter"])
+
+    assert {key: metrics[0] for key, metrics in as_rows(groups, ["jenis", "quarter"]).items()} == {
+        ("Barang", ""): 2,
+        ("Barang", "2024-Q1"): 2,
+        ("Jasa", "2023-Q4"): 1,
+        ("Jasa", "2024-Q1"): 1,
+    }
+
+
+def test_group_by_where(frame):
+    groups = frame.group_by("metode", where=frame.mask(instansi="A"))
+
+    assert as_rows(groups, ["metode"]) == pytest.approx({
+        ("Tender",): (2, 300, 240, 0.8, (0.9 + 0.75) / 2),
+        ("Langsung",): (1, 300, 240, 0.8, 0.8),
+    })
+
+
+def test_group_by_keep_empty(frame):
+    groups = frame.group_by(["instansi", "jenis"], keep_empty=True)
+
+    assert len(groups["count"]) == 3 * 2
+    assert as_rows(groups, ["instansi", "jenis"])[("B", "Jasa")][:3] == (0, 0, 0)
+    assert np.isnan(as_rows(groups, ["instansi", "jenis"])[("C", "Barang")][3:]).all()
+
+
+def test_month_histogram_keeps_gaps(frame):
+    histogram = frame.histogram("month")
+
+    assert list(histogram["month"]) == ["2023-12", "2024-01", "2024-02", "2024-03"]
+    assert list(histogram["count"]) == [1, 2, 0, 1]
+    assert list(histogram["pagu_sum"]) == pytest.approx([1000.5, 300, 0, 50])
+    assert np.isnan(histogram["hps_ratio"][2])
+
+
+def test_quarter_and_year_histograms(frame):
+    quarters = frame.histogram("quarter")
+    years = frame.histogram("year", where=frame.mask(jenis="Jasa"))
+
+    assert (list(quarters["quarter"]), list(quarters["count"])) == (["2023-Q4", "2024-Q1"], [1, 3])
+    assert (list(years["year"]), list(years["count"])) == (["2023", "2024"], [1, 1])
+
+
+def test_filtered_histogram_keeps_the_frames_buckets(frame):
+    histogram = frame.histogram("month", where=frame.mask(instansi="B"))
+
+    # Same axis as the unfiltered histogram; the undated row is left out
+    assert list(histogram["month"]) == ["2023-12", "2024-01", "2024-02", "2024-03"]
+    assert list(histogram["count"]) == [0, 0, 0, 1]
+
+
+def test_top(frame):
+    by_pagu = frame.top("instansi", n=2)
+    by_count = frame.top("instansi", n=1, by="count")
+    all_groups = frame.top("instansi", n=10, by="hps_ratio")
+
+    assert list(by_pagu["instansi"]) == ["C", "A"]
+    assert list(by_pagu["pagu_sum"]) == pytest.approx([1000.5, 600])
+    assert (list(by_count["instansi"]), list(by_count["count"])) == (["A"], [3])
+    assert list(all_groups["instansi"]) == ["B", "C", "A"]
+
+
+def test_top_paket(frame):
+    assert list(frame.top_paket(2)) == [6, 5]
+    assert list(frame.top_paket(1, by="hps", where=frame.mask(jenis="Barang"))) == [5]
+    assert list(frame.top_paket(3, where=frame.mask(jenis="Nothing"))) == []
+
+
+@pytest.mark.parametrize("bounds, ids", [
+    ({"month_from": "2024-01", "month_to": "2024-02"}, [1, 2]),
+    ({"month_from": "2024-02"}, [3]),
+    ({"month_to": "2024-01"}, [1, 2, 6]),
+    ({"month_from": "2023-12", "month_to": "2023-12"}, [6]),
+    ({"month_from": "2024-03", "month_to": "2024-01"}, []),
+    ({"month_from": "2024-01", "jenis": "Jasa"}, [2]),
+    ({"jenis": "Barang", "instansi": "B"}, [3, 4]),
+    ({"jenis": "Nothing"}, []),
+])
+def test_mask(frame, bounds, ids):
+    selected = frame.mask(**bounds)
+
+    assert list(frame.columns["id"][selected]) == ids
+
+
+@pytest.mark.parametrize("bounds, message", [
+    ({"month_from": "2024-13"}, "month_from must be YYYY-MM"),
+    ({"month_to": "January"}, "month_to must be YYYY-MM"),
+    ({"pagu": "100"}, "cannot filter on 'pagu'"),
+])
+def test_mask_errors(frame, bounds, message):
+    with pytest.raises(ValueError, match=message):
+        frame.mask(**bounds)
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_save_and_load(frame, tmp_path, mmap):
+    frame.save(str(tmp_path))
+
+    loaded = PaketFrame.load(str(tmp_path), mmap=mmap)
+
+    assert len(loaded) == len(frame)
+    assert loaded.labels == frame.labels
+    assert isinstance(loaded.columns["pagu"], np.memmap) == mmap
+    for name, column in frame.columns.items():
+        assert np.array_equal(loaded.columns[name], column)
+        assert loaded.columns[name].dtype == column.dtype
+    dimensions = ["instansi", "month"]
+    assert as_rows(loaded.group_by(dimensions, where=loaded.mask(month_from="2024-01")), dimensions) == \
+        pytest.approx(as_rows(frame.group_by(dimensions, where=frame.mask(month_from="2024-01")), dimensions))
+    assert list(loaded.top("metode", n=1)["metode"]) == ["Langsung"]
@@ -0,0 +1,140 @@
+"""
+API Client Test
+Single-flight GET coalescing in SimpleCRUDAPIClient and its bypass for load runs, against the stand-in server
+"""
+
+import threading
+import time
+
+import pytest
+import requests
+
+from api_client import SimpleCRUDAPIClient
+from load_runner import Endpoint, OpenLoopRunner
+from stand_in_server import StandInServer
+
+CALLERS = 8
+# Long enough that every caller joins the first request while it is on the wire
+DELAY = {"dist": "fixed", "ms": 300}
+
+
+@pytest.fixture
+def server():
+    with StandInServer(seed_paket=5) as server:
+        yield server
+
+
+def concurrent_gets(client, callers=CALLERS):
+    """Issue the same GET from `callers` threads at once; returns each caller's response or exception"""
+    barrier = threading.Barrier(callers)
+    outcomes = [None] * callers
+
+    def call(index):
+        barrier.wait()
+        try:
+            outcomes[index] = client._make_request("GET", "/api/paket", params={"page": 1, "limit": 5},
+                                                   use_auth=False)
+        except BaseException as e:
+            outcomes[index] = e
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return outcomes
+
+
+def server_requests(server):
+    return server.faults.to_dict()["rules"][0]["counts"]["requests"]
+
+
+def test_identical_gets_share_one_request(server):
+    server.faults.set_rules([{"route": "/api/paket", "latency": DELAY}])
+    client = SimpleCRUDAPIClient(server.url, verbose=False)
+
+    outcomes = concurrent_gets(client)
+
+    assert server_requests(server) == 1
+    assert all(outcome is outcomes[0] for outcome in outcomes)
+    assert outcomes[0].status_code == 200
+    metrics = client.get_metrics()
+    assert (metrics["requests"], metrics["coalesced"]) == (1, CALLERS - 1)
+
+
+def test_followers_receive_the_leaders_transport_error(server):
+    server.faults.set_rules([{"route": "/api/paket", "latency": DELAY, "reset_rate": 1.0}])
+    client = SimpleCRUDAPIClient(server.url, verbose=False)
+
+    outcomes = concurrent_gets(client)
+
+    assert server_requests(server) == 1
+    assert all(isinstance(outcome, requests.exceptions.ConnectionError) for outcome in outcomes)
+    assert all(outcome is outcomes[0] for outcome in outcomes)
+
+
+def test_followers_receive_any_leader_failure(server, monkeypatch):
+    server.faults.set_rules([{"route": "/api/paket", "latency": DELAY}])
+    client = SimpleCRUDAPIClient(server.url, verbose=False)
+    send = client._send_conditional
+
+    def failing_send(*args, **kwargs):
+        send(*args, **kwargs)
+        raise KeyError("not a transport error")
+
+    monkeypatch.setattr(client, "_send_conditional", failing_send)
+    outcomes = concurrent_gets(client)
+
+    assert server_requests(server) == 1
+    assert all(isinstance(outcome, KeyError) for outcome in outcomes)
+    # The failed call is not left behind: the next GET goes to the server again
+    monkeypatch.setattr(client, "_send_conditional", send)
+    assert client.get_all_paket(limit=5)["success"]
+    assert server_requests(server) == 2
+
+
+def test_reuse_responses_off_sends_every_get(server):
+    server.faults.set_rules([{"route": "/api/paket", "latency": DELAY}])
+    client = SimpleCRUDAPIClient(server.url, verbose=False, reuse_responses=False)
+
+    outcomes = concurrent_gets(client)
+
+    assert server_requests(server) == CALLERS
+    assert all(outcome.status_code == 200 for outcome in outcomes)
+    assert client.get_metrics()["coalesced"] == 0
+
+
+def test_load_runner_sends_every_scheduled_request(server):
+    server.faults.set_rules([{"route": "/api/paket", "latency": DELAY}])
+    # One client shared by every worker, so a coalescing client would merge the identical GETs
+    shared = SimpleCRUDAPIClient(server.url, verbose=False)
+    endpoint = Endpoint("GET /api/paket", "GET", "/api/paket", {"page": 1, "limit": 5})
+    runner = OpenLoopRunner(server.url, [0.0] * CALLERS, endpoints=[endpoint], workers=CALLERS,
+                            client_factory=lambda url: shared)
+
+    report = runner.run()
+
+    assert report.total().sent == CALLERS
+    assert server_requests(server) == CALLERS
+
+
+def test_get_after_a_write_does_not_join_an_older_get(server):
+    server.faults.set_rules([{"route": "/api/paket/*", "methods": ["GET"], "latency": DELAY}])
+    client = SimpleCRUDAPIClient(server.url, verbose=False)
+    paket_id = client.get_all_paket(limit=1)["data"][0]["id"]
+    before = {}
+    reader = threading.Thread(target=lambda: before.update(client.get_paket_by_id(paket_id)))
+    reader.start()
+    while not client._inflight:
+        time.sleep(0.005)
+
+    # The reader's GET is still on the wire; a GET after this write must not share its response
+    assert client.update_paket(paket_id, nama_paket="Renamed")["success"]
+    after = client.get_paket_by_id(paket_id)
+    reader.join()
+
+    assert after["data"]["nama_paket"] == "Renamed"
+    assert before["success"]
+    assert server_requests(server) == 2
+    assert client.get_metrics()["coalesced"] == 0
+    assert not client._inflight
@@ -6,6 +6,8 @@ Tests if the Python code is compatible with the updated database structure
 import sys
 import time
 from api_client import SimpleCRUDAPIClient
+from profiling import enable_from_argv
+from suite_report import SuiteRecorder, report_options_from_argv, write_reports
 from colorama import Fore, Style
 
 def test_python_compatibility():
@@ -15,26 +17,25 @@ def test_python_compatibility():
     print(f"{Fore.CYAN}{'='*80}")
     
     client = SimpleCRUDAPIClient()
-    passed_tests = 0
-    total_tests = 0
+    results = SuiteRecorder("Python Compatibility", client)
     
     try:
         # Test 1: Health Check
-        total_tests += 1
+        results.start("Health Check")
         print(f"\n{Fore.YELLOW}🏥 Test 1: Health Check")
         health_result = client.health_check()
         if health_result.get("success"):
-            passed_tests += 1
+            results.passed()
             print(f"{Fore.GREEN}✅ Health Check: PASSED")
         else:
             print(f"{Fore.RED}❌ Health Check: FAILED")
         
         # Test 2: Get All Paket (Check if data exists)
-        total_tests += 1
+        results.start("Get All Paket")
         print(f"\n{Fore.YELLOW}📋 Test 2: Get All Paket")
         all_paket = client.get_all_paket()
         if all_paket.get("success"):
-            passed_tests += 1
+            results.passed()
             print(f"{Fore.GREEN}✅ Get All Paket: PASSED")
             paket_data = all_paket.get("data", [])
             print(f"   📊 Found {len(paket_data)} paket records")
@@ -48,7 +49,7 @@ def test_python_compatibility():
             print(f"{Fore.RED}❌ Get All Paket: FAILED")
         
         # Test 3: Create Paket with New Structure
-        total_tests += 1
+        results.start("Create Paket with New Structure")
         print(f"\n{Fore.YELLOW}➕ Test 3: Create Paket with New Structure")
         new_paket = client.create_paket(
             nama_paket="Python Compatibility Test Paket",
@@ -72,7 +73,7 @@ def test_python_compatibility():
         created_id = None
         created_md5_hash = None
         if new_paket.get("success") and new_paket.get("data", {}).get("id"):
-            passed_tests += 1
+            results.passed()
             created_id = new_paket["data"]["id"]
             created_md5_hash = new_paket["data"].get("md5_hash")
             print(f"{Fore.GREEN}✅ Create Paket with New Structure: PASSED")
@@ -83,7 +84,7 @@ def test_python_compatibility():
             print(f"   Response: {new_paket}")
         
         # Test 4: User Registration and Authentication
-        total_tests += 1
+        results.start("User Registration")
         print(f"\n{Fore.YELLOW}👤 Test 4: User Registration")
         test_email = f"compat_test_{int(time.time())}@example.com"
         register_result = client.register_user(
@@ -94,7 +95,7 @@ def test_python_compatibility():
         )
         
         if register_result.get("success"):
-            passed_tests += 1
+            results.passed()
             print(f"{Fore.GREEN}✅ User Registration: PASSED")
             print(f"   📧 Test user email: {test_email}")
         else:
@@ -103,19 +104,19 @@ def test_python_compatibility():
             print(f"   🔄 Trying to login with existing user...")
             login_result = client.login_user(test_email, "compatpassword123")
             if login_result.get("success"):
-                passed_tests += 1
+                results.passed()
                 print(f"{Fore.GREEN}✅ User Login (Existing): PASSED")
         
         # Test 5: Favorites with MD5 Hash (if we have a created paket)
         if created_md5_hash:
-            total_tests += 1
+            results.start("Favorites with MD5 Hash")
             print(f"\n{Fore.YELLOW}⭐ Test 5: Favorites with MD5 Hash")
             add_favorite_result = client.add_to_favorites(
                 md5_hash=created_md5_hash, 
                 notes="Compatibility test favorite"
             )
             if add_favorite_result.get("success"):
-                passed_tests += 1
+                results.passed()
                 print(f"{Fore.GREEN}✅ Add to Favorites with MD5 Hash: PASSED")
                 
                 # Test check favorite status
@@ -136,31 +137,33 @@ def test_python_compatibility():
         
         # Test 6: Clean up created paket
         if created_id:
-            total_tests += 1
+            results.start("Clean up Created Paket")
             print(f"\n{Fore.YELLOW}🗑️ Test 6: Clean up Created Paket")
             delete_result = client.delete_paket(created_id)
             if delete_result.get("success"):
-                passed_tests += 1
+                results.passed()
                 print(f"{Fore.GREEN}✅ Clean up Created Paket: PASSED")
             else:
                 print(f"{Fore.RED}❌ Clean up Created Paket: FAILED")
         
         # Test 7: Clean up test user
-        total_tests += 1
+        results.start("Clean up Test User")
         print(f"\n{Fore.YELLOW}🧹 Test 7: Clean up Test User")
         delete_user_result = client.delete_user_account()
         if delete_user_result.get("success"):
-            passed_tests += 1
+            results.passed()
             print(f"{Fore.GREEN}✅ Clean up Test User: PASSED")
         else:
             print(f"{Fore.RED}❌ Clean up Test User: FAILED")
         
     except Exception as e:
+        results.fail(e)
         print(f"{Fore.RED}❌ Test execution failed: {e}")
         import traceback
         traceback.print_exc()
     
     # Test Summary
+    passed_tests, total_tests = results.finish()
     print(f"\n{Fore.CYAN}{'='*80}")
     print(f"{Fore.CYAN}📊 PYTHON COMPATIBILITY TEST SUMMARY")
     print(f"{Fore.CYAN}{'='*80}")
@@ -189,4 +192,7 @@ def test_python_compatibility():
     return passed_tests, total_tests
 
 if __name__ == "__main__":
+    enable_from_argv()
+    report_options = report_options_from_argv()
     test_python_compatibility()
+    write_reports(report_options)
@@ -0,0 +1,113 @@
+"""
+Load Cluster Test
+Runs a coordinator and several agents on localhost against the stand-in server
+"""
+
+import socket
+import threading
+import time
+
+import pytest
+
+from load_cluster import LoadAgent, LoadCoordinator, read_message, send_message
+from load_workers import default_spec
+from stand_in_server import StandInServer
+
+AGENTS = 3
+RATE = 60
+DURATION = 2
+
+
+@pytest.fixture(scope="module")
+def server():
+    with StandInServer() as server:
+        yield server
+
+
+def run_cluster(spec, agents=AGENTS, hung_agents=0, result_grace=10.0):
+    """Run one coordinator, `agents` in-process agents and `hung_agents` that never report
+
+    Returns (merged report, agent reports, coordinator).
+    """
+    coordinator = LoadCoordinator(spec, agents + hung_agents, host="127.0.0.1", port=0, start_delay=0.5,
+                                  join_timeout=10, result_grace=result_grace)
+    agent_reports = [None] * agents
+    release = threading.Event()
+
+    def run_agent(index):
+        agent = LoadAgent("127.0.0.1", coordinator.port, processes=1, name=f"agent-{index}")
+        agent_reports[index] = agent.run()
+
+    def hang():
+        # Takes its config like a real agent, then goes silent without closing the connection
+        with socket.create_connection(("127.0.0.1", coordinator.port)) as sock, sock.makefile("rwb") as stream:
+            send_message(stream, {"type": "hello", "agent": "hung", "processes": 1, "clock": time.time()})
+            read_message(stream)
+            release.wait(60)
+
+    threads = [threading.Thread(target=run_agent, args=(i,), daemon=True) for i in range(agents)]
+    threads += [threading.Thread(target=hang, daemon=True) for _ in range(hung_agents)]
+    for thread in threads:
+        thread.start()
+    try:
+        merged = coordinator.run()
+    finally:
+        release.set()
+    for thread in threads:
+        thread.join()
+    return merged, agent_reports, coordinator
+
+
+@pytest.fixture(scope="module")
+def open_run(server):
+    spec = default_spec(server.url)
+    spec.update({"schedule": {"mode": "constant", "rate": RATE, "duration": DURATION}, "workers": 8})
+    merged, agent_reports, _ = run_cluster(spec)
+    return merged, agent_reports
+
+
+def test_open_loop_run_sends_the_whole_schedule(open_run):
+    merged, _ = open_run
+    total = merged.total()
+
+    assert (total.sent, total.errors, total.dropped) == (RATE * DURATION, 0, 0)
+
+
+def test_schedule_is_shared_between_agents(open_run):
+    _, agent_reports = open_run
+    shares = [report.total().sent for report in agent_reports]
+
+    assert all(abs(share - RATE * DURATION / AGENTS) <= 1 for share in shares), shares
+
+
+def test_agents_start_together(open_run):
+    merged, _ = open_run
+
+    # Staggered starts would stretch the merged run well past the schedule
+    assert merged.duration < DURATION + 1
+
+
+def test_closed_loop_run_on_every_agent(server):
+    spec = default_spec(server.url)
+    spec.update({"mode": "closed", "duration": 1, "concurrency": 2})
+
+    merged, agent_reports, _ = run_cluster(spec, agents=2)
+
+    assert all(report.total().sent > 0 for report in agent_reports)
+    assert merged.total().errors == 0
+
+
+def test_hung_agent_times_out_and_the_rest_are_merged(server):
+    spec = default_spec(server.url)
+    spec.update({"schedule": {"mode": "constant", "rate": 20, "duration": 1}, "workers": 4})
+    started = time.perf_counter()
+
+    merged, agent_reports, coordinator = run_cluster(spec, agents=2, hung_agents=1, result_grace=1.0)
+
+    # start delay 0.5 + 1s schedule + 1s grace
+    assert time.perf_counter() - started < 5
+    # The hung agent's third of the schedule is missing; the other two thirds are all there
+    assert merged.total().sent == sum(report.total().sent for report in agent_reports)
+    assert abs(merged.total().sent - 20 * 2 / 3) <= 1
+    hung = [agent for agent in coordinator.agents if agent.name == "hung"]
+    assert len(hung) == 1 and "no result within" in hung[0].error
@@ -6,6 +6,8 @@ Tests all CRUD functionality for paket_pengadaan
 import sys
 import time
 from api_client import SimpleCRUDAPIClient
+from profiling import enable_from_argv
+from suite_report import SuiteRecorder, report_options_from_argv, write_reports
 from colorama import Fore, Style
 
 def test_paket_crud():
@@ -15,26 +17,25 @@ def test_paket_crud():
     print(f"{Fore.CYAN}{'='*60}")
     
     client = SimpleCRUDAPIClient()
-    passed_tests = 0
-    total_tests = 0
+    results = SuiteRecorder("Paket CRUD", client)
     
     try:
         # Test 1: Health Check
-        total_tests += 1
+        results.start("Health Check")
         print(f"\n{Fore.YELLOW}🏥 Test 1: Health Check")
         health_result = client.health_check()
         if health_result.get("success"):
-            passed_tests += 1
+            results.passed()
             print(f"{Fore.GREEN}✅ Health Check: PASSED")
         else:
             print(f"{Fore.RED}❌ Health Check: FAILED")
         
         # Test 2: Get All Paket (Initial)
-        total_tests += 1
+        results.start("Get All Paket (Initial)")
         print(f"\n{Fore.YELLOW}📋 Test 2: Get All Paket (Initial)")
         all_paket = client.get_all_paket()
         if all_paket.get("success"):
-            passed_tests += 1
+            results.passed()
             print(f"{Fore.GREEN}✅ Get All Paket: PASSED")
             initial_count = len(all_paket.get("data", []))
             print(f"   📊 Initial paket count: {initial_count}")
@@ -42,18 +43,18 @@ def test_paket_crud():
             print(f"{Fore.RED}❌ Get All Paket: FAILED")
         
         # Test 3: Search Paket
-        total_tests += 1
+        results.start("Search Paket")
         print(f"\n{Fore.YELLOW}🔍 Test 3: Search Paket")
         search_result = client.get_all_paket(search="Laptop")
         if search_result.get("success"):
-            passed_tests += 1
+            results.passed()
             print(f"{Fore.GREEN}✅ Search Paket: PASSED")
             print(f"   📊 Search results: {len(search_result.get('data', []))} items")
         else:
             print(f"{Fore.RED}❌ Search Paket: FAILED")
         
         # Test 4: Create New Paket
-        total_tests += 1
+        results.start("Create New Paket")
         print(f"\n{Fore.YELLOW}➕ Test 4: Create New Paket")
         new_paket = client.create_paket(
             nama_paket="Python Test Paket",
@@ -75,7 +76,7 @@ def test_paket_crud():
         )
         created_id = None
         if new_paket.get("success") and new_paket.get("data", {}).get("id"):
-            passed_tests += 1
+            results.passed()
             created_id = new_paket["data"]["id"]
             print(f"{Fore.GREEN}✅ Create Paket: PASSED")
             print(f"   🆔 Created paket ID: {created_id}")
@@ -84,18 +85,18 @@ def test_paket_crud():
         
         # Test 5: Get Paket by ID
         if created_id:
-            total_tests += 1
+            results.start("Get Paket by ID")
             print(f"\n{Fore.YELLOW}🔍 Test 5: Get Paket by ID")
             paket_by_id = client.get_paket_by_id(created_id)
             if paket_by_id.get("success"):
-                passed_tests += 1
+                results.passed()
                 print(f"{Fore.GREEN}✅ Get Paket by ID: PASSED")
             else:
                 print(f"{Fore.RED}❌ Get Paket by ID: FAILED")
         
         # Test 6: Update Paket
         if created_id:
-            total_tests += 1
+            results.start("Update Paket")
             print(f"\n{Fore.YELLOW}✏️ Test 6: Update Paket")
             update_result = client.update_paket(
                 created_id,
@@ -105,17 +106,17 @@ def test_paket_crud():
                 lokasi_pekerjaan="Bandung"
             )
             if update_result.get("success"):
-                passed_tests += 1
+                results.passed()
                 print(f"{Fore.GREEN}✅ Update Paket: PASSED")
             else:
                 print(f"{Fore.RED}❌ Update Paket: FAILED")
         
         # Test 7: Get All Paket (After Create)
-        total_tests += 1
+        results.start("Get All Paket (After Create)")
         print(f"\n{Fore.YELLOW}📋 Test 7: Get All Paket (After Create)")
         all_paket_after = client.get_all_paket()
         if all_paket_after.get("success"):
-            passed_tests += 1
+            results.passed()
             print(f"{Fore.GREEN}✅ Get All Paket (After Create): PASSED")
             final_count = len(all_paket_after.get("data", []))
             print(f"   📊 Final paket count: {final_count}")
@@ -125,41 +126,69 @@ def test_paket_crud():
             print(f"{Fore.RED}❌ Get All Paket (After Create): FAILED")
         
         # Test 8: Get Non-Existent Paket (Should Fail)
-        total_tests += 1
+        results.start("Get Non-Existent Paket (Should Fail)")
         print(f"\n{Fore.YELLOW}❌ Test 8: Get Non-Existent Paket (Should Fail)")
         non_existent = client.get_paket_by_id(99999)
         if not non_existent.get("success"):
-            passed_tests += 1
+            results.passed()
             print(f"{Fore.GREEN}✅ Get Non-Existent Paket (Should Fail): PASSED")
         else:
             print(f"{Fore.RED}❌ Get Non-Existent Paket (Should Fail): FAILED")
         
         # Test 9: Delete Paket
         if created_id:
-            total_tests += 1
+            results.start("Delete Paket")
             print(f"\n{Fore.YELLOW}🗑️ Test 9: Delete Paket")
             delete_result = client.delete_paket(created_id)
             if delete_result.get("success"):
-                passed_tests += 1
+                results.passed()
                 print(f"{Fore.GREEN}✅ Delete Paket: PASSED")
             else:
                 print(f"{Fore.RED}❌ Delete Paket: FAILED")
         
         # Test 10: Verify Deletion
         if created_id:
-            total_tests += 1
+            results.start("Verify Deletion")
             print(f"\n{Fore.YELLOW}🔍 Test 10: Verify Deletion")
             verify_deletion = client.get_paket_by_id(created_id)
             if not verify_deletion.get("success"):
-                passed_tests += 1
+                results.passed()
                 print(f"{Fore.GREEN}✅ Verify Deletion: PASSED")
             else:
                 print(f"{Fore.RED}❌ Verify Deletion: FAILED")
         
+        # Test 11: Batch Create, Update and Delete
+        results.start("Batch Create, Update and Delete")
+        print(f"\n{Fore.YELLOW}📦 Test 11: Batch Create, Update and Delete")
+        batch_stamp = int(time.time())
+        batch_records = [
+            {
+                "nama_paket": f"Python Batch Paket {i}",
+                "kode_paket": f"PBP{i:03d}",
+                "md5_hash": f"python_batch_{batch_stamp}_{i}",
+                "nilai_pagu_paket": 1000000 * (i + 1),
+                "tanggal_pembuatan": "2024-01-15"
+            }
+            for i in range(5)
+        ]
+        batch_created = client.create_paket_batch(batch_records, chunk_size=2)
+        batch_ids = [r["id"] for r in batch_created.get("data", {}).get("results", []) if r.get("status") == "created"]
+        batch_updated = client.update_paket_batch([{"id": i, "lokasi_pekerjaan": "Surabaya"} for i in batch_ids])
+        batch_deleted = client.delete_paket_batch(batch_ids)
+        if (len(batch_ids) == len(batch_records)
+                and batch_updated.get("data", {}).get("summary", {}).get("updated") == len(batch_ids)
+                and batch_deleted.get("data", {}).get("summary", {}).get("deleted") == len(batch_ids)):
+            results.passed()
+            print(f"{Fore.GREEN}✅ Batch Create, Update and Delete: PASSED")
+        else:
+            print(f"{Fore.RED}❌ Batch Create, Update and Delete: FAILED")
+        
     except Exception as e:
+        results.fail(e)
         print(f"{Fore.RED}❌ Test execution failed: {e}")
     
     # Test Summary
+    passed_tests, total_tests = results.finish()
     print(f"\n{Fore.CYAN}{'='*60}")
     print(f"{Fore.CYAN}📊 PAKET CRUD TEST SUMMARY")
     print(f"{Fore.CYAN}{'='*60}")
@@ -175,4 +204,7 @@ def test_paket_crud():
     return passed_tests, total_tests
 
 if __name__ == "__main__":
+    enable_from_argv()
+    report_options = report_options_from_argv()
     test_paket_crud()
+    write_reports(report_options)
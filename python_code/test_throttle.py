@@ -0,0 +1,213 @@
+"""
+Throttle Test
+AIMD adaptive concurrency, the token bucket and throttle specs, on a fake clock
+"""
+
+import threading
+
+import pytest
+
+import throttle
+from throttle import AdaptiveConcurrency, TokenBucket, parse_throttle
+
+
+class FakeClock:
+    """Stands in for time.monotonic and time.sleep; time only moves when told to"""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(throttle.time, "monotonic", fake.monotonic)
+    monkeypatch.setattr(throttle.time, "sleep", fake.sleep)
+    return fake
+
+
+def respond(limiter: AdaptiveConcurrency, latency: float, ok: bool = True) -> None:
+    limiter.acquire()
+    limiter.release(latency, ok)
+
+
+def test_error_cuts_the_limit(clock):
+    limiter = AdaptiveConcurrency(initial=10)
+
+    respond(limiter, 0.01, ok=False)
+
+    assert limiter.limit == pytest.approx(7.0)
+    assert limiter.stats["backoffs"] == 1
+    assert limiter.stats["errors"] == 1
+
+
+def test_latency_inflation_cuts_the_limit(clock):
+    limiter = AdaptiveConcurrency(initial=10, tolerance=2.0)
+    respond(limiter, 0.010)
+    limit = limiter.limit
+
+    # smoothed: 0.010 -> 0.018 -> 0.0244, past 2x the 10 ms baseline on the second slow response
+    respond(limiter, 0.050)
+    assert limiter.stats["backoffs"] == 0
+    respond(limiter, 0.050)
+
+    assert limiter.stats["backoffs"] == 1
+    assert limiter.limit == pytest.approx((limit + 1 / limit) * 0.7)
+    assert limiter.baseline == pytest.approx(0.010)
+
+
+def test_backs_off_at_most_once_per_smoothed_rtt(clock):
+    limiter = AdaptiveConcurrency(initial=20)
+
+    for _ in range(5):
+        respond(limiter, 0.100, ok=False)
+    assert limiter.stats["backoffs"] == 1
+    assert limiter.limit == pytest.approx(14.0)
+
+    clock.advance(0.099)
+    respond(limiter, 0.100, ok=False)
+    assert limiter.stats["backoffs"] == 1
+
+    clock.advance(0.001)
+    respond(limiter, 0.100, ok=False)
+    assert limiter.stats["backoffs"] == 2
+    assert limiter.limit == pytest.approx(14.0 * 0.7)
+
+
+def test_backoff_stops_at_minimum(clock):
+    limiter = AdaptiveConcurrency(initial=4, minimum=2)
+
+    for _ in range(10):
+        respond(limiter, 0.010, ok=False)
+        clock.advance(1)
+
+    assert limiter.limit == 2.0
+
+
+def test_additive_increase_up_to_maximum(clock):
+    limiter = AdaptiveConcurrency(initial=4, maximum=8)
+
+    respond(limiter, 0.010)
+    assert limiter.limit == pytest.approx(4.25)
+
+    # About one slot per limit's worth of responses: 4 -> 8 takes roughly 4 + 5 + 6 + 7 of them
+    for _ in range(21):
+        respond(limiter, 0.010)
+    assert 7 < limiter.limit < 8
+
+    for _ in range(100):
+        respond(limiter, 0.010)
+    assert limiter.limit == 8.0
+    assert limiter.stats["peak_limit"] == 8.0
+
+
+def test_limit_bounds_requests_in_flight(clock):
+    limiter = AdaptiveConcurrency(initial=3)
+    for _ in range(3):
+        limiter.acquire()
+    fourth = threading.Thread(target=limiter.acquire, daemon=True)
+    fourth.start()
+
+    fourth.join(0.2)
+    assert fourth.is_alive()
+
+    limiter.release(0.010, True)
+    fourth.join(1)
+    assert not fourth.is_alive()
+    assert limiter.in_flight == 3
+
+
+def test_baseline_follows_faster_samples_at_once(clock):
+    limiter = AdaptiveConcurrency()
+    respond(limiter, 0.020)
+
+    respond(limiter, 0.005)
+
+    assert limiter.baseline == pytest.approx(0.005)
+
+
+def test_baseline_drifts_up_slowly(clock):
+    limiter = AdaptiveConcurrency(drift=0.01)
+    respond(limiter, 0.010)
+
+    # 10 s later a slower sample may raise the baseline by at most 1% per second
+    clock.advance(10)
+    respond(limiter, 0.050)
+    assert limiter.baseline == pytest.approx(0.011)
+
+    # Without elapsed time it does not move at all
+    respond(limiter, 0.050)
+    assert limiter.baseline == pytest.approx(0.011)
+
+
+def test_slower_server_is_relearned(clock):
+    limiter = AdaptiveConcurrency(initial=16, minimum=1, tolerance=2.0, drift=0.01)
+    respond(limiter, 0.010)
+
+    # The server settles at 50 ms for good; one response per second for five minutes
+    for _ in range(300):
+        clock.advance(1)
+        respond(limiter, 0.050)
+
+    assert limiter.baseline * limiter.tolerance > limiter.smoothed
+    backoffs = limiter.stats["backoffs"]
+    limit = limiter.limit
+    clock.advance(1)
+    respond(limiter, 0.050)
+    assert limiter.stats["backoffs"] == backoffs
+    assert limiter.limit > limit
+
+
+def test_token_bucket_waits_for_tokens(clock):
+    bucket = TokenBucket(rate=10, burst=2)
+    started = clock.now
+
+    for _ in range(2):
+        bucket.acquire()
+    assert clock.now == started
+
+    bucket.acquire()
+    assert clock.now - started == pytest.approx(0.1)
+    assert bucket.waited == pytest.approx(0.1)
+
+
+@pytest.mark.parametrize("spec, kind, fields", [
+    ("aimd", AdaptiveConcurrency, {"maximum": 256, "minimum": 1}),
+    ("aimd:max=64,initial=8,min=2,tolerance=3", AdaptiveConcurrency,
+     {"maximum": 64, "limit": 8.0, "minimum": 2, "tolerance": 3.0}),
+    ("bucket:200", TokenBucket, {"rate": 200.0, "burst": 20.0}),
+    ("bucket:200,burst=50", TokenBucket, {"rate": 200.0, "burst": 50.0}),
+])
+def test_parse_throttle(spec, kind, fields):
+    limiter = parse_throttle(spec)
+
+    assert isinstance(limiter, kind)
+    for name, value in fields.items():
+        assert getattr(limiter, name) == value
+
+
+@pytest.mark.parametrize("spec", ["", "none", None])
+def test_parse_no_throttle(spec):
+    assert parse_throttle(spec) is None
+
+
+@pytest.mark.parametrize("spec, message", [
+    ("bucket", "bucket needs a rate"),
+    ("bucket:burst=5", "bucket needs a rate"),
+    ("aimd:maximum=64", "unknown aimd options: maximum"),
+    ("tcp:10", "unknown throttle 'tcp'"),
+    ("bucket:fast", "could not convert"),
+    ("aimd:max=many", "could not convert"),
+])
+def test_parse_throttle_errors(spec, message):
+    with pytest.raises(ValueError, match=message):
+        parse_throttle(spec)
@@ -0,0 +1,208 @@
+"""
+Write-Behind Test
+Coalescing, retries, drops and flushing of the favorites write-behind queue, against the stand-in server
+"""
+
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from api_client import SimpleCRUDAPIClient
+from stand_in_server import StandInServer
+
+BATCH_ROUTE = "/api/favorites/batch"
+# Long enough that nothing is written unless the test flushes
+WINDOW = 60
+
+
+@pytest.fixture
+def server():
+    with StandInServer(seed_paket=10) as server:
+        yield server
+
+
+@pytest.fixture
+def client(server):
+    client = SimpleCRUDAPIClient(server.url, verbose=False)
+    assert client.register_user("writebehind", "writebehind@example.com", "writebehind123", "Write Behind")["success"]
+    yield client
+    if client.favorites_queue is not None:
+        client.favorites_queue.close()
+
+
+@pytest.fixture
+def hashes(client):
+    return [row["md5_hash"] for row in client.get_all_paket(limit=5)["data"]]
+
+
+def set_batch_faults(server, **fault):
+    server.faults.set_rules([{"route": BATCH_ROUTE, "methods": ["POST"], **fault}])
+
+
+def batch_requests(server) -> int:
+    return server.faults.to_dict()["rules"][0]["counts"]["requests"]
+
+
+def favorites(client):
+    """md5_hash -> favorite row as the server has it, read without the queue"""
+    reader = SimpleCRUDAPIClient(client.base_url, verbose=False)
+    reader.auth_token = client.auth_token
+    return {row["md5_hash"]: row for row in reader.get_all_favorites()["data"]}
+
+
+def test_toggles_coalesce_into_one_batch(server, client, hashes):
+    set_batch_faults(server)
+    queue = client.enable_favorites_write_behind(window=WINDOW)
+
+    for _ in range(3):
+        client.add_to_favorites(hashes[0])
+        client.remove_from_favorites(hashes[0])
+    client.add_to_favorites(hashes[1], notes="keep")
+    client.add_to_favorites(hashes[1])
+    client.add_to_favorites(hashes[2])
+    client.remove_from_favorites(hashes[2])
+
+    assert queue.pending() == 3
+    result = client.flush_favorites()
+
+    assert result["success"]
+    assert batch_requests(server) == 1
+    assert queue.snapshot()["coalesced"] == 7
+    assert set(favorites(client)) == {hashes[1]}
+    assert favorites(client)[hashes[1]]["notes"] == "keep"
+
+
+@pytest.mark.parametrize("fault", [
+    {"error_rate": 1.0, "error_status": 503},
+    {"error_rate": 1.0, "error_status": 429},
+    {"reset_rate": 1.0},
+], ids=["5xx", "429", "transport"])
+def test_failed_batch_is_requeued(server, client, hashes, fault):
+    set_batch_faults(server, **fault)
+    queue = client.enable_favorites_write_behind(window=WINDOW)
+    client.add_to_favorites(hashes[0])
+    client.add_to_favorites(hashes[1])
+
+    result = client.flush_favorites()
+
+    assert not result["success"]
+    assert queue.pending() == 2
+    assert favorites(client) == {}
+
+    # A newer operation for a requeued key replaces it instead of being overwritten by it
+    client.remove_from_favorites(hashes[1])
+    set_batch_faults(server)
+    assert client.flush_favorites()["success"]
+    assert queue.pending() == 0
+    assert set(favorites(client)) == {hashes[0]}
+
+
+def test_rejected_batch_is_dropped(server, client, hashes):
+    set_batch_faults(server, error_rate=1.0, error_status=400)
+    queue = client.enable_favorites_write_behind(window=WINDOW)
+    client.add_to_favorites(hashes[0])
+
+    result = client.flush_favorites()
+
+    assert not result["success"]
+    assert result["summary"] == {"rejected": 1}
+    assert queue.pending() == 0
+    set_batch_faults(server)
+    assert client.flush_favorites()["success"]
+    assert batch_requests(server) == 0
+    assert favorites(client) == {}
+
+
+def test_window_flushes_in_the_background(server, client, hashes):
+    set_batch_faults(server)
+    queue = client.enable_favorites_write_behind(window=0.1)
+    client.add_to_favorites(hashes[0])
+
+    deadline = time.monotonic() + 5
+    while queue.snapshot()["written"] == 0 and time.monotonic() < deadline:
+        time.sleep(0.02)
+
+    assert set(favorites(client)) == {hashes[0]}
+
+
+def test_close_flushes_pending_operations(server, client, hashes):
+    queue = client.enable_favorites_write_behind(window=WINDOW)
+    client.add_to_favorites(hashes[0])
+
+    assert queue.close()["success"]
+
+    assert set(favorites(client)) == {hashes[0]}
+    with pytest.raises(RuntimeError):
+        queue.add(hashes[1])
+
+
+def test_exit_flushes_pending_operations(server, client, hashes):
+    script = (
+        "import sys\n"
+        "from api_client import SimpleCRUDAPIClient\n"
+        "client = SimpleCRUDAPIClient(sys.argv[1], verbose=False)\n"
+        "client.auth_token = sys.argv[2]\n"
+        f"client.enable_favorites_write_behind(window={WINDOW})\n"
+        "client.add_to_favorites(sys.argv[3], notes='from exit')\n"
+    )
+    subprocess.run([sys.executable, "-c", script, server.url, client.auth_token, hashes[0]],
+                   check=True, timeout=30)
+
+    assert favorites(client)[hashes[0]]["notes"] == "from exit"
+
+
+def test_remove_then_add_clears_old_notes(server, client, hashes):
+    assert client.add_to_favorites(hashes[0], notes="old")["success"]
+    before = favorites(client)[hashes[0]]
+    client.enable_favorites_write_behind(window=WINDOW)
+
+    client.remove_from_favorites(hashes[0])
+    client.add_to_favorites(hashes[0])
+    assert client.flush_favorites()["summary"]["updated"] == 1
+
+    after = favorites(client)[hashes[0]]
+    assert after["notes"] is None
+    # Net effect of the pair: same favorite row, only the notes reset
+    assert (after["favorite_id"], after["favorited_at"]) == (before["favorite_id"], before["favorited_at"])
+
+    # A later add without notes keeps the cleared notes queued by the remove and add
+    client.remove_from_favorites(hashes[0])
+    client.add_to_favorites(hashes[0], notes="new")
+    client.remove_from_favorites(hashes[0])
+    client.add_to_favorites(hashes[0])
+    client.add_to_favorites(hashes[0])
+    client.flush_favorites()
+    assert favorites(client)[hashes[0]]["notes"] is None
+
+
+def test_read_waits_for_the_batch_in_flight(server, client, hashes):
+    set_batch_faults(server, latency={"dist": "fixed", "ms": 300})
+    queue = client.enable_favorites_write_behind(window=WINDOW)
+    client.add_to_favorites(hashes[0])
+    writer = threading.Thread(target=queue.flush)
+    writer.start()
+    while queue.pending():
+        time.sleep(0.005)
+
+    # Nothing is pending any more, but the batch holding the add is still on the wire
+    result = client.get_all_favorites()
+    writer.join()
+
+    assert [row["md5_hash"] for row in result["data"]] == [hashes[0]]
+
+
+def test_read_reports_a_failed_flush(server, client, hashes):
+    set_batch_faults(server, error_rate=1.0, error_status=503)
+    client.enable_favorites_write_behind(window=WINDOW)
+    client.add_to_favorites(hashes[0])
+
+    for result in (client.get_all_favorites(), client.check_favorite_status(hashes[0]),
+                   client.get_favorites_stats(), client.clear_all_favorites()):
+        assert not result["success"]
+        assert "could not be written" in result["error"]
+
+    set_batch_faults(server)
+    assert client.check_favorite_status(hashes[0])["data"]["is_favorite"]
@@ -0,0 +1,154 @@
+"""
+Client Throttling
+Token-bucket rate limiting and AIMD adaptive concurrency shared by every client in a process
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+
+class TokenBucket:
+    """At most `rate` requests/second on average, with bursts of up to `burst`"""
+
+    def __init__(self, rate: float, burst: float = None):
+        self.rate = rate
+        self.burst = burst or max(1.0, rate / 10)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.waited = 0.0
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+                self.waited += wait
+            time.sleep(wait)
+
+    def release(self, latency: float, ok: bool) -> None:
+        pass
+
+    def snapshot(self) -> Dict:
+        return {"kind": "bucket", "rate": self.rate, "burst": self.burst, "waited_s": round(self.waited, 3)}
+
+
+class AdaptiveConcurrency:
+    """AIMD limit on requests in flight, converging on what the server sustains
+
+    Every successful response below the latency threshold raises the limit by
+    1/limit, so about one slot per round trip's worth of requests (additive
+    increase). A 5xx, 429 or transport error, or a smoothed latency above
+    `tolerance` times the baseline, cuts it by `backoff` (multiplicative
+    decrease), at most once per smoothed latency so one burst of slow
+    responses counts as a single congestion signal.
+
+    The baseline tracks the fastest recent latency. It follows lower samples
+    immediately and otherwise rises by at most `drift` (1%) per second, so a
+    server that got permanently slower is re-learned within minutes instead of
+    keeping the limit pinned at the minimum.
+    """
+
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 256,
+                 tolerance: float = 2.0, backoff: float = 0.7, drift: float = 0.01):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.drift = drift
+        self.in_flight = 0
+        self.baseline: Optional[float] = None
+        self.smoothed: Optional[float] = None
+        self.stats = {"requests": 0, "errors": 0, "backoffs": 0, "peak_limit": float(initial)}
+        self._last_backoff = 0.0
+        self._last_release = time.monotonic()
+        self._condition = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self, latency: float, ok: bool) -> None:
+        with self._condition:
+            now = time.monotonic()
+            self.in_flight -= 1
+            self.stats["requests"] += 1
+            self.smoothed = latency if self.smoothed is None else self.smoothed * 0.8 + latency * 0.2
+            if ok:
+                if self.baseline is None:
+                    self.baseline = latency
+                else:
+                    allowed = self.baseline * (1 + self.drift * (now - self._last_release))
+                    self.baseline = min(latency, allowed)
+            else:
+                self.stats["errors"] += 1
+            self._last_release = now
+
+            congested = not ok or (self.baseline is not None and self.smoothed > self.baseline * self.tolerance)
+            if congested:
+                if now - self._last_backoff >= self.smoothed:
+                    self.limit = max(float(self.minimum), self.limit * self.backoff)
+                    self._last_backoff = now
+                    self.stats["backoffs"] += 1
+            else:
+                self.limit = min(float(self.maximum), self.limit + 1 / self.limit)
+                self.stats["peak_limit"] = max(self.stats["peak_limit"], self.limit)
+            self._condition.notify_all()
+
+    def snapshot(self) -> Dict:
+        with self._condition:
+            return {"kind": "aimd", "limit": round(self.limit, 2), "in_flight": self.in_flight,
+                    "baseline_ms": round((self.baseline or 0) * 1000, 2),
+                    "smoothed_ms": round((self.smoothed or 0) * 1000, 2), **self.stats,
+                    "peak_limit": round(self.stats["peak_limit"], 2)}
+
+
+def parse_throttle(spec: str):
+    """Build a throttle from "aimd", "aimd:max=64,initial=8", "bucket:200" or "bucket:200,burst=50"
+
+    "none" or an empty spec means no throttle (None).
+    """
+    if not spec or spec == "none":
+        return None
+    kind, _, rest = spec.partition(":")
+    options = {}
+    for part in filter(None, rest.split(",")):
+        key, _, value = part.partition("=")
+        options[key.strip() if value else "rate"] = float(value or key)
+    if kind == "aimd":
+        names = {"initial": "initial", "min": "minimum", "max": "maximum", "tolerance": "tolerance",
+                 "backoff": "backoff", "drift": "drift"}
+        unknown = set(options) - set(names)
+        if unknown:
+            raise ValueError(f"unknown aimd options: {', '.join(sorted(unknown))}")
+        kwargs = {names[key]: value for key, value in options.items()}
+        for key in ("initial", "minimum", "maximum"):
+            if key in kwargs:
+                kwargs[key] = int(kwargs[key])
+        return AdaptiveConcurrency(**kwargs)
+    if kind == "bucket":
+        if "rate" not in options:
+            raise ValueError("bucket needs a rate, e.g. bucket:200")
+        return TokenBucket(options["rate"], options.get("burst"))
+    raise ValueError(f"unknown throttle {kind!r} (expected aimd or bucket)")
+
+
+_shared: Dict[str, object] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_throttle(spec: str):
+    """One throttle per spec per process, so every client built from API_THROTTLE draws from the same limit"""
+    with _shared_lock:
+        if spec not in _shared:
+            _shared[spec] = parse_throttle(spec)
+        return _shared[spec]
@@ -0,0 +1,411 @@
+"""
+Traffic Capture and Replay
+Records every request made through the API client and re-issues captures at scaled speed
+"""
+
+import argparse
+import atexit
+import base64
+import gzip
+import json
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import requests
+from colorama import Fore
+
+from api_client import SimpleCRUDAPIClient
+from load_runner import LoadReport
+
+FORMAT_VERSION = 1
+
+# Body fields kept verbatim: identifiers the replay needs to hit the same rows, never content
+KEY_FIELDS = ("md5_hash", "id", "ids")
+
+_ID_SEGMENT = re.compile(r"\d+")
+_HASH_SEGMENT = re.compile(r"[0-9a-fA-F]{32}")
+
+
+def template_path(path: str) -> Tuple[str, List[str]]:
+    """Split a concrete path into its route template and the values cut out of it
+
+    /api/paket/42 -> ("/api/paket/{id}", ["42"])
+    """
+    segments, args = [], []
+    for segment in path.split("/"):
+        if _ID_SEGMENT.fullmatch(segment):
+            segments.append("{id}")
+            args.append(segment)
+        elif _HASH_SEGMENT.fullmatch(segment):
+            segments.append("{md5_hash}")
+            args.append(segment)
+        else:
+            segments.append(segment)
+    return "/".join(segments), args
+
+
+def fill_template(template: str, args: List[str]) -> str:
+    values = iter(args)
+    return re.sub(r"\{(id|md5_hash)\}", lambda _: next(values), template)
+
+
+def token_user(token: str) -> Optional[int]:
+    """The userId claim of a JWT bearer token (unverified), None for opaque tokens"""
+    parts = token.split(".")
+    if len(parts) != 3:
+        return None
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(parts[1] + "=" * (-len(parts[1]) % 4)))
+    except ValueError:
+        return None
+    return payload.get("userId") if isinstance(payload, dict) else None
+
+
+def _open(path: str, mode: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class CapturedRequest(NamedTuple):
+    time: float              # epoch seconds the request was sent
+    slot: Optional[int]      # user identity slot, None for anonymous requests
+    method: str
+    template: str
+    args: List[str]
+    params: Optional[Dict]
+    body_size: int
+    keys: Optional[Dict]     # KEY_FIELDS found in the body
+    elapsed: float           # seconds until the response (or failure)
+    status: int              # 0 when no response was received
+
+
+class CaptureRecorder:
+    """Append requests to a capture file
+
+    The file is JSON lines: a header object per recording session, then one
+    array per request. Offsets are milliseconds from the header's start time.
+    Auth tokens are never written; each user gets a small integer slot
+    instead, so a replay can keep each user's requests in order. The user is
+    the user_id that register and login answered with for that token, else the
+    token's userId claim, else the token itself; so a register and the login
+    that follows it share a slot although their tokens differ. A path ending
+    in .gz is written as a gzip stream; appending adds a gzip member.
+    """
+
+    _shared: Dict[str, "CaptureRecorder"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, path: str, base_url: str = None, flush_every: int = 64):
+        self.path = path
+        self.flush_every = flush_every
+        self.started = time.time()
+        self._slots: Dict[Tuple[str, object], int] = {}
+        # token -> user_id, from the register and login responses
+        self._token_users: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._file = _open(path, "a")
+        self._write({"capture": FORMAT_VERSION, "started": self.started, "base_url": base_url})
+        atexit.register(self.close)
+
+    @classmethod
+    def shared(cls, path: str, base_url: str = None) -> "CaptureRecorder":
+        """One recorder per file in this process, so all clients share the token slots"""
+        with cls._shared_lock:
+            if path not in cls._shared:
+                cls._shared[path] = cls(path, base_url)
+            return cls._shared[path]
+
+    def _write(self, entry) -> None:
+        self._file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+    def slot_for(self, token: Optional[str]) -> Optional[int]:
+        if not token:
+            return None
+        with self._lock:
+            user = self._token_users.get(token)
+        if user is None:
+            user = token_user(token)
+        identity = ("user", user) if user is not None else ("token", token)
+        with self._lock:
+            return self._slots.setdefault(identity, len(self._slots))
+
+    def record(self, method: str, path: str, params: Optional[Dict], data: Optional[Dict],
+               token: Optional[str], started: float, elapsed: float,
+               response: Optional[requests.Response]) -> None:
+        template, args = template_path(path)
+        body_size = len(json.dumps(data)) if data else 0
+        keys = {field: data[field] for field in KEY_FIELDS if field in data} if isinstance(data, dict) else {}
+
+        # Login and register are anonymous but belong to the user whose token they return
+        if not token and response is not None and template.startswith("/api/auth/"):
+            try:
+                body = response.json()
+            except ValueError:
+                body = {}
+            token = body.get("token") if isinstance(body, dict) else None
+            user = (body.get("data") or {}).get("user_id") if token else None
+            if user is not None:
+                with self._lock:
+                    self._token_users[token] = user
+
+        entry = [
+            round((started - self.started) * 1000, 1), self.slot_for(token), method.upper(), template,
+            args or None, params or None, body_size, keys or None, round(elapsed * 1000, 1),
+            response.status_code if response is not None else 0
+        ]
+        with self._lock:
+            if self._file.closed:
+                return
+            self._write(entry)
+            self._pending += 1
+            if self._pending >= self.flush_every:
+                self._file.flush()
+                self._pending = 0
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+def read_capture(path: str) -> List[CapturedRequest]:
+    """All requests in a capture file, in send order"""
+    captured = []
+    started = 0.0
+    with _open(path, "r") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if isinstance(entry, dict):
+                started = entry["started"]
+                continue
+            offset, slot, method, template, args, params, body_size, keys, elapsed, status = entry
+            captured.append(CapturedRequest(started + offset / 1000, slot, method, template, args or [],
+                                            params, body_size, keys, elapsed / 1000, status))
+    captured.sort(key=lambda request: request.time)
+    return captured
+
+
+def _pad(size: int) -> str:
+    return "x" * max(size, 1)
+
+
+class TrafficReplayer:
+    """Re-issue a capture against `base_url`
+
+    speed=1 keeps the original timing, speed=10 compresses it tenfold and
+    speed=0 sends as fast as possible. Requests are spread over `sessions`
+    threads, each with its own client session; all requests of one user slot
+    go to the same thread in their original order. Anonymous requests are
+    spread round-robin. Request bodies are synthesized to the recorded size,
+    keeping the recorded identifiers. Each slot replays as a fresh user. A
+    slot whose first request is a register creates its user at that point;
+    every other slot is registered before the replay clock starts (unless
+    `tokens` has one for it), so registration never delays the timed run.
+    """
+
+    def __init__(self, base_url: str, captured: List[CapturedRequest], speed: float = 1.0,
+                 sessions: int = 16, tokens: Dict[int, str] = None, late_threshold: float = 0.01):
+        self.base_url = base_url
+        self.captured = captured
+        self.speed = speed
+        self.sessions = max(1, sessions)
+        self.tokens: Dict[int, str] = dict(tokens or {})
+        self.late_threshold = late_threshold
+        self.run_id = secrets.token_hex(3)
+        self.random = random.Random()
+        self.report = LoadReport()
+        self._tokens_lock = threading.Lock()
+
+    def credentials(self, slot: Optional[int]) -> Dict:
+        name = f"replay_{self.run_id}_{slot if slot is not None else secrets.token_hex(3)}"
+        return {"username": name, "email": f"{name}@replay.test", "password": "Replay123!",
+                "full_name": f"Replay User {slot}"}
+
+    def build_body(self, request: CapturedRequest) -> Optional[Dict]:
+        """Synthetic body of about the recorded size for a captured request"""
+        if request.body_size == 0 and not request.keys:
+            return None
+        route = f"{request.method} {request.template}"
+        keys = request.keys or {}
+        if route == "POST /api/auth/register":
+            return self.credentials(request.slot)
+        if route == "POST /api/auth/login":
+            credentials = self.credentials(request.slot)
+            return {"email": credentials["email"], "password": credentials["password"]}
+        if route == "PUT /api/users/change-password":
+            password = self.credentials(request.slot)["password"]
+            return {"currentPassword": password, "newPassword": password}
+        if route == "POST /api/paket":
+            return {"md5_hash": keys.get("md5_hash", secrets.token_hex(16)), "nama_paket": "Replay paket",
+                    "kode_paket": f"RPL{self.random.randrange(10 ** 6):06d}",
+                    "html_content": _pad(request.body_size - 120)}
+        if route == "POST /api/paket/batch":
+            count = max(1, request.body_size // 600)
+            return {"items": [{"md5_hash": secrets.token_hex(16), "nama_paket": "Replay paket",
+                               "kode_paket": f"RPL{i:06d}", "html_content": _pad(480)} for i in range(count)]}
+        if route == "PUT /api/paket/{id}":
+            return {"nama_paket": _pad(request.body_size - 20)}
+        if route == "PUT /api/users/profile":
+            return {"full_name": _pad(min(request.body_size - 20, 255))}
+        if route == "POST /api/favorites":
+            return {"notes": _pad(request.body_size - 60), **keys}
+        return {**keys, "_": _pad(request.body_size - len(json.dumps(keys)))}
+
+    def _register(self, client: SimpleCRUDAPIClient, slot: int) -> None:
+        credentials = self.credentials(slot)
+        response = client._make_request("POST", "/api/auth/register", data=credentials, use_auth=False)
+        if response.status_code != 201:
+            # Registered by an earlier replay of the same run id, or refused: try logging in
+            response = client._make_request("POST", "/api/auth/login", use_auth=False,
+                                            data={"email": credentials["email"],
+                                                  "password": credentials["password"]})
+        token = response.json().get("token") if response.ok else None
+        if token:
+            with self._tokens_lock:
+                self.tokens[slot] = token
+
+    def prepare_users(self) -> int:
+        """Register the users of slots that do not start with a register call; returns how many"""
+        first: Dict[int, CapturedRequest] = {}
+        for request in self.captured:
+            if request.slot is not None:
+                first.setdefault(request.slot, request)
+        slots = [slot for slot, request in first.items()
+                 if slot not in self.tokens and (request.method, request.template) != ("POST", "/api/auth/register")]
+        if not slots:
+            return 0
+
+        local = threading.local()
+
+        def register(slot: int) -> None:
+            if not hasattr(local, "client"):
+                local.client = SimpleCRUDAPIClient(self.base_url, verbose=False, reuse_responses=False)
+            try:
+                self._register(local.client, slot)
+            except (requests.exceptions.RequestException, ValueError):
+                pass  # The slot's requests run without a token and show up as errors
+
+        with ThreadPoolExecutor(self.sessions) as executor:
+            list(executor.map(register, slots))
+        return len(slots)
+
+    def _worker(self, requests_in_order: List[CapturedRequest], start: float, origin: float) -> None:
+        # Every captured request is re-issued, even when an identical GET is in flight
+        client = SimpleCRUDAPIClient(self.base_url, verbose=False, reuse_responses=False)
+
+        for request in requests_in_order:
+            intended = start + ((request.time - origin) / self.speed if self.speed > 0 else 0)
+            delay = intended - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+            name = f"{request.method} {request.template}"
+            is_auth = request.template.startswith("/api/auth/")
+            sent = time.perf_counter()
+            try:
+                with self._tokens_lock:
+                    client.auth_token = self.tokens.get(request.slot)
+                response = client._make_request(request.method, fill_template(request.template, request.args),
+                                                data=self.build_body(request), params=request.params,
+                                                use_auth=not is_auth)
+                if is_auth and request.slot is not None and response.ok:
+                    with self._tokens_lock:
+                        self.tokens[request.slot] = response.json().get("token")
+                ok = response.status_code < 500
+            except (requests.exceptions.RequestException, ValueError):
+                ok = False
+
+            finished = time.perf_counter()
+            late = self.speed > 0 and sent - intended > self.late_threshold
+            self.report.record(name, finished - (intended if self.speed > 0 else sent), finished - sent, late, ok)
+
+    def run(self) -> LoadReport:
+        self.prepare_users()
+        lanes: List[List[CapturedRequest]] = [[] for _ in range(self.sessions)]
+        anonymous = 0
+        for request in self.captured:
+            if request.slot is None:
+                lanes[anonymous % self.sessions].append(request)
+                anonymous += 1
+            else:
+                lanes[request.slot % self.sessions].append(request)
+
+        origin = self.captured[0].time if self.captured else 0.0
+        start = time.perf_counter() + 0.05
+        threads = [threading.Thread(target=self._worker, args=(lane, start, origin), daemon=True)
+                   for lane in lanes if lane]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.report.duration = time.perf_counter() - start
+        return self.report
+
+
+def print_summary(captured: List[CapturedRequest]) -> None:
+    if not captured:
+        print(f"{Fore.YELLOW}⚠️ Capture is empty")
+        return
+    span = captured[-1].time - captured[0].time
+    slots = {request.slot for request in captured if request.slot is not None}
+    routes = Counter(f"{request.method} {request.template}" for request in captured)
+
+    print(f"{Fore.CYAN}📼 {len(captured)} requests over {span:.1f}s from {len(slots)} users "
+          f"({sum(1 for r in captured if r.slot is None)} anonymous)")
+    for route, count in routes.most_common():
+        print(f"   {route:<40} {count:>8}")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect and replay traffic captures")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    summary = commands.add_parser("summary", help="show what a capture contains")
+    summary.add_argument("capture")
+
+    replay = commands.add_parser("replay", help="re-issue a capture against a server")
+    replay.add_argument("capture")
+    replay.add_argument("--url", default="http://localhost:3001")
+    replay.add_argument("--speed", type=float, default=1.0,
+                        help="time scale: 1 = original pace, 10 = ten times faster, 0 = as fast as possible")
+    replay.add_argument("--sessions", type=int, default=16, help="concurrent client sessions")
+    replay.add_argument("--tokens", help="JSON file mapping user slot to bearer token")
+    replay.add_argument("--json", help="write the replay report as JSON to this file")
+    args = parser.parse_args(argv)
+
+    captured = read_capture(args.capture)
+    if args.command == "summary":
+        print_summary(captured)
+        return 0
+
+    tokens = None
+    if args.tokens:
+        with open(args.tokens) as f:
+            tokens = {int(slot): token for slot, token in json.load(f).items()}
+
+    pace = "as fast as possible" if args.speed <= 0 else f"at {args.speed:g}x"
+    print(f"{Fore.MAGENTA}▶️ Replaying {len(captured)} requests {pace} over {args.sessions} sessions")
+    replayer = TrafficReplayer(args.url, captured, speed=args.speed, sessions=args.sessions, tokens=tokens)
+    report = replayer.run()
+    report.print_report("REPLAY REPORT")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report.to_dict(), f)
+    return 1 if report.total().errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,267 @@
+"""
+Favorites Write-Behind
+Coalesces favorite adds and removes per (user, md5_hash) and writes the net result in batches
+"""
+
+import argparse
+import atexit
+import random
+import secrets
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from colorama import Fore
+
+
+class FavoriteWriteQueue:
+    """Write-behind queue for favorite toggles
+
+    add() and remove() return at once; only the last operation per
+    (user, md5_hash) is kept, so toggling a favorite five times within the
+    window costs one item in one POST /api/favorites/batch. The user is the
+    client's bearer token when the operation is queued.
+
+    A remove followed by an add of a favorite that already exists nets out to
+    an add that resets its notes (to the new add's notes, else NULL), which
+    is what the two calls would have done one by one. The favorite keeps its
+    favorite_id and favorited_at, though, where a real remove and add would
+    give it new ones.
+
+    Pending operations are written when the oldest is `window` seconds old,
+    when `max_batch` are pending, on flush(), on close() and at interpreter
+    exit. Until then they live only in this process: call flush() wherever
+    the caller needs them durable. A batch that fails
+    (transport error, 5xx, 429) is put back and retried with the next flush,
+    unless a newer operation for the same key has replaced it meanwhile; a
+    rejected one (400, 401) is dropped and counted as "rejected".
+    """
+
+    def __init__(self, client, window: float = 0.5, max_batch: int = 500, flush_on_exit: bool = True):
+        self.client = client
+        self.window = window
+        self.max_batch = max_batch
+        # (token, md5_hash) -> operation, in first-queued order
+        self._pending: Dict[Tuple[Optional[str], str], Dict] = {}
+        self._oldest: Optional[float] = None
+        self._lock = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._closed = False
+        self.stats = {"queued": 0, "coalesced": 0, "written": 0, "batches": 0, "failed_batches": 0}
+        self.statuses: Dict[str, int] = {}
+        self.last_error: Optional[str] = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._flush_on_exit = flush_on_exit
+        if flush_on_exit:
+            atexit.register(self.close)
+
+    def add(self, md5_hash: str, notes: str = None) -> None:
+        operation = {"md5_hash": md5_hash, "action": "add"}
+        if notes is not None:
+            operation["notes"] = notes
+        self._queue(operation)
+
+    def remove(self, md5_hash: str) -> None:
+        self._queue({"md5_hash": md5_hash, "action": "remove"})
+
+    def _queue(self, operation: Dict) -> None:
+        key = (self.client.auth_token, operation["md5_hash"])
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("favorites write-behind queue is closed")
+            previous = self._pending.get(key)
+            if previous is not None:
+                self.stats["coalesced"] += 1
+                if operation["action"] == "add" and "notes" not in operation:
+                    if previous["action"] == "remove":
+                        # The server only changes notes it is sent; an explicit null clears the old ones
+                        operation["notes"] = None
+                    elif "notes" in previous:
+                        # An add without notes keeps the notes of an earlier queued add
+                        operation["notes"] = previous["notes"]
+            self._pending[key] = operation
+            self.stats["queued"] += 1
+            first = self._oldest is None
+            if first:
+                self._oldest = time.monotonic()
+            if first or len(self._pending) >= self.max_batch:
+                self._lock.notify()
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self) -> Dict:
+        """Write every pending operation now; returns {"success", "written", "summary", "error"}
+
+        On failure the unwritten operations stay queued and "error" says why.
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch = self._pending
+                self._pending = {}
+                self._oldest = None
+            return self._write(batch)
+
+    def _write(self, batch: Dict[Tuple[Optional[str], str], Dict]) -> Dict:
+        summary: Dict[str, int] = {}
+        by_token: Dict[Optional[str], List[Tuple[Tuple, Dict]]] = {}
+        for key, operation in batch.items():
+            by_token.setdefault(key[0], []).append((key, operation))
+
+        written, batches, errors = 0, 0, []
+        for token, entries in by_token.items():
+            for start in range(0, len(entries), self.max_batch):
+                chunk = entries[start:start + self.max_batch]
+                try:
+                    response = self.client._make_request("POST", "/api/favorites/batch", auth_token=token,
+                                                         data={"items": [operation for _, operation in chunk]})
+                except requests.exceptions.RequestException as e:
+                    errors.append(str(e))
+                    self._requeue(chunk)
+                    continue
+                result = self.client._print_response(response, f"Favorites Write-Behind ({len(chunk)} items)")
+                if response.status_code >= 500 or response.status_code == 429:
+                    errors.append(result.get("error") or f"HTTP {response.status_code}")
+                    self._requeue(chunk)
+                    continue
+                if not result.get("success"):
+                    # Rejected (401, 400): retrying would not help, so the operations are dropped
+                    errors.append(result.get("error") or f"HTTP {response.status_code}")
+                    summary["rejected"] = summary.get("rejected", 0) + len(chunk)
+                    continue
+                written += len(chunk)
+                batches += 1
+                for status, count in result.get("data", {}).get("summary", {}).items():
+                    summary[status] = summary.get(status, 0) + count
+
+        with self._lock:
+            self.stats["written"] += written
+            self.stats["batches"] += batches
+            self.stats["failed_batches"] += len(errors)
+            for status, count in summary.items():
+                self.statuses[status] = self.statuses.get(status, 0) + count
+            self.last_error = errors[-1] if errors else self.last_error
+        return {"success": not errors, "written": written, "summary": summary, "error": "; ".join(errors) or None}
+
+    def _requeue(self, entries: List[Tuple[Tuple, Dict]]) -> None:
+        with self._lock:
+            restored = {key: operation for key, operation in entries if key not in self._pending}
+            # Put the older operations in front so they keep their place in the window
+            self._pending = {**restored, **self._pending}
+            if self._pending and self._oldest is None:
+                self._oldest = time.monotonic()
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                while not self._closed and (
+                        self._oldest is None
+                        or (len(self._pending) < self.max_batch and time.monotonic() - self._oldest < self.window)):
+                    timeout = None if self._oldest is None else self.window - (time.monotonic() - self._oldest)
+                    self._lock.wait(timeout)
+                if self._closed:
+                    return
+            result = self.flush()
+            if not result["success"]:
+                if self.client.verbose:
+                    print(f"{Fore.YELLOW}⚠️ Favorites write-behind failed, will retry: {result['error']}")
+                # Back off for a window before retrying the requeued operations
+                time.sleep(self.window)
+
+    def close(self) -> Dict:
+        """Stop the background writer and flush what is left"""
+        with self._lock:
+            self._closed = True
+            self._lock.notify_all()
+        self._thread.join()
+        if self._flush_on_exit:
+            atexit.unregister(self.close)
+        result = self.flush()
+        if not result["success"] and self.client.verbose:
+            print(f"{Fore.RED}❌ {self.pending()} favorite operations were not written: {result['error']}")
+        return result
+
+    def __enter__(self) -> "FavoriteWriteQueue":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {**self.stats, "pending": len(self._pending), "statuses": dict(self.statuses),
+                    "last_error": self.last_error}
+
+
+def run_toggles(client, hashes: List[str], toggles: int, seed: int) -> float:
+    """Apply the same seeded burst of toggles through the client; returns the seconds it took"""
+    rng = random.Random(seed)
+    state = {md5_hash: False for md5_hash in hashes}
+    started = time.perf_counter()
+    for _ in range(toggles):
+        md5_hash = rng.choice(hashes)
+        if state[md5_hash]:
+            client.remove_from_favorites(md5_hash)
+        else:
+            client.add_to_favorites(md5_hash)
+        state[md5_hash] = not state[md5_hash]
+    client.flush_favorites()
+    return time.perf_counter() - started
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Favorite toggles sent one by one versus through the write-behind queue")
+    parser.add_argument("--url", default="http://localhost:3001")
+    parser.add_argument("--toggles", type=int, default=500)
+    parser.add_argument("--hashes", type=int, default=20, help="distinct paket toggled")
+    parser.add_argument("--window", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    from api_client import SimpleCRUDAPIClient
+    client = SimpleCRUDAPIClient(args.url, verbose=False)
+    run = f"{int(time.time())}_{secrets.token_hex(3)}"
+    result = client.register_user(f"writebehind_{run}", f"writebehind_{run}@example.com", "writebehind123",
+                                  "Write-Behind Benchmark")
+    if not result.get("success"):
+        print(f"{Fore.RED}❌ Could not register the benchmark user: {result.get('error')}")
+        return 1
+    hashes = [row["md5_hash"] for row in client.get_all_paket(limit=args.hashes).get("data", [])]
+    if not hashes:
+        print(f"{Fore.RED}❌ No paket to favorite")
+        return 1
+
+    try:
+        results = {}
+        for mode in ("direct", "write-behind"):
+            client.clear_all_favorites()
+            requests_before = client.get_metrics()["requests"]
+            if mode == "write-behind":
+                client.enable_favorites_write_behind(window=args.window)
+            seconds = run_toggles(client, hashes, args.toggles, args.seed)
+            favorites = sorted(row["md5_hash"] for row in client.get_all_favorites(fields=["md5_hash"])["data"])
+            # get_all_favorites is one request; leave it out of the count
+            results[mode] = {"seconds": seconds, "requests": client.get_metrics()["requests"] - requests_before - 1,
+                             "favorites": favorites}
+
+        print(f"{Fore.MAGENTA}⭐ {args.toggles} toggles over {len(hashes)} paket")
+        for mode, numbers in results.items():
+            print(f"{Fore.WHITE}   {mode:<14}{numbers['seconds'] * 1000:>10.1f} ms{numbers['requests']:>8} requests")
+        same = results["direct"]["favorites"] == results["write-behind"]["favorites"]
+        print(f"{Fore.GREEN if same else Fore.RED}{'✅' if same else '❌'} Final favorites "
+              f"{'match' if same else 'differ'} ({len(results['direct']['favorites'])} favorites)")
+        print(f"{Fore.CYAN}   {client.favorites_queue.snapshot()}")
+        return 0 if same else 1
+    finally:
+        if client.favorites_queue is not None:
+            client.favorites_queue.close()
+        client.clear_all_favorites()
+        client.delete_user_account()
+
+
+if __name__ == "__main__":
+    sys.exit(main())